@@ -0,0 +1,299 @@
+# run_benchmarks.py
+# Timings of the GUI hot paths and startup, offscreen and without hardware,
+# so releases can be compared on the same machine (e.g. the Pi 3B+ kiosk).
+#
+#   python -m benchmarks.run_benchmarks                      # print timings
+#   python -m benchmarks.run_benchmarks --save base.json     # record a baseline
+#   python -m benchmarks.run_benchmarks --compare base.json  # exit 1 on regressions
+#
+# Each case is timed as the median of several samples of repeated calls;
+# a regression is a median more than --threshold slower than the baseline.
+
+import os
+import sys
+
+# Before anything imports Qt
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+os.environ.setdefault('PYQTGRAPH_QT_LIB', 'PyQt5')
+
+import json
+import time
+import argparse
+import platform
+import tempfile
+import statistics
+import subprocess
+
+DEFAULT_REPEAT = 7
+DEFAULT_THRESHOLD = 0.25   # fraction slower than baseline that counts as a regression
+MIN_SAMPLE_TIME = 0.02     # seconds per sample; fast cases are called in loops
+MAX_LOOPS = 10000
+HISTORY_SIZES = (3600, 8 * 3600, 24 * 3600)   # seconds of 1 Hz history
+PRESET_COUNTS = (10, 100, 1000)
+
+_cases = []
+_qt_app = None
+
+
+def benchmark(name):
+    """Register ``setup(workdir) -> (func, teardown)``; ``func`` is the timed call."""
+    def register(setup):
+        _cases.append((name, setup))
+        return setup
+    return register
+
+
+def measure(func, repeat=DEFAULT_REPEAT):
+    """Per-call seconds: median, min and sample count over ``repeat`` samples."""
+    func()  # warm-up (first-call caches, lazy imports)
+    loops = 1
+    while loops < MAX_LOOPS:
+        start = time.perf_counter()
+        for _ in range(loops):
+            func()
+        if time.perf_counter() - start >= MIN_SAMPLE_TIME:
+            break
+        loops *= 2
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(loops):
+            func()
+        samples.append((time.perf_counter() - start) / loops)
+    return {'median': statistics.median(samples), 'min': min(samples), 'loops': loops, 'samples': repeat}
+
+
+def compare(results, baseline, threshold=DEFAULT_THRESHOLD):
+    """(name, baseline median, current median, ratio, regressed) for cases present in both."""
+    rows = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        ratio = result['median'] / base['median'] if base['median'] else float('inf')
+        rows.append((name, base['median'], result['median'], ratio, ratio > 1 + threshold))
+    return rows
+
+
+def _app():
+    global _qt_app
+    from PyQt5.QtWidgets import QApplication
+    from src.theme import apply_theme
+    if _qt_app is None:
+        # Kept alive for the whole run; widgets die with the application
+        _qt_app = QApplication.instance() or QApplication(sys.argv[:1])
+        apply_theme(_qt_app)
+    return _qt_app
+
+
+def _controller(workdir):
+    from src.controller import DryerController
+    return DryerController(session_dir=os.path.join(workdir, 'sessions'))
+
+
+def _presets(count):
+    return {f'Material {i:04d}': {'temperature': 40 + i % 40, 'drying_time': 60 + i % 120}
+            for i in range(count)}
+
+
+@benchmark('gui_construction')
+def bench_gui_construction(workdir):
+    from src.filament_dryer_gui import FilamentDryerGUI
+    app = _app()
+    controllers = []
+
+    def run():
+        controllers.append(_controller(workdir))
+        gui = FilamentDryerGUI(controller=controllers[-1])
+        gui.close()
+        gui.deleteLater()
+        app.processEvents()
+
+    def teardown():
+        for controller in controllers:
+            controller.close()
+    return run, teardown
+
+
+def _graph_case(seconds):
+    def setup(workdir):
+        from src.main_page import MainPage
+        _app()
+        page = MainPage(controller=_controller(workdir))
+        page.resize(800, 480)
+        now = time.time()
+        for i in range(seconds):
+            page.history.append(now - seconds + i, 55 + (i % 600) / 60, 30 - (i % 300) / 30, 128)
+        page.set_graph_span(seconds)
+        page.build_graph()
+        return page.update_graph, page.close
+    return setup
+
+
+for _seconds in HISTORY_SIZES:
+    benchmark(f'update_graph_{_seconds // 3600}h')(_graph_case(_seconds))
+
+
+@benchmark('controller_tick')
+def bench_controller_tick(workdir):
+    # The per-second state path that replaced MainPage.simulate_environment
+    controller = _controller(workdir)
+    return controller.tick, controller.close
+
+
+@benchmark('simulated_chamber_step')
+def bench_simulated_chamber_step(workdir):
+    from src.thermal_model import ChamberModel
+    model = ChamberModel()
+    return (lambda: model.step(50.0)), None
+
+
+@benchmark('sensor_pipeline_1k')
+def bench_sensor_pipeline(workdir):
+    # One block of 1024 oversampled readings through Hampel, Kalman and decimation
+    import numpy as np
+    from src.filters import SensorPipeline
+    pipeline = SensorPipeline(oversample=8, smoothing='kalman', min_deviation=0.5)
+    block = 25 + np.random.default_rng(0).normal(0, 0.3, 1024)
+    return (lambda: pipeline.process(block)), None
+
+
+def _export_case(fmt):
+    def setup(workdir):
+        # An hour at 10 Hz, the rate multi-day logs are exported at
+        import os
+        from src.session_log import SessionRecorder
+        from src.exporter import export_session
+        session = os.path.join(workdir, 'session.fdlog')
+        recorder = SessionRecorder(session, start_time=0.0, preset='PLA', batch_size=1024)
+        for i in range(36000):
+            recorder.append(i * 0.1, 60.0, 20.0, 128, 60.0)
+        recorder.close()
+        out = os.path.join(workdir, 'exports')
+        return (lambda: export_session(session, out, fmt)), None
+    return setup
+
+
+for _fmt in ('csv', 'npz'):
+    benchmark(f'export_{_fmt}_36k')(_export_case(_fmt))
+
+
+@benchmark('update_selected_preset')
+def bench_update_selected_preset(workdir):
+    from src.main_page import MainPage
+    _app()
+    page = MainPage(controller=_controller(workdir))
+    names = list(page.presets)
+    index = [0]
+
+    def run():
+        index[0] = (index[0] + 1) % len(names)
+        page.update_selected_preset(names[index[0]])
+    return run, page.close
+
+
+def _presets_grid_case(count):
+    def setup(workdir):
+        from src.settings_page import SettingsPage
+        from src.preset_repository import PresetRepository
+        _app()
+        page = SettingsPage(repository=PresetRepository(os.path.join(workdir, 'presets.json')))
+        presets = _presets(count)
+        edited = dict(presets, **{'Material 0000': {'temperature': 99, 'drying_time': 30}})
+        state = [False]
+
+        def run():
+            # Alternate between two preset sets differing in one entry, as an edit would
+            state[0] = not state[0]
+            page.presets = edited if state[0] else presets
+            page.refresh_presets_grid()
+        # First render of the full grid happens in the warm-up call
+        return run, page.close
+    return setup
+
+
+for _count in PRESET_COUNTS:
+    benchmark(f'refresh_presets_grid_{_count}')(_presets_grid_case(_count))
+
+
+@benchmark('debug_update')
+def bench_debug_update(workdir):
+    from src.main_page import MainPage
+    from src.debugging_page import DebuggingPage
+    _app()
+    main_page = MainPage(controller=_controller(workdir))
+    page = DebuggingPage(main_page=main_page)
+
+    def teardown():
+        page.close()
+        main_page.close()
+    return page.update_debug_info, teardown
+
+
+@benchmark('startup_to_first_frame')
+def bench_startup(workdir):
+    # Fresh interpreter each time: imports, window construction and one event-loop pass
+    script = ('import sys; from PyQt5.QtWidgets import QApplication; app = QApplication(sys.argv[:1]); '
+              'from src.filament_dryer_gui import FilamentDryerGUI; '
+              f'from src.controller import DryerController; c = DryerController(session_dir={os.path.join(workdir, "sessions")!r}); '
+              'gui = FilamentDryerGUI(controller=c); gui.show(); app.processEvents(); gui.close(); c.close()')
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+    def run():
+        subprocess.run([sys.executable, '-c', script], cwd=root, check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return run, None
+
+
+def run_cases(selected=None, repeat=DEFAULT_REPEAT):
+    results = {}
+    workdir = tempfile.mkdtemp(prefix='fd-bench-')
+    for name, setup in _cases:
+        if selected and not any(s in name for s in selected):
+            continue
+        func, teardown = setup(workdir)
+        try:
+            results[name] = measure(func, repeat=repeat)
+        finally:
+            if teardown is not None:
+                teardown()
+        print(f'{name:28} {results[name]["median"] * 1000:10.3f} ms  (min {results[name]["min"] * 1000:.3f}, '
+              f'{results[name]["loops"]} loops)', flush=True)
+    return results
+
+
+def environment():
+    from PyQt5.QtCore import QT_VERSION_STR
+    return {'python': platform.python_version(), 'qt': QT_VERSION_STR, 'machine': platform.machine(),
+            'platform': platform.platform(), 'time': time.time()}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark GUI hot paths offscreen.')
+    parser.add_argument('cases', nargs='*', help='only run cases whose name contains one of these')
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT)
+    parser.add_argument('--save', metavar='FILE', help='write results as a JSON baseline')
+    parser.add_argument('--compare', metavar='FILE', help='compare against a JSON baseline')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help='allowed slowdown before a case counts as a regression (default %(default)s)')
+    args = parser.parse_args(argv)
+
+    results = run_cases(args.cases, repeat=args.repeat)
+    if args.save:
+        with open(args.save, 'w') as file:
+            json.dump({'environment': environment(), 'results': results}, file, indent=2)
+        print(f'Baseline written to {args.save}')
+    if args.compare:
+        with open(args.compare) as file:
+            baseline = json.load(file)['results']
+        rows = compare(results, baseline, args.threshold)
+        for name, base, current, ratio, regressed in rows:
+            flag = 'REGRESSION' if regressed else 'ok'
+            print(f'{name:28} {base * 1000:10.3f} -> {current * 1000:10.3f} ms  x{ratio:.2f}  {flag}')
+        if any(row[4] for row in rows):
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
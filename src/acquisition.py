@@ -0,0 +1,179 @@
+# acquisition.py
+# Sensor polling off the GUI thread: one worker thread per bus, results handed
+# to the GUI through a thread-safe queue that it drains at its refresh rate.
+# A sensor with a src.filters.SensorPipeline is oversampled and only its
+# conditioned, decimated values are published.
+
+import time
+import queue
+import threading
+import functools
+from collections import namedtuple
+
+# One sensor value as published by an acquisition worker
+Reading = namedtuple('Reading', ['timestamp', 'name', 'value'])
+
+DEFAULT_RATE_HZ = 1.0
+DEFAULT_QUEUE_SIZE = 1024
+
+
+class _BusWorker(threading.Thread):
+    """Polls every sensor on one bus at a fixed rate using monotonic deadlines."""
+
+    def __init__(self, service, bus):
+        super().__init__(name=f'acquisition-{bus}', daemon=True)
+        self.service = service
+        self.bus = bus
+        self.sensors = []
+
+    def run(self):
+        period = 1.0 / self.service.bus_rate(self.bus)
+        next_deadline = time.monotonic()
+        stop_event = self.service._stop_event
+        while not stop_event.is_set():
+            self.service.poll_sensors(self.sensors)
+            next_deadline += period
+            delay = next_deadline - time.monotonic()
+            if delay < 0:
+                # A slow read overran the period; skip ahead instead of bursting
+                next_deadline = time.monotonic()
+                delay = 0
+            stop_event.wait(delay)
+
+
+class SensorAcquisition:
+    """Background sensor polling service.
+
+    Sensors are plain callables returning a float (or None when no value is
+    available). Sensors sharing a bus are read sequentially by that bus's
+    worker, different buses run in parallel, so a slow 1-Wire conversion
+    never holds up the DHT or the GUI. With a ``scheduler``
+    (src.scheduler.PeriodicScheduler) each bus is polled by one of its tasks
+    rather than by a thread of its own.
+
+    A sensor added with a ``pipeline`` is read ``pipeline.oversample`` times
+    per period; each block of raw readings is filtered in one go and the
+    result published at ``rate_hz``. A bus runs at the highest oversampling
+    of its sensors.
+    """
+
+    def __init__(self, rate_hz=DEFAULT_RATE_HZ, maxsize=DEFAULT_QUEUE_SIZE, scheduler=None, name='acquisition'):
+        if rate_hz <= 0:
+            raise ValueError('rate_hz must be positive')
+        self.rate_hz = rate_hz
+        self.scheduler = scheduler
+        self.name = name
+        self.queue = queue.Queue(maxsize=maxsize)
+        self.latest = {}
+        # Most recent value per sensor as published by the workers; safe to
+        # read from any thread (the control loop uses it, the GUI uses latest)
+        self.current = {}
+        self.errors = 0
+        self.dropped = 0
+        self.pipelines = {}
+        self._raw = {}   # unfiltered readings collected for each pipeline
+        self._workers = {}
+        self._tasks = []
+        self._stop_event = threading.Event()
+
+    def add_sensor(self, name, read, bus='default', pipeline=None):
+        if self.running:
+            raise RuntimeError('cannot add sensors while acquisition is running')
+        worker = self._workers.get(bus)
+        if worker is None:
+            worker = self._workers[bus] = _BusWorker(self, bus)
+        worker.sensors.append((name, read))
+        if pipeline is not None:
+            self.pipelines[name] = pipeline
+            self._raw[name] = []
+
+    def bus_rate(self, bus):
+        """Polls per second on ``bus``."""
+        oversample = [self.pipelines[name].oversample
+                      for name, _ in self._workers[bus].sensors if name in self.pipelines]
+        return self.rate_hz * max(oversample, default=1)
+
+    def filter_stats(self):
+        return {name: pipeline.stats() for name, pipeline in self.pipelines.items()}
+
+    @property
+    def running(self):
+        if self._tasks:
+            return any(not task.cancelled for task in self._tasks)
+        return any(worker.is_alive() for worker in self._workers.values())
+
+    def start(self):
+        self._stop_event.clear()
+        if self.scheduler is not None:
+            self._tasks = [self.scheduler.add(f'{self.name}-{bus}', functools.partial(self.poll_sensors, worker.sensors),
+                                              1.0 / self.bus_rate(bus))
+                           for bus, worker in self._workers.items()]
+            return
+        for bus, worker in list(self._workers.items()):
+            if worker.ident is not None:
+                # Threads can only be started once, so recreate stopped workers
+                fresh = _BusWorker(self, bus)
+                fresh.sensors = worker.sensors
+                worker = self._workers[bus] = fresh
+            worker.start()
+
+    def stop(self, timeout=2.0):
+        self._stop_event.set()
+        for task in self._tasks:
+            task.cancel()
+        self._tasks = []
+        for worker in self._workers.values():
+            if worker.is_alive():
+                worker.join(timeout)
+
+    def poll_sensors(self, sensors):
+        """Read each ``(name, read)`` pair once and publish the results."""
+        for name, read in sensors:
+            try:
+                value = read()
+            except Exception as e:
+                self.errors += 1
+                print(f'Sensor {name} read failed: {e}')
+                continue
+            if value is None:
+                continue
+            pipeline = self.pipelines.get(name)
+            if pipeline is None:
+                self.publish(Reading(time.time(), name, value))
+                continue
+            # Only this bus's worker touches the sensor's raw block
+            raw = self._raw[name]
+            raw.append(value)
+            if len(raw) >= pipeline.oversample:
+                self._raw[name] = []
+                for filtered in pipeline.process(raw):
+                    self.publish(Reading(time.time(), name, float(filtered)))
+
+    def publish(self, reading):
+        self.current[reading.name] = reading.value
+        try:
+            self.queue.put_nowait(reading)
+        except queue.Full:
+            # Keep the freshest data: discard the oldest reading and retry once
+            try:
+                self.queue.get_nowait()
+            except queue.Empty:
+                pass
+            self.dropped += 1
+            try:
+                self.queue.put_nowait(reading)
+            except queue.Full:
+                pass
+
+    def drain(self):
+        """Return all pending readings (oldest first) and update ``latest``."""
+        readings = []
+        while True:
+            try:
+                reading = self.queue.get_nowait()
+            except queue.Empty:
+                break
+            readings.append(reading)
+            self.latest[reading.name] = reading.value
+        return readings
+
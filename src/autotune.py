@@ -0,0 +1,235 @@
+# autotune.py
+# PID autotuning in two stages:
+#   1. a relay-feedback experiment (Åström–Hägglund) on the real heater gives
+#      the ultimate gain/period, from which a first-order-plus-dead-time plant
+#      is identified
+#   2. candidate gains are scored against that plant in the thermal model,
+#      swept over a grid in a process pool and refined with Nelder–Mead
+
+import os
+import math
+import multiprocessing
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from src.thermal_model import simulate_pid, DEFAULT_PARAMS
+
+RELAY_CYCLES = 4          # oscillation periods to average over
+RELAY_HYSTERESIS = 0.3    # °C either side of the setpoint
+SETTLING_BAND = 0.5       # °C band for settling time
+DEFAULT_WEIGHTS = {'overshoot': 1.0, 'settling': 20.0, 'energy': 0.02, 'offset': 5.0}
+
+PlantEstimate = namedtuple('PlantEstimate', [
+    'gain',              # °C per % duty at steady state
+    'time_constant',     # s
+    'dead_time',         # s
+    'ambient',           # °C
+    'ultimate_gain',     # % per °C
+    'ultimate_period',   # s
+])
+
+
+def plant_model_params(plant, heater_power=DEFAULT_PARAMS['heater_power']):
+    """Translate an identified FOPDT plant into ChamberModel parameters."""
+    loss = heater_power / (100.0 * plant.gain)
+    return {
+        'heater_power': heater_power,
+        'loss_coefficient': loss,
+        'thermal_mass': plant.time_constant * loss,
+        'dead_time': plant.dead_time,
+        'sensor_lag': 0.0,
+        'ambient_temperature': plant.ambient,
+    }
+
+
+class RelayAutotuner:
+    """Relay-feedback experiment with the same ``update(measurement, dt)`` interface as PIDController.
+
+    Swap it into a ControlLoop: it switches the heater between
+    ``bias ± amplitude`` around the setpoint, records the resulting limit
+    cycle and sets ``result`` once ``cycles`` full periods were observed.
+    """
+
+    def __init__(self, setpoint, ambient, bias=50.0, amplitude=50.0, cycles=RELAY_CYCLES,
+                 hysteresis=RELAY_HYSTERESIS, on_complete=None):
+        self.setpoint = setpoint
+        self.ambient = ambient
+        self.bias = bias
+        self.amplitude = amplitude
+        self.cycles = cycles
+        self.hysteresis = hysteresis
+        self.on_complete = on_complete
+        self.result = None
+        self.output = bias + amplitude
+        self._heating = True
+        self._elapsed = 0.0
+        self._extreme = None       # min while heating, max while cooling
+        self._minima = []
+        self._maxima = []
+        self._switch_times = []    # heating -> cooling transitions
+        self._temp_integral = 0.0
+        self._duty_integral = 0.0
+
+    @property
+    def done(self):
+        return self.result is not None
+
+    def update(self, measurement, dt):
+        if self.done:
+            return 0.0
+        self._elapsed += dt
+        if self._switch_times:
+            # Averages over whole cycles give the static gain
+            self._temp_integral += measurement * dt
+            self._duty_integral += self.output * dt
+        if self._heating:
+            self._extreme = measurement if self._extreme is None else min(self._extreme, measurement)
+            if measurement > self.setpoint + self.hysteresis:
+                self._heating = False
+                self._minima.append(self._extreme)
+                self._switch_times.append(self._elapsed)
+                self._extreme = measurement
+                if len(self._switch_times) > self.cycles:
+                    self._finish()
+                    return 0.0
+        else:
+            self._extreme = max(self._extreme, measurement)
+            if measurement < self.setpoint - self.hysteresis:
+                self._heating = True
+                self._maxima.append(self._extreme)
+                self._extreme = measurement
+        self.output = self.bias + self.amplitude if self._heating else self.bias - self.amplitude
+        return self.output
+
+    def _finish(self):
+        # The first minimum is the heat-up from ambient, not part of the limit cycle
+        period = float(np.mean(np.diff(self._switch_times)))
+        amplitude = (np.mean(self._maxima) - np.mean(self._minima[1:])) / 2.0
+        duration = self._switch_times[-1] - self._switch_times[0]
+        ku = 4.0 * self.amplitude / (math.pi * max(amplitude, 1e-6))
+        mean_temp = self._temp_integral / duration
+        mean_duty = self._duty_integral / duration
+        self.result = identify_plant(ku, period, (mean_temp - self.ambient) / max(mean_duty, 1e-9), self.ambient)
+        self.output = 0.0
+        if self.on_complete is not None:
+            self.on_complete(self.result)
+
+
+def identify_plant(ultimate_gain, ultimate_period, static_gain, ambient):
+    """FOPDT time constant and dead time matching the relay oscillation.
+
+    For G(s) = K e^(-Ls) / (τs + 1) at the ultimate frequency ω:
+    |G| = 1/Ku gives τ, and the -180° phase condition gives L.
+    """
+    omega = 2.0 * math.pi / ultimate_period
+    loop_gain = max(static_gain * ultimate_gain, 1.0 + 1e-9)
+    tau = math.sqrt(loop_gain ** 2 - 1.0) / omega
+    dead_time = (math.pi - math.atan(omega * tau)) / omega
+    return PlantEstimate(static_gain, tau, dead_time, ambient, ultimate_gain, ultimate_period)
+
+
+def ziegler_nichols(plant):
+    """Classic PID starting point from the relay result (P, I, D in parallel form)."""
+    kp = 0.6 * plant.ultimate_gain
+    ti = plant.ultimate_period / 2.0
+    td = plant.ultimate_period / 8.0
+    return np.array([kp, kp / ti, kp * td])
+
+
+def score_gains(gains, model_params, setpoint, duration, dt=2.0, weights=DEFAULT_WEIGHTS):
+    """Cost of each ``(n, 3)`` gain row on the model.
+
+    Combines overshoot (°C), settling time (fraction of the run), heater
+    energy (Wh) and the mean error over the last quarter of the run (°C).
+    """
+    gains = np.atleast_2d(np.asarray(gains, dtype=np.float64))
+    result = simulate_pid(gains[:, 0], gains[:, 1], gains[:, 2], setpoint, duration, dt=dt, **model_params)
+    measured = result.measured
+    overshoot = np.maximum(measured.max(axis=0) - setpoint, 0.0)
+    outside = np.abs(measured - setpoint) > SETTLING_BAND
+    # Index of the last sample outside the band (0 if it never left it)
+    last_outside = np.where(outside.any(axis=0), len(measured) - np.argmax(outside[::-1], axis=0), 0)
+    settling = last_outside * dt / duration
+    energy_wh = result.duty.sum(axis=0) / 100.0 * model_params['heater_power'] * dt / 3600.0
+    offset = np.abs(measured[-len(measured) // 4:] - setpoint).mean(axis=0)
+    return (weights['overshoot'] * overshoot + weights['settling'] * settling
+            + weights['energy'] * energy_wh + weights['offset'] * offset)
+
+
+def _score_chunk(args):
+    # Module-level so the process pool can pickle it
+    gains, model_params, setpoint, duration, dt = args
+    return score_gains(gains, model_params, setpoint, duration, dt)
+
+
+def gain_grid(center, spread=4.0, points=6):
+    """Log-spaced grid of (P, I, D) around ``center``, each gain from center/spread to center*spread."""
+    axes = [np.geomspace(max(c, 1e-6) / spread, max(c, 1e-6) * spread, points) for c in center]
+    return np.stack(np.meshgrid(*axes, indexing='ij'), axis=-1).reshape(-1, 3)
+
+
+def grid_search(candidates, model_params, setpoint, duration, dt=2.0, processes=None):
+    """Score every candidate in parallel; returns (best gains, all costs)."""
+    processes = processes or os.cpu_count() or 1
+    chunks = np.array_split(candidates, max(1, min(processes, len(candidates))))
+    jobs = [(chunk, model_params, setpoint, duration, dt) for chunk in chunks if len(chunk)]
+    if processes == 1 or len(jobs) == 1:
+        costs = np.concatenate([_score_chunk(job) for job in jobs])
+    else:
+        # Spawned workers do not inherit the GUI's threads or Qt state
+        with ProcessPoolExecutor(max_workers=processes, mp_context=multiprocessing.get_context('spawn')) as pool:
+            costs = np.concatenate(list(pool.map(_score_chunk, jobs)))
+    return candidates[int(np.argmin(costs))], costs
+
+
+def nelder_mead(cost, start, step=0.3, iterations=30):
+    """Minimise ``cost`` over log-gains; ``cost`` takes an (n, 3) array and returns n costs.
+
+    Each iteration evaluates its reflection, expansion and both contractions
+    in a single batch, so one simulation run serves all four trial points.
+    """
+    x0 = np.log(np.maximum(np.asarray(start, dtype=np.float64), 1e-9))
+    simplex = np.vstack([x0] + [x0 + step * np.eye(3)[i] for i in range(3)])
+    values = cost(np.exp(simplex))
+    for _ in range(iterations):
+        order = np.argsort(values)
+        simplex, values = simplex[order], values[order]
+        centroid = simplex[:-1].mean(axis=0)
+        worst = simplex[-1]
+        trials = np.vstack([
+            centroid + (centroid - worst),        # reflection
+            centroid + 2.0 * (centroid - worst),  # expansion
+            centroid + 0.5 * (centroid - worst),  # outside contraction
+            centroid - 0.5 * (centroid - worst),  # inside contraction
+        ])
+        trial_values = cost(np.exp(trials))
+        reflected, expanded, outside, inside = trial_values
+        if reflected < values[0]:
+            pick = 1 if expanded < reflected else 0
+        elif reflected < values[-2]:
+            pick = 0
+        elif reflected < values[-1]:
+            pick = 2 if outside <= reflected else 0
+        else:
+            pick = 3 if inside < values[-1] else None
+        if pick is not None:
+            simplex[-1], values[-1] = trials[pick], trial_values[pick]
+        else:
+            # Shrink towards the best point
+            simplex[1:] = simplex[0] + 0.5 * (simplex[1:] - simplex[0])
+            values[1:] = cost(np.exp(simplex[1:]))
+    best = int(np.argmin(values))
+    return np.exp(simplex[best]), float(values[best])
+
+
+def optimize_gains(plant, setpoint, duration=3600.0, heater_power=DEFAULT_PARAMS['heater_power'],
+                   processes=None, grid_points=6, refine_iterations=30):
+    """Best (P, I, D) for the identified plant as a SettingsPage-style dict."""
+    params = plant_model_params(plant, heater_power)
+    candidates = gain_grid(ziegler_nichols(plant), points=grid_points)
+    best, _ = grid_search(candidates, params, setpoint, duration, processes=processes)
+    if refine_iterations:
+        best, _ = nelder_mead(lambda g: score_gains(g, params, setpoint, duration), best,
+                              iterations=refine_iterations)
+    p, i, d = (round(float(v), 4) for v in best)
+    return {'P': p, 'I': i, 'D': d}
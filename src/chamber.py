@@ -0,0 +1,72 @@
+# chamber.py
+# Several dryers from one process. Each Chamber has its own pins,
+# DryerController (PID loop, countdown, session log) and history; all of
+# them run on one shared PeriodicScheduler, so eight chambers cost a few
+# worker threads instead of four threads each.
+
+import os
+import time
+from src.controller import DryerController
+from src.history import TieredHistory
+from src.pin_definitions import CHAMBER_PINS, MAX_CHAMBERS
+from src.scheduler import PeriodicScheduler, DEFAULT_WORKERS
+from src.session_log import SESSION_DIR
+
+
+class Chamber:
+    """One drying chamber: controller plus the history the overview plots."""
+
+    def __init__(self, index, pins, scheduler, session_root=SESSION_DIR):
+        self.index = index
+        self.name = f'Chamber {index + 1}'
+        self.pins = pins
+        self.controller = DryerController(session_dir=os.path.join(session_root, f'chamber-{index + 1}'),
+                                          scheduler=scheduler, heater_pin=pins['heater'],
+                                          name=f'chamber{index + 1}')
+        self.history = TieredHistory()
+
+    def sample(self, now=None):
+        """Append the controller's current readings to the history."""
+        state = self.controller.state
+        temp, humidity = state['temperature'], state['humidity']
+        if temp is None and humidity is None:
+            return
+        self.history.append(time.time() if now is None else now,
+                            float('nan') if temp is None else temp,
+                            float('nan') if humidity is None else humidity,
+                            state['pwm_value'])
+
+    def close(self):
+        self.controller.close()
+
+
+class ChamberManager:
+    """``count`` chambers sharing one scheduler."""
+
+    def __init__(self, count, pins=CHAMBER_PINS, session_root=SESSION_DIR, workers=DEFAULT_WORKERS):
+        if not 1 <= count <= min(MAX_CHAMBERS, len(pins)):
+            raise ValueError(f'chamber count must be between 1 and {min(MAX_CHAMBERS, len(pins))}')
+        self.scheduler = PeriodicScheduler(workers=workers, name='chambers')
+        self.chambers = [Chamber(i, pins[i], self.scheduler, session_root) for i in range(count)]
+
+    def __iter__(self):
+        return iter(self.chambers)
+
+    def __len__(self):
+        return len(self.chambers)
+
+    def __getitem__(self, index):
+        return self.chambers[index]
+
+    def sample(self, now=None):
+        for chamber in self.chambers:
+            chamber.sample(now)
+
+    def loop_stats(self):
+        """Timing of every scheduled task (tick, PID, sensor buses) by name."""
+        return {task.name: task.stats.snapshot() for task in self.scheduler.tasks()}
+
+    def close(self):
+        for chamber in self.chambers:
+            chamber.close()
+        self.scheduler.shutdown()
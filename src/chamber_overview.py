@@ -0,0 +1,146 @@
+# chamber_overview.py
+# Overview tab for multi-chamber setups: one tile per chamber with its
+# readings, preset, start/stop and a small graph. Labels are refreshed once
+# a second while the tab is shown; graphs are drawn only for tiles that are
+# actually on screen, so scrolling past chambers costs nothing.
+
+import time
+from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QGridLayout, QLabel, QPushButton,
+                             QGroupBox, QComboBox, QScrollArea)
+from PyQt5.QtCore import QTimer
+from PyQt5.QtGui import QFont
+from src import instrumentation
+
+OVERVIEW_COLUMNS = 2
+OVERVIEW_REFRESH_MS = 1000
+TILE_GRAPH_SPAN = 3600   # seconds shown in each tile's graph
+TILE_GRAPH_POINTS = 200
+
+
+class ChamberTile(QGroupBox):
+    def __init__(self, chamber, presets):
+        super().__init__(chamber.name)
+        self.chamber = chamber
+        self.graph = None
+        layout = QVBoxLayout()
+        self.readings_label = QLabel('--°C | --%')
+        self.readings_label.setFont(QFont('Segoe UI', 16, QFont.Weight.Bold))
+        layout.addWidget(self.readings_label)
+        self.status_label = QLabel('')
+        layout.addWidget(self.status_label)
+
+        controls = QHBoxLayout()
+        self.preset_combo = QComboBox()
+        self.set_presets(presets)
+        self.preset_combo.activated.connect(self.select_preset)
+        controls.addWidget(self.preset_combo)
+        start_btn = QPushButton('Start')
+        start_btn.clicked.connect(self.start)
+        controls.addWidget(start_btn)
+        stop_btn = QPushButton('Stop')
+        stop_btn.setProperty('role', 'danger')
+        stop_btn.clicked.connect(self.stop)
+        controls.addWidget(stop_btn)
+        layout.addLayout(controls)
+
+        self.graph_layout = QVBoxLayout()
+        layout.addLayout(self.graph_layout)
+        self.setLayout(layout)
+
+    def set_presets(self, presets):
+        self.presets = presets
+        current = self.chamber.controller.state['preset']
+        self.preset_combo.clear()
+        self.preset_combo.addItems(list(presets))
+        if current in presets:
+            self.preset_combo.setCurrentText(current)
+
+    def select_preset(self, index):
+        name = self.preset_combo.itemText(index)
+        data = self.presets[name]
+        self.chamber.controller.select_preset(name, data['temperature'], data['drying_time'], data.get('segments'))
+
+    def start(self):
+        self.chamber.controller.start()
+
+    def stop(self):
+        self.chamber.controller.stop()
+
+    def on_screen(self):
+        return self.isVisible() and not self.visibleRegion().isEmpty()
+
+    def refresh(self):
+        state = self.chamber.controller.state
+        temp, humidity = state['temperature'], state['humidity']
+        self.readings_label.setText(f"{'--' if temp is None else f'{temp:.1f}'}°C | "
+                                    f"{'--' if humidity is None else f'{humidity:.0f}'}%")
+        mins, secs = divmod(state['remaining_time'], 60)
+        running = 'Drying' if state['timer_running'] else 'Idle'
+        self.status_label.setText(f"{running} | {state['preset']} {state['setpoint']:g}°C | "
+                                  f"{mins:02d}:{secs:02d} | heater {state['duty']:.0f}%")
+        if self.on_screen():
+            self.update_graph()
+
+    def update_graph(self):
+        if self.graph is None:
+            import pyqtgraph as pg
+            self.graph = pg.PlotWidget(axisItems={'bottom': pg.DateAxisItem()})
+            self.graph.setBackground('w')
+            self.graph.setMinimumHeight(140)
+            self.temp_curve = self.graph.plot(pen=pg.mkPen('r', width=2))
+            self.graph_layout.addWidget(self.graph)
+        now = time.time()
+        x, temps = self.chamber.history.window('temperature', TILE_GRAPH_SPAN, TILE_GRAPH_POINTS, now=now)
+        self.temp_curve.setData(x, temps)
+        self.graph.setXRange(now - TILE_GRAPH_SPAN, now, padding=0)
+
+
+class ChamberOverviewPage(QWidget):
+    def __init__(self, chambers, repository):
+        super().__init__()
+        self.chambers = chambers
+        self.repository = repository
+        layout = QVBoxLayout()
+        scroll = QScrollArea()
+        scroll.setWidgetResizable(True)
+        grid_host = QWidget()
+        grid = QGridLayout()
+        presets = repository.presets
+        self.tiles = []
+        for i, chamber in enumerate(chambers):
+            tile = ChamberTile(chamber, presets)
+            grid.addWidget(tile, i // OVERVIEW_COLUMNS, i % OVERVIEW_COLUMNS)
+            self.tiles.append(tile)
+        grid_host.setLayout(grid)
+        scroll.setWidget(grid_host)
+        # Scrolling brings other tiles into view; draw graphs they have never shown
+        scroll.verticalScrollBar().valueChanged.connect(lambda value: self.draw_new_graphs())
+        layout.addWidget(scroll)
+        self.setLayout(layout)
+        repository.subscribe(self.update_presets)
+        # Only refreshes while the tab is on screen
+        self.timer = QTimer(self)
+        instrumentation.connect_timer(self.timer, 'ChamberOverviewPage.timer', self.refresh)
+
+    def update_presets(self, presets):
+        for tile in self.tiles:
+            tile.set_presets(presets)
+
+    def refresh(self):
+        for tile in self.tiles:
+            tile.refresh()
+
+    def draw_new_graphs(self):
+        for tile in self.tiles:
+            if tile.graph is None and tile.on_screen():
+                tile.update_graph()
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        # After layout, so visibleRegion reflects what is on screen
+        QTimer.singleShot(0, self.refresh)
+        self.timer.start(OVERVIEW_REFRESH_MS)
+
+    def hideEvent(self, event):
+        self.timer.stop()
+        super().hideEvent(event)
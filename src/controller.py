@@ -0,0 +1,437 @@
+# controller.py
+# Everything that decides what the heater does, without any Qt: sensor
+# acquisition, the PID loop, the drying countdown, session logging and
+# autotuning. The GUI (in-process or over src.ipc) only sends commands and
+# renders the state deltas this publishes.
+
+import os
+import math
+import time
+import threading
+from src.acquisition import SensorAcquisition
+from src.filters import SensorPipeline
+from src.session_log import SESSION_DIR, SessionRecorder, recover_sessions, session_path
+from src.hardware import open_heater_pwm, chamber_sensors
+from src.pin_definitions import HEATER_PIN
+from src.pid import PIDController, ControlLoop, DEFAULT_PID_GAINS, DEFAULT_CONTROL_PERIOD
+from src.autotune import RelayAutotuner, optimize_gains
+from src.cycle_timer import CycleTimer, CHECKPOINT_FILE
+from src.profiles import ProfileRunner, soak_seconds, save_segments, load_segments
+from src.dryness_estimator import DrynessEstimator, END_MODES, end_decision
+from src.energy import EnergyMeter, ENERGY_FILE, HEATER_WATTS, PRICE_PER_KWH
+
+PROFILE_FILE = 'profile.json'  # segments of the running profile, for power-loss resume
+
+ACQUISITION_RATE_HZ = 2.0
+TICK_PERIOD = 1.0  # seconds between state publications and countdown updates
+
+# Signal conditioning per sensor (src.filters.SensorPipeline arguments).
+# Temperature is oversampled 4x and Kalman-smoothed for the PID loop; the
+# DHT cannot be read faster, so humidity only has its spikes removed and an
+# EMA applied. min_deviation stops sensor quantisation counting as outliers.
+SENSOR_FILTERS = {
+    'temperature': {'oversample': 4, 'window': 9, 'n_sigma': 3.0, 'min_deviation': 0.5,
+                    'smoothing': 'kalman', 'process_variance': 1e-3, 'measurement_variance': 0.05},
+    'humidity': {'oversample': 1, 'window': 7, 'n_sigma': 3.0, 'min_deviation': 2.0,
+                 'smoothing': 'ema', 'alpha': 0.3},
+}
+
+# End of drying from the humidity decay (src.dryness_estimator). 'monitor'
+# only predicts; 'end' stops a cycle once the spool is dry (after at least
+# min_fraction of the drying time), 'extend' adds time (up to max_extension
+# minutes) when the countdown runs out while moisture is still released,
+# 'adaptive' does both. Profiles keep their own exit_humidity instead.
+DRYNESS_POLICY = {'mode': 'monitor', 'min_fraction': 0.25, 'max_extension': 60}
+
+# Published state; subscribers receive only the keys whose value changed
+DEFAULT_STATE = {
+    'temperature': None,
+    'humidity': None,
+    'heater_on': False,
+    'duty': 0.0,
+    'pwm_value': 0,            # duty scaled to 0-255 for the status LED
+    'preset': 'PLA',
+    'setpoint': 66,
+    'drying_time': 60,         # minutes
+    'remaining_time': 3600,    # seconds
+    'timer_running': False,
+    'pid_gains': dict(DEFAULT_PID_GAINS),
+    'pid_output': 0.0,
+    'loop_stats': {},
+    'autotune_status': '',
+    'autotune_gains': None,
+    'cycle_notice': '',        # what happened to a cycle interrupted by a power cut
+    'segments': None,          # ramp/soak profile of the preset (src.profiles), if any
+    'profile_status': '',
+    'filter_stats': {},        # per sensor: raw samples filtered and outliers rejected
+    'end_mode': 'monitor',     # DRYNESS_POLICY mode
+    'dryness_status': '',      # moisture release and predicted time to dry
+    'power': 0.0,              # heater W now
+    'energy': {},              # EnergyMeter.snapshot(): kWh and cost of the cycle, today and in total
+}
+
+
+class DryerController:
+    """Headless owner of the heater and everything that drives it.
+
+    Commands may be called from any thread. A service thread drains the
+    sensors every ``tick_period`` seconds, logs the run, advances the
+    countdown and publishes the changed state keys to every subscriber (on
+    that thread, so callbacks must be quick and thread-safe).
+
+    Given a ``scheduler`` (src.scheduler.PeriodicScheduler), the service
+    tick, sensor polling and PID loop run as tasks on its shared workers
+    instead of on threads of their own, which is how several chambers
+    share one process.
+    """
+
+    def __init__(self, session_dir=SESSION_DIR, tick_period=TICK_PERIOD, scheduler=None,
+                 heater_pin=HEATER_PIN, name='dryer', sensor_filters=SENSOR_FILTERS,
+                 dryness_policy=DRYNESS_POLICY, heater_watts=HEATER_WATTS, price_per_kwh=PRICE_PER_KWH):
+        self.session_dir = session_dir
+        self.tick_period = tick_period
+        self.scheduler = scheduler
+        self.name = name
+        self.recorder = None
+        # Run logs: close out anything a crash or power cut left open
+        for path, header in recover_sessions(self.session_dir):
+            print(f'Recovered session {path}: {header.count} samples')
+        self.dryness_policy = dict(DRYNESS_POLICY, **(dryness_policy or {}))
+        if self.dryness_policy['mode'] not in END_MODES:
+            raise ValueError(f"unknown end mode {self.dryness_policy['mode']!r}")
+        self._state = dict(DEFAULT_STATE, pid_gains=dict(DEFAULT_PID_GAINS), end_mode=self.dryness_policy['mode'])
+        self._state_lock = threading.Lock()
+        self._lock = threading.RLock()  # serialises commands and ticks
+        self._subscribers = []
+        # Countdown to a monotonic deadline, checkpointed for power-loss resume
+        self.cycle = CycleTimer(os.path.join(self.session_dir, CHECKPOINT_FILE))
+        self.profile = None  # ProfileRunner while a segmented preset runs
+        self.dryness = None  # DrynessEstimator while a cycle runs
+        self._cycle_started = None
+        self._extended = 0   # seconds added to the countdown by the end mode
+        self._duty = 0.0
+        # Heater kWh from the duty, per cycle, preset and day
+        self.energy = EnergyMeter(os.path.join(self.session_dir, ENERGY_FILE), heater_watts, price_per_kwh)
+        # Sensors are polled on their own threads
+        read_temperature, read_humidity = chamber_sensors(heater_pin)
+        self.acquisition = SensorAcquisition(rate_hz=ACQUISITION_RATE_HZ, scheduler=scheduler,
+                                             name=f'{name}-acquisition')
+        filters = sensor_filters or {}
+        for sensor, read in (('temperature', read_temperature), ('humidity', read_humidity)):
+            pipeline = None
+            if sensor in filters:
+                config = dict(filters[sensor])
+                # Hardware sensors say how often they have a fresh value (src.sensors)
+                max_rate = getattr(read, 'max_rate_hz', None)
+                if max_rate:
+                    config['oversample'] = max(1, min(config.get('oversample', 1),
+                                                      int(max_rate // ACQUISITION_RATE_HZ)))
+                pipeline = SensorPipeline(**config)
+            self.acquisition.add_sensor(sensor, read, bus=sensor, pipeline=pipeline)
+        self.acquisition.start()
+        # Heater PWM, driven by a PID loop on its own fixed-period thread
+        self.heater_pwm = open_heater_pwm(heater_pin)
+        self.pid = PIDController(DEFAULT_PID_GAINS['P'], DEFAULT_PID_GAINS['I'], DEFAULT_PID_GAINS['D'],
+                                 setpoint=self._state['setpoint'])
+        self.control_loop = ControlLoop(self.pid,
+                                        lambda: self.acquisition.current.get('temperature'),
+                                        self.set_heater_duty,
+                                        period=DEFAULT_CONTROL_PERIOD,
+                                        scheduler=scheduler, name=f'{name}-pid')
+        self._stop_event = threading.Event()
+        if scheduler is not None:
+            self._thread = None
+            self._tick_task = scheduler.add(f'{name}-tick', self.tick, tick_period)
+        else:
+            self._tick_task = None
+            self._thread = threading.Thread(target=self._run, name='dryer-controller', daemon=True)
+            self._thread.start()
+        self._restore_cycle()
+
+    # State and subscriptions
+
+    @property
+    def state(self):
+        """Copy of the full current state."""
+        with self._state_lock:
+            return dict(self._state)
+
+    def subscribe(self, callback):
+        """Call ``callback(delta)`` with the changed keys after every update."""
+        self._subscribers.append(callback)
+
+    def unsubscribe(self, callback):
+        if callback in self._subscribers:
+            self._subscribers.remove(callback)
+
+    def _update(self, **values):
+        with self._state_lock:
+            delta = {key: value for key, value in values.items() if self._state.get(key) != value}
+            self._state.update(delta)
+        if delta:
+            for callback in list(self._subscribers):
+                try:
+                    callback(delta)
+                except Exception as e:
+                    print(f'State subscriber failed: {e}')
+        return delta
+
+    # Commands
+
+    def start(self):
+        with self._lock:
+            state = self.state
+            print(f'Dryer started at {state["temperature"]}°C')
+            # The PID loop owns the heater duty from here on
+            self.control_loop.set_setpoint(state['setpoint'])
+            if not self.control_loop.running:
+                self.pid.reset()
+                self.control_loop.start()
+            self.cycle.start(state['remaining_time'], state['preset'], state['setpoint'], state['drying_time'])
+            if state['segments']:
+                self._start_profile(state['segments'], state['remaining_time'])
+            if state['end_mode'] != 'off':
+                self.dryness = DrynessEstimator()
+            self._cycle_started = time.monotonic()
+            self._extended = 0
+            self.energy.start_cycle(state['preset'])
+            if self.recorder is None:
+                os.makedirs(self.session_dir, exist_ok=True)
+                start = time.time()
+                self.recorder = SessionRecorder(session_path(self.session_dir, start), start_time=start,
+                                                preset=state['preset'])
+            self._update(heater_on=True, timer_running=True, cycle_notice='')
+
+    def stop(self):
+        with self._lock:
+            print('Dryer stopped')
+            self.control_loop.stop()
+            # Also abandons a running relay experiment
+            self.control_loop.set_controller(self.pid)
+            self.cycle.stop()
+            self.profile = None
+            self.dryness = None
+            kwh = self.energy.end_cycle()
+            if kwh is not None:
+                print(f'Cycle used {kwh:.3f} kWh')
+            if self.recorder is not None:
+                self.recorder.close()
+                self.recorder = None
+            self._update(heater_on=False, timer_running=False, duty=0.0, pwm_value=0, profile_status='',
+                         dryness_status='', power=0.0, energy=self.energy.snapshot())
+
+    def select_preset(self, name, temperature, drying_time, segments=None):
+        """Use a preset's setpoint and drying time (minutes); resets the countdown.
+
+        With ``segments`` (validated, as in presets.json) the preset runs as a
+        ramp/soak profile and the countdown is its total soak time.
+        """
+        with self._lock:
+            segments = segments or None
+            remaining = int(soak_seconds(segments) if segments else drying_time * 60)
+            self.cycle.change(remaining, name, temperature, drying_time)
+            self.energy.change_preset(name)
+            if segments and self.cycle.running:
+                self._start_profile(segments, remaining)
+            else:
+                self.profile = None
+                self.control_loop.set_setpoint(temperature)
+            self._update(preset=name, setpoint=temperature, drying_time=drying_time, remaining_time=remaining,
+                         segments=segments, profile_status='')
+
+    def _start_profile(self, segments, remaining):
+        self.profile = ProfileRunner(segments)
+        self.profile.seek(remaining)
+        self.profile.start(time.monotonic(), self.acquisition.current.get('temperature'))
+        self.control_loop.set_setpoint(self.profile.setpoint)
+        save_segments(os.path.join(self.session_dir, PROFILE_FILE), segments, self.state['preset'])
+
+    def set_end_mode(self, mode):
+        """How the humidity decay may end the cycle: one of END_MODES."""
+        if mode not in END_MODES:
+            raise ValueError(f'unknown end mode {mode!r}')
+        with self._lock:
+            self.dryness_policy['mode'] = mode
+            if mode == 'off':
+                self.dryness = None
+            elif self.dryness is None and self.cycle.running:
+                self.dryness = DrynessEstimator()
+            self._update(end_mode=mode, dryness_status='' if mode == 'off' else self.state['dryness_status'])
+
+    def set_pid_gains(self, gains):
+        self.control_loop.set_gains(gains['P'], gains['I'], gains['D'])
+        self._update(pid_gains=dict(gains))
+
+    def set_heater_duty(self, duty):
+        """Apply a heater duty in percent (called from the control loop thread)."""
+        self.heater_pwm.ChangeDutyCycle(duty)
+        self._duty = duty
+        self.energy.update(duty)
+
+    def start_autotune(self):
+        """Run a relay experiment at the current setpoint, then optimise gains for it."""
+        with self._lock:
+            if self.control_loop.running:
+                self._update(autotune_status='Stop the dryer before autotuning.')
+                return
+            setpoint = self.state['setpoint']
+            ambient = self.acquisition.current.get('temperature', 25.0)
+            tuner = RelayAutotuner(setpoint, ambient, on_complete=self._relay_complete)
+            self.control_loop.set_controller(tuner)
+            self.control_loop.start()
+            self._update(heater_on=True, autotune_gains=None,
+                         autotune_status=f'Autotune: relay test at {setpoint}°C...')
+
+    def _relay_complete(self, plant):
+        # Called on the control thread; the loop cannot be joined from there
+        threading.Thread(target=self._finish_autotune, args=(plant,), daemon=True).start()
+
+    def _finish_autotune(self, plant):
+        with self._lock:
+            self.control_loop.stop()
+            self.control_loop.set_controller(self.pid)
+            self._update(heater_on=False,
+                         autotune_status=f'Autotune: plant gain {plant.gain:.2f}°C/%, time constant '
+                                         f'{plant.time_constant:.0f}s, dead time {plant.dead_time:.0f}s; '
+                                         f'optimising gains...')
+        try:
+            gains = optimize_gains(plant, self.state['setpoint'])
+        except Exception as e:
+            self._update(autotune_status=f'Autotune failed: {e}')
+            return
+        self._update(autotune_gains=gains,
+                     autotune_status=f"Autotune done: P={gains['P']}, I={gains['I']}, D={gains['D']}")
+
+    def close(self):
+        """Stop every thread and switch the heater off."""
+        self._stop_event.set()
+        if self._tick_task is not None:
+            self._tick_task.cancel()
+        elif self._thread.is_alive() and self._thread is not threading.current_thread():
+            self._thread.join(2.0)
+        with self._lock:
+            self.control_loop.stop()
+            self.heater_pwm.stop()
+            self.acquisition.stop()
+            if self.recorder is not None:
+                self.recorder.close()
+                self.recorder = None
+            # A running cycle stays checkpointed, so a restart resumes it
+            self.cycle.close()
+            self.energy.close()
+
+    def _restore_cycle(self):
+        action, checkpoint, outage = self.cycle.restore()
+        if action != 'resume':
+            # The energy of a cycle that will not resume is booked as it stands
+            self.energy.end_cycle()
+        if action is None:
+            return
+        mins, secs = divmod(int(checkpoint.remaining), 60)
+        if action == 'abort':
+            notice = (f'{checkpoint.preset} cycle aborted: power was off for {outage / 60:.0f} min '
+                      f'with {mins:02d}:{secs:02d} left')
+            print(notice)
+            self._update(cycle_notice=notice)
+            return
+        notice = f'Resumed {checkpoint.preset} cycle with {mins:02d}:{secs:02d} left'
+        print(notice)
+        # Stored as doubles; whole numbers go back to the ints presets use
+        setpoint, drying_time = (int(v) if v.is_integer() else v
+                                 for v in (checkpoint.setpoint, checkpoint.drying_time))
+        # A profile picks up at the stage its remaining soak time falls in
+        segments = load_segments(os.path.join(self.session_dir, PROFILE_FILE), checkpoint.preset)
+        self._update(preset=checkpoint.preset, setpoint=setpoint, segments=segments,
+                     drying_time=drying_time, remaining_time=int(checkpoint.remaining))
+        self.start()
+        self._update(cycle_notice=notice)
+
+    # Service thread
+
+    def tick(self, now=None):
+        """Drain sensors, log, advance the countdown and publish the new state."""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            state = self.state
+            humidity = self.acquisition.latest.get('humidity', float('nan'))
+            readings = self.acquisition.drain()
+            duty = self._duty if self.control_loop.running else 0.0
+            if self.recorder is not None:
+                # The log keeps every temperature reading, not just one per tick
+                for reading in readings:
+                    if reading.name == 'humidity':
+                        humidity = reading.value
+                    elif reading.name == 'temperature':
+                        self.recorder.append(reading.timestamp, reading.value, humidity,
+                                             int(round(duty * 255 / 100)), self.pid.setpoint)
+            remaining = state['remaining_time']
+            profile_status = state['profile_status']
+            temperature = self.acquisition.latest.get('temperature')
+            if self.profile is not None:
+                # Soak time only passes inside the tolerance band, so the
+                # countdown follows the profile rather than the clock
+                setpoint = self.profile.update(now, temperature, self.acquisition.latest.get('humidity'))
+                if setpoint != self.pid.setpoint:
+                    self.control_loop.set_setpoint(setpoint)
+                remaining = int(math.ceil(self.profile.remaining()))
+                self.cycle.hold(remaining, now)
+                profile_status = self.profile.status(temperature)
+            elif self.cycle.running:
+                remaining = self.cycle.tick(now)
+            dryness_status = state['dryness_status']
+            ended_early = None
+            if self.dryness is not None:
+                self.dryness.update(now, temperature, self.acquisition.latest.get('humidity'))
+                dryness_status = self.dryness.status()
+                if self.profile is None and self.cycle.running:
+                    policy = self.dryness_policy
+                    elapsed = now - self._cycle_started
+                    decision = end_decision(self.dryness.estimate(), policy['mode'], elapsed,
+                                            state['drying_time'] * 60, remaining, self._extended,
+                                            policy['min_fraction'], policy['max_extension'] * 60)
+                    if decision == 0:
+                        mins = remaining // 60
+                        ended_early = f'Dry after {elapsed / 60:.0f} min, ended {mins} min early'
+                        print(ended_early)
+                    elif decision is not None:
+                        self._extended += decision
+                        print(f'Still releasing moisture, drying {decision / 60:.0f} min longer')
+                    if decision is not None:
+                        remaining = decision
+                        self.cycle.hold(remaining, now)
+            # On the meter's own clock; the duty changes come from the control thread
+            self.energy.update()
+            self.energy.save()
+            controller = self.control_loop.controller
+            self._update(power=round(self.energy.power, 1),
+                         energy=self.energy.snapshot(),
+                         temperature=temperature,
+                         humidity=self.acquisition.latest.get('humidity'),
+                         duty=duty,
+                         pwm_value=int(round(duty * 255 / 100)),
+                         remaining_time=remaining,
+                         profile_status=profile_status,
+                         dryness_status=dryness_status,
+                         pid_output=float(controller.output),
+                         loop_stats=self.control_loop.stats.snapshot(),
+                         filter_stats=self.acquisition.filter_stats())
+            if self.profile is not None:
+                finished = self.profile.done
+            else:
+                finished = self.cycle.running and remaining == 0
+            if finished:
+                self.stop()
+                if ended_early:
+                    self._update(dryness_status=ended_early)
+
+    def _run(self):
+        deadline = time.monotonic()
+        while not self._stop_event.is_set():
+            try:
+                self.tick()
+            except Exception as e:
+                print(f'Controller tick failed: {e}')
+            deadline += self.tick_period
+            if deadline < time.monotonic():
+                deadline = time.monotonic()
+            self._stop_event.wait(deadline - time.monotonic())
@@ -0,0 +1,185 @@
+# cycle_timer.py
+# The drying countdown as an absolute monotonic deadline: the remaining time
+# is always derived from the deadline, never decremented per tick, so late
+# or coalesced ticks cannot stretch a cycle.
+#
+# The cycle is checkpointed to a tiny file so a power cut does not lose it.
+# The file holds two fixed-size slots written alternately with a sequence
+# number and CRC; a write torn by the power cut leaves the other slot intact.
+# Checkpoints are an in-place pwrite of one slot, at most every
+# CHECKPOINT_INTERVAL seconds while running and on every start/stop/change.
+
+import os
+import math
+import time
+import zlib
+import struct
+from collections import namedtuple
+
+CHECKPOINT_FILE = 'cycle.ckpt'
+CHECKPOINT_INTERVAL = 30.0   # seconds between checkpoints of a running cycle
+RESUME_MAX_OUTAGE = 30 * 60  # longer power cuts abort the cycle instead of resuming
+
+MAGIC = b'FDCYCLE1'
+SLOT_FORMAT = '<8sIIdddd32s'  # magic, seq, flags, saved at (wall clock), remaining, setpoint, drying time, preset
+SLOT_SIZE = struct.calcsize(SLOT_FORMAT) + 4  # plus CRC
+FLAG_RUNNING = 0x1
+
+Checkpoint = namedtuple('Checkpoint', 'running saved_at remaining setpoint drying_time preset seq')
+
+
+def pack_slot(checkpoint):
+    data = struct.pack(SLOT_FORMAT, MAGIC, checkpoint.seq, FLAG_RUNNING if checkpoint.running else 0,
+                       checkpoint.saved_at, checkpoint.remaining, checkpoint.setpoint,
+                       checkpoint.drying_time, checkpoint.preset.encode('utf-8')[:32])
+    return data + struct.pack('<I', zlib.crc32(data))
+
+
+def unpack_slot(data):
+    """The checkpoint in one slot, or None if it is empty, torn or foreign."""
+    if len(data) < SLOT_SIZE:
+        return None
+    body, (crc,) = data[:SLOT_SIZE - 4], struct.unpack('<I', data[SLOT_SIZE - 4:SLOT_SIZE])
+    if zlib.crc32(body) != crc:
+        return None
+    magic, seq, flags, saved_at, remaining, setpoint, drying_time, preset = struct.unpack(SLOT_FORMAT, body)
+    if magic != MAGIC:
+        return None
+    preset = preset.rstrip(b'\0').decode('utf-8', errors='replace')
+    return Checkpoint(bool(flags & FLAG_RUNNING), saved_at, remaining, setpoint, drying_time, preset, seq)
+
+
+def load_checkpoint(path):
+    """Newest valid checkpoint in ``path``, or None."""
+    try:
+        with open(path, 'rb') as file:
+            data = file.read(2 * SLOT_SIZE)
+    except FileNotFoundError:
+        return None
+    except OSError as e:
+        print(f'Could not read cycle checkpoint {path}: {e}')
+        return None
+    slots = [unpack_slot(data[i * SLOT_SIZE:(i + 1) * SLOT_SIZE]) for i in range(2)]
+    slots = [slot for slot in slots if slot is not None]
+    return max(slots, key=lambda slot: slot.seq) if slots else None
+
+
+class CycleTimer:
+    """Countdown to a monotonic deadline, checkpointed to ``path`` (None: not persisted)."""
+
+    def __init__(self, path=None, checkpoint_interval=CHECKPOINT_INTERVAL,
+                 clock=time.monotonic, wall_clock=time.time):
+        self.path = path
+        self.checkpoint_interval = checkpoint_interval
+        self.clock = clock
+        self.wall_clock = wall_clock
+        self.deadline = None
+        self.preset = ''
+        self.setpoint = 0.0
+        self.drying_time = 0.0
+        self._fd = None
+        self._last_checkpoint = None
+        last = load_checkpoint(path) if path else None
+        self._seq = last.seq if last is not None else 0
+
+    @property
+    def running(self):
+        return self.deadline is not None
+
+    def remaining(self, now=None):
+        """Seconds left (float), or None when no cycle is running."""
+        if self.deadline is None:
+            return None
+        return max(0.0, self.deadline - (self.clock() if now is None else now))
+
+    def start(self, remaining, preset, setpoint, drying_time):
+        self.deadline = self.clock() + remaining
+        self.preset, self.setpoint, self.drying_time = preset, setpoint, drying_time
+        self.checkpoint()
+
+    def change(self, remaining, preset, setpoint, drying_time):
+        """New preset mid-cycle: restart the countdown from ``remaining``."""
+        self.preset, self.setpoint, self.drying_time = preset, setpoint, drying_time
+        if self.deadline is not None:
+            self.deadline = self.clock() + remaining
+            self.checkpoint()
+
+    def stop(self):
+        """End the cycle; the checkpoint then says there is nothing to resume."""
+        was_running = self.deadline is not None
+        self.deadline = None
+        if was_running:
+            self.checkpoint()
+
+    def hold(self, remaining, now=None):
+        """Re-anchor the deadline to ``remaining`` seconds from now.
+
+        For countdowns that only run under some condition (a profile's soak
+        time), so the checkpoint still records the right remaining time.
+        """
+        now = self.clock() if now is None else now
+        if self.deadline is None:
+            return
+        self.deadline = now + remaining
+        if self._last_checkpoint is None or now - self._last_checkpoint >= self.checkpoint_interval:
+            self.checkpoint(now)
+
+    def tick(self, now=None):
+        """Whole seconds left (rounded up); checkpoints when one is due."""
+        now = self.clock() if now is None else now
+        remaining = self.remaining(now)
+        if remaining is None:
+            return None
+        if self._last_checkpoint is None or now - self._last_checkpoint >= self.checkpoint_interval:
+            self.checkpoint(now)
+        return int(math.ceil(remaining))
+
+    def checkpoint(self, now=None):
+        if not self.path:
+            return
+        now = self.clock() if now is None else now
+        self._last_checkpoint = now
+        self._seq += 1
+        remaining = self.remaining(now)
+        data = pack_slot(Checkpoint(remaining is not None, self.wall_clock(), remaining or 0.0,
+                                    float(self.setpoint), float(self.drying_time), self.preset, self._seq))
+        try:
+            if self._fd is None:
+                os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+                self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+            os.pwrite(self._fd, data, (self._seq % 2) * SLOT_SIZE)
+            # Data only: the file never changes size after the first two writes
+            getattr(os, 'fdatasync', os.fsync)(self._fd)
+        except OSError as e:
+            print(f'Could not write cycle checkpoint {self.path}: {e}')
+
+    def restore(self, max_outage=RESUME_MAX_OUTAGE):
+        """Decide what to do with a cycle interrupted by a power cut or crash.
+
+        Returns ``(action, checkpoint, outage)``: action is None if no cycle
+        was running, 'resume' or 'abort'. A cycle resumes with the remaining
+        time it had at its last checkpoint (the chamber was not drying while
+        off) and is aborted if the power was off longer than ``max_outage``.
+        A wall clock that went backwards (a Pi without RTC before NTP sync)
+        counts as no outage. The caller starts a resumed cycle itself.
+        """
+        checkpoint = load_checkpoint(self.path) if self.path else None
+        if checkpoint is None or not checkpoint.running:
+            return None, checkpoint, 0.0
+        outage = max(0.0, self.wall_clock() - checkpoint.saved_at)
+        if outage > max_outage:
+            # Record the abort so the next start does not ask again
+            self.preset, self.setpoint, self.drying_time = (checkpoint.preset, checkpoint.setpoint,
+                                                            checkpoint.drying_time)
+            self.deadline = self.clock()
+            self.stop()
+            return 'abort', checkpoint, outage
+        return 'resume', checkpoint, outage
+
+    def close(self):
+        """Checkpoint a running cycle one last time and release the file."""
+        if self.deadline is not None:
+            self.checkpoint()
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
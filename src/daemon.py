@@ -0,0 +1,46 @@
+# daemon.py
+# Headless dryer service: runs the DryerController (heater, sensors, PID,
+# countdown, logging) without PyQt and serves it to GUI clients over a Unix
+# socket (src.ipc). Start it with
+#
+#   python -m src.daemon [--socket PATH] [--session-dir DIR]
+#
+# and point the GUI at it with ``--connect PATH`` or FD_DAEMON_SOCKET.
+
+import sys
+import signal
+import argparse
+import threading
+from src.controller import DryerController
+from src.ipc import ControlServer, DEFAULT_SOCKET_PATH
+from src.session_log import SESSION_DIR
+
+
+def run(socket_path=DEFAULT_SOCKET_PATH, session_dir=SESSION_DIR):
+    """Serve until SIGINT/SIGTERM, then switch the heater off and exit."""
+    controller = DryerController(session_dir=session_dir)
+    server = ControlServer(controller, socket_path)
+    server.start()
+    print(f'Dryer daemon listening on {socket_path}')
+    stop_event = threading.Event()
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *args: stop_event.set())
+    try:
+        while not stop_event.wait(1.0):
+            pass
+    finally:
+        server.stop()
+        controller.close()
+        print('Dryer daemon stopped')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Headless filament dryer control daemon')
+    parser.add_argument('--socket', default=DEFAULT_SOCKET_PATH, help='Unix socket to listen on')
+    parser.add_argument('--session-dir', default=SESSION_DIR, help='directory for run logs')
+    args = parser.parse_args(argv)
+    run(args.socket, args.session_dir)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,17 +1,49 @@
-from PyQt5.QtWidgets import QWidget, QVBoxLayout, QLabel, QTextEdit, QPushButton
-from PyQt5.QtCore import QTimer
+import threading
+from PyQt5.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QTableView, QHeaderView,
+                             QComboBox)
+from PyQt5.QtCore import QTimer, pyqtSignal
 from PyQt5.QtGui import QFont
-import traceback
+from src import instrumentation
+from src.diagnostics_model import DiagnosticsModel
+from src.exporter import EXPORT_DIR, EXPORT_FORMATS, parquet_available, export_sessions
+from src.session_log import SESSION_DIR, list_sessions
+
+STAT_HEADERS = ('Signal', 'Last', 'Min', 'Max', 'Mean', 'Std dev', 'Slope /min', 'Samples')
+LATENCY_HEADERS = ('Callback', 'Calls', 'Run p50 ms', 'Run p99 ms', 'Run max ms', 'Late p99 ms', 'Late max ms')
+DEBUG_REFRESH_MS = 1000
+
+
+def make_table(model):
+    view = QTableView()
+    view.setModel(model)
+    view.setFont(QFont('Consolas', 12))
+    view.verticalHeader().setVisible(False)
+    view.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+    view.setEditTriggers(QTableView.EditTrigger.NoEditTriggers)
+    return view
+
 
 class DebuggingPage(QWidget):
+    # Result of a session export, from its worker thread
+    export_finished = pyqtSignal(str)
+
     def __init__(self, main_page=None, settings_page=None):
         super().__init__()
         self.main_page = main_page
         self.settings_page = settings_page
         self.init_ui()
-        self.timer = QTimer()
-        self.timer.timeout.connect(self.update_debug_info)
-        self.timer.start(1000)
+        # Only refreshes while the tab is on screen; hidden, the page costs nothing
+        self.timer = QTimer(self)
+        instrumentation.connect_timer(self.timer, 'DebuggingPage.timer', self.update_debug_info)
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.update_debug_info()
+        self.timer.start(DEBUG_REFRESH_MS)
+
+    def hideEvent(self, event):
+        self.timer.stop()
+        super().hideEvent(event)
 
     def init_ui(self):
         layout = QVBoxLayout()
@@ -19,33 +51,141 @@ class DebuggingPage(QWidget):
         title.setFont(QFont('Arial', 20, QFont.Weight.Bold))
         layout.addWidget(title)
 
-        self.debug_text = QTextEdit()
-        self.debug_text.setReadOnly(True)
-        self.debug_text.setFont(QFont('Consolas', 12))
-        layout.addWidget(self.debug_text)
+        # Rolling statistics over the last few minutes of samples
+        self.stats_model = DiagnosticsModel(STAT_HEADERS)
+        self.stats_view = make_table(self.stats_model)
+        layout.addWidget(self.stats_view)
+
+        # Internal counters and state, one row each
+        self.counters_model = DiagnosticsModel(('Counter', 'Value'))
+        self.counters_view = make_table(self.counters_model)
+        layout.addWidget(self.counters_view, 2)
+
+        # GUI-thread callback timings and event-loop stalls
+        self.latency_model = DiagnosticsModel(LATENCY_HEADERS)
+        self.latency_view = make_table(self.latency_model)
+        layout.addWidget(self.latency_view, 2)
 
+        buttons = QHBoxLayout()
         refresh_btn = QPushButton('Refresh Now')
         refresh_btn.clicked.connect(self.update_debug_info)
-        layout.addWidget(refresh_btn)
+        buttons.addWidget(refresh_btn)
+        dump_btn = QPushButton('Dump Latency Report')
+        dump_btn.clicked.connect(self.dump_latency_report)
+        buttons.addWidget(dump_btn)
+        reset_btn = QPushButton('Reset Latency')
+        reset_btn.clicked.connect(instrumentation.reset)
+        buttons.addWidget(reset_btn)
+        layout.addLayout(buttons)
+        self.dump_label = QLabel('')
+        layout.addWidget(self.dump_label)
+
+        # Run logs to CSV/NPZ/Parquet in EXPORT_DIR, off the GUI thread
+        export_row = QHBoxLayout()
+        self.export_format = QComboBox()
+        for fmt in EXPORT_FORMATS:
+            if fmt != 'parquet' or parquet_available():
+                self.export_format.addItem(fmt.upper(), fmt)
+        export_row.addWidget(self.export_format)
+        self.export_btn = QPushButton('Export Sessions')
+        self.export_btn.clicked.connect(self.export_sessions)
+        export_row.addWidget(self.export_btn, 1)
+        layout.addLayout(export_row)
+        self.export_label = QLabel('')
+        self.export_label.setWordWrap(True)
+        layout.addWidget(self.export_label)
+        self.export_finished.connect(self.show_export_result)
 
         self.setLayout(layout)
         self.update_debug_info()
 
+    def collect_stats(self):
+        rows = {}
+        for name, stats in getattr(self.main_page, 'stats', {}).items():
+            s = stats.summary()
+            slope = None if s['slope'] is None else s['slope'] * 60
+            rows[name] = (s['last'], s['min'], s['max'], s['mean'], s['stddev'], slope, s['count'])
+        return rows
+
+    def collect_counters(self):
+        rows = {}
+        page = self.main_page
+        if page is not None:
+            rows['Selected Preset'] = (page.selected_preset,)
+            rows['Target Temperature'] = (page.target_temperature,)
+            rows['Remaining Time'] = (page.remaining_time,)
+            rows['Timer Running'] = (page.timer_running,)
+            controller = getattr(page, 'controller', None)
+            if controller is not None:
+                state = controller.state
+                rows['PID Gains'] = (state.get('pid_gains'),)
+                rows['PID Output %'] = (state.get('pid_output'),)
+                stats = state.get('loop_stats') or {}
+                if stats:
+                    rows['Loop Iterations'] = (stats['iterations'],)
+                    rows['Loop Overruns'] = (stats['overruns'],)
+                    rows['Loop Jitter mean/max ms'] = (f'{stats["jitter_mean"] * 1000:.2f} / {stats["jitter_max"] * 1000:.2f}',)
+                    rows['Loop Exec mean/max ms'] = (f'{stats["exec_mean"] * 1000:.2f} / {stats["exec_max"] * 1000:.2f}',)
+                for sensor, counts in (state.get('filter_stats') or {}).items():
+                    rows[f'Filter {sensor} samples/rejected'] = (f"{counts['samples']} / {counts['rejected']}",)
+                energy = state.get('energy') or {}
+                if energy:
+                    rows['Heater Power W'] = (state.get('power'),)
+                    rows['Energy today / total kWh'] = (f"{energy['today_kwh']:.3f} / {energy['total_kwh']:.3f}",)
+                    rows['Energy last cycle kWh'] = (energy['last_cycle_kwh'],)
+                meter = getattr(controller, 'energy', None)
+                if meter is not None:
+                    for preset, totals in meter.preset_totals().items():
+                        rows[f'Energy {preset} kWh/cycles'] = (f"{totals['kwh']:.3f} / {totals['cycles']}",)
+                if 'connected' in state:
+                    rows['Daemon Connected'] = (state['connected'],)
+            history = getattr(page, 'history', None)
+            if history is not None:
+                for tier in history.tiers:
+                    rows[f'History Tier {tier.resolution}s'] = (f'{len(tier.buffer)}/{tier.buffer.capacity}',)
+            rows['Presets'] = (len(page.presets),)
+        return rows
+
+    def collect_latency(self):
+        # Seconds from the histograms, shown in ms
+        return {name: (calls,) + tuple(None if v is None else v * 1000 for v in values)
+                for name, (calls, *values) in instrumentation.rows().items()}
+
+    def dump_latency_report(self):
+        try:
+            path = instrumentation.dump()
+            self.dump_label.setText(f'Latency report written to {path}')
+        except OSError as e:
+            self.dump_label.setText(f'Could not write latency report: {e}')
+
+    def export_sessions(self):
+        controller = getattr(self.main_page, 'controller', None)
+        # A daemon's logs are only reachable here if it shares the directory
+        session_dir = getattr(controller, 'session_dir', SESSION_DIR)
+        fmt = self.export_format.currentData()
+        self.export_btn.setEnabled(False)
+        self.export_label.setText(f'Exporting {session_dir} as {fmt}...')
+
+        def run():
+            try:
+                written, errors = export_sessions(list_sessions(session_dir), EXPORT_DIR, fmt)
+                lines = [f'{len(written)} session(s) exported to {EXPORT_DIR}' if written else
+                         'All sessions already exported']
+                lines += [f'Could not export {error}' for error in errors]
+            except Exception as e:
+                lines = [f'Export failed: {e}']
+            self.export_finished.emit('\n'.join(lines))
+        threading.Thread(target=run, name='session-export', daemon=True).start()
+
+    def show_export_result(self, text):
+        self.export_label.setText(text)
+        self.export_btn.setEnabled(True)
+
     def update_debug_info(self):
-        info = []
+        # Cells whose text is unchanged are not touched
         try:
-            if self.main_page:
-                info.append('--- Main Page State ---')
-                info.append(f'Selected Preset: {getattr(self.main_page, "selected_preset", None)}')
-                info.append(f'Target Temperature: {getattr(self.main_page, "target_temperature", None)}')
-                info.append(f'Remaining Time: {getattr(self.main_page, "remaining_time", None)}')
-                info.append(f'Timer Running: {getattr(self.main_page, "timer_running", None)}')
-                info.append(f'Temperature History: {getattr(self.main_page, "temperature_history", None)}')
-                info.append(f'Humidity History: {getattr(self.main_page, "humidity_history", None)}')
-            if self.settings_page:
-                info.append('\n--- Settings Page State ---')
-                info.append(f'Presets: {getattr(self.settings_page, "presets", None)}')
+            self.stats_model.update(self.collect_stats())
+            self.counters_model.update(self.collect_counters())
+            self.latency_model.update(self.collect_latency())
         except Exception as e:
-            info.append('Error reading state:')
-            info.append(traceback.format_exc())
-        self.debug_text.setPlainText('\n'.join(str(i) for i in info))
+            print(f'Error reading diagnostics: {e}')
@@ -0,0 +1,71 @@
+# diagnostics_model.py
+# Table model for the Debug tab. Rows are keyed; each refresh formats the
+# new values and emits dataChanged only for cells whose text differs, so the
+# view repaints a handful of cells and keeps its scroll position and
+# selection instead of being reset.
+
+from PyQt5.QtCore import Qt, QAbstractTableModel, QModelIndex
+
+
+def format_value(value):
+    if value is None:
+        return '--'
+    if isinstance(value, float):
+        return f'{value:.2f}'
+    return str(value)
+
+
+class DiagnosticsModel(QAbstractTableModel):
+    """Keyed rows of formatted cells; the first column is the row key."""
+
+    def __init__(self, headers, parent=None):
+        super().__init__(parent)
+        self.headers = list(headers)
+        self._keys = []
+        self._rows = {}     # key -> row index
+        self._cells = []    # row -> list of strings
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._cells)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.headers)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        if role == Qt.ItemDataRole.DisplayRole:
+            return self._cells[index.row()][index.column()]
+        if role == Qt.ItemDataRole.TextAlignmentRole and index.column() > 0:
+            return int(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+        return None
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role == Qt.ItemDataRole.DisplayRole and orientation == Qt.Orientation.Horizontal:
+            return self.headers[section]
+        return None
+
+    def set_row(self, key, values):
+        """Set the cells after the key column; returns how many cells changed."""
+        cells = [str(key)] + [format_value(v) for v in values]
+        cells += [''] * (len(self.headers) - len(cells))
+        row = self._rows.get(key)
+        if row is None:
+            row = len(self._cells)
+            self.beginInsertRows(QModelIndex(), row, row)
+            self._keys.append(key)
+            self._rows[key] = row
+            self._cells.append(cells)
+            self.endInsertRows()
+            return len(cells)
+        old = self._cells[row]
+        changed = [column for column, text in enumerate(cells) if old[column] != text]
+        self._cells[row] = cells
+        for column in changed:
+            cell = self.index(row, column)
+            self.dataChanged.emit(cell, cell, [Qt.ItemDataRole.DisplayRole])
+        return len(changed)
+
+    def update(self, rows):
+        """``rows`` maps key -> values; returns the number of changed cells."""
+        return sum(self.set_row(key, values) for key, values in rows.items())
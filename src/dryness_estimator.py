@@ -0,0 +1,157 @@
+# dryness_estimator.py
+# Tells when a spool has stopped giving off moisture, from the humidity the
+# chamber already measures. While filament dries, the absolute humidity of
+# the chamber air decays towards the ambient level roughly exponentially:
+#   h(t) = h_inf + (h0 - h_inf) * exp(-t / tau)
+# so its rate of change is a straight line in h itself:
+#   dh/dt = (h_inf - h) / tau
+# The estimator bins the samples, takes the slope between bins and fits that
+# line with an exponentially weighted least-squares regression, updated one
+# bin at a time (five running sums, no sample history). From the fit it
+# reports the current moisture release rate and how long until that rate
+# drops below the "dry" threshold. end_decision() turns an estimate into
+# ending a cycle early or extending it.
+
+import math
+from collections import namedtuple
+
+BIN_INTERVAL = 60.0      # s of samples averaged into one point
+HALF_LIFE = 900.0        # s; older points weigh half as much after this
+WARMUP = 600.0           # s after the start before points are fitted (chamber still heating)
+MIN_POINTS = 6           # fitted points before an estimate is given
+RATE_THRESHOLD = 0.05    # g/m³ per minute of release below which the spool counts as dry
+DRY_HOLD = 5             # consecutive points below the threshold before it is trusted
+EXTEND_STEP = 300        # s; extensions are at least this long
+
+END_MODES = ('off', 'monitor', 'end', 'extend', 'adaptive')
+
+# tau and time_to_dry in minutes and seconds; rate is positive while moisture is released
+Estimate = namedtuple('Estimate', 'absolute_humidity h_inf tau rate time_to_dry dry points')
+
+
+def absolute_humidity(temperature, humidity):
+    """g/m³ of water vapour in air at ``temperature`` °C and ``humidity`` %RH (Magnus formula)."""
+    saturation = 6.112 * math.exp(17.67 * temperature / (temperature + 243.5))   # hPa
+    return saturation * humidity * 2.1674 / (273.15 + temperature)
+
+
+class DrynessEstimator:
+    """Online fit of the chamber's absolute-humidity decay; feed it every tick."""
+
+    def __init__(self, interval=BIN_INTERVAL, half_life=HALF_LIFE, warmup=WARMUP,
+                 rate_threshold=RATE_THRESHOLD, min_points=MIN_POINTS, hold=DRY_HOLD):
+        self.interval = interval
+        self.decay = 0.5 ** (interval / half_life)
+        self.warmup = warmup
+        self.rate_threshold = rate_threshold
+        self.min_points = min_points
+        self.hold = hold
+        self.reset()
+
+    def reset(self):
+        self.start_time = None
+        self.points = 0
+        self.below = 0           # consecutive points with a fitted rate under the threshold
+        self.last = None         # (time, absolute humidity) of the last closed bin
+        self._bin = None         # [first time, sum of times, sum of values, count]
+        self._sums = [0.0] * 5   # weights, h, rate, h², h * rate
+
+    def update(self, now, temperature, humidity):
+        """Add one reading; returns True when it closed a bin."""
+        if temperature is None or humidity is None or math.isnan(temperature) or math.isnan(humidity):
+            return False
+        if self.start_time is None:
+            self.start_time = now
+        value = absolute_humidity(temperature, humidity)
+        if self._bin is None:
+            self._bin = [now, 0.0, 0.0, 0]
+        self._bin[1] += now
+        self._bin[2] += value
+        self._bin[3] += 1
+        if now - self._bin[0] < self.interval:
+            return False
+        _, times, values, count = self._bin
+        self._bin = None
+        self._add(times / count, values / count)
+        return True
+
+    def _add(self, t, h):
+        previous, self.last = self.last, (t, h)
+        if previous is None or t - self.start_time < self.warmup or t <= previous[0]:
+            return
+        rate = (h - previous[1]) / (t - previous[0]) * 60.0
+        x = (h + previous[1]) / 2.0
+        sums = self._sums
+        for i, value in enumerate((1.0, x, rate, x * x, x * rate)):
+            sums[i] = sums[i] * self.decay + value
+        self.points += 1
+        fit = self.fit()
+        if fit is not None and -(fit[0] + fit[1] * h) <= self.rate_threshold:
+            self.below += 1
+        else:
+            self.below = 0
+
+    def fit(self):
+        """(intercept, slope) of dh/dt (per minute) against h, or None while the data cannot tell."""
+        weights, sx, sy, sxx, sxy = self._sums
+        if self.points < self.min_points:
+            return None
+        spread = weights * sxx - sx * sx
+        if spread <= 1e-12 * max(1.0, sx * sx):
+            # Flat humidity: no decay to fit, but also nothing being released
+            return sy / weights, 0.0
+        slope = (weights * sxy - sx * sy) / spread
+        return (sy - slope * sx) / weights, slope
+
+    def estimate(self):
+        """Estimate at the latest point, or None until enough points are fitted."""
+        fit = self.fit()
+        if fit is None or self.last is None:
+            return None
+        intercept, slope = fit
+        h = self.last[1]
+        rate = -(intercept + slope * h)
+        if slope < 0:
+            tau = -1.0 / slope
+            h_inf = -intercept / slope
+        else:
+            # Not decaying (yet): no time constant to extrapolate with
+            tau = h_inf = None
+        if rate <= self.rate_threshold:
+            time_to_dry = 0.0
+        elif tau is not None:
+            time_to_dry = tau * math.log(rate / self.rate_threshold) * 60.0
+        else:
+            time_to_dry = None
+        return Estimate(h, h_inf, tau, rate, time_to_dry, self.below >= self.hold, self.points)
+
+    def status(self):
+        estimate = self.estimate()
+        if estimate is None:
+            return 'Learning drying curve...'
+        if estimate.dry:
+            return f'Filament dry (release {estimate.rate:.2f} g/m³/min)'
+        if estimate.time_to_dry is None:
+            return f'Moisture release {estimate.rate:.2f} g/m³/min, not levelling off yet'
+        return f'Moisture release {estimate.rate:.2f} g/m³/min, dry in ~{estimate.time_to_dry / 60:.0f} min'
+
+
+def end_decision(estimate, mode, elapsed, planned, remaining, extended,
+                 min_fraction=0.25, max_extension=3600):
+    """New remaining seconds for a countdown under ``mode``, or None to leave it.
+
+    'end' and 'adaptive' finish a cycle once the spool is dry, but never
+    before ``min_fraction`` of the ``planned`` seconds have passed. 'extend'
+    and 'adaptive' add the predicted time to dry when the countdown runs
+    out while moisture is still coming off, up to ``max_extension`` seconds
+    in total (``extended`` so far).
+    """
+    if estimate is None:
+        return None
+    if mode in ('end', 'adaptive') and remaining > 0 and estimate.dry and elapsed >= min_fraction * planned:
+        return 0
+    if mode in ('extend', 'adaptive') and remaining == 0 and not estimate.dry and extended < max_extension:
+        wanted = estimate.time_to_dry if estimate.time_to_dry is not None else EXTEND_STEP
+        extra = min(max(wanted, EXTEND_STEP), max_extension - extended)
+        return int(math.ceil(extra))
+    return None
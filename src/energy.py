@@ -0,0 +1,186 @@
+# energy.py
+# Heater energy and running cost. The heater is resistive, so its power is
+# the rated wattage times the PWM duty; EnergyMeter integrates that over
+# monotonic time each time the duty changes (the duty is constant in
+# between, so the integral is exact) and adds it to running totals: the
+# current cycle, each preset, each day and all time. The totals go to a
+# small JSON file, written at most once a minute, so a meter costs one
+# multiplication per duty change and survives restarts.
+
+import os
+import json
+import time
+import tempfile
+import threading
+from datetime import date
+
+ENERGY_FILE = 'energy.json'
+HEATER_WATTS = 150.0       # rated heater power at 100% duty
+PRICE_PER_KWH = 0.30       # electricity price, in CURRENCY
+CURRENCY = '$'
+SAVE_INTERVAL = 60.0       # s between writes of the totals
+MAX_DAYS = 400             # daily totals kept
+
+
+class EnergyMeter:
+    """kWh of one heater, accumulated per cycle, preset, day and in total.
+
+    ``update`` may be called from any thread (the control loop sets the
+    duty, the service tick publishes).
+    """
+
+    def __init__(self, path=None, watts=HEATER_WATTS, price_per_kwh=PRICE_PER_KWH, currency=CURRENCY,
+                 save_interval=SAVE_INTERVAL, clock=time.monotonic, today=date.today):
+        self.path = path
+        self.watts = watts
+        self.price_per_kwh = price_per_kwh
+        self.currency = currency
+        self.save_interval = save_interval
+        self.clock = clock
+        self.today = today
+        self.duty = 0.0
+        self.total_kwh = 0.0
+        self.presets = {}    # name: {'kwh': ..., 'cycles': ...}
+        self.days = {}       # ISO date: kWh
+        self.cycle = None    # {'preset': ..., 'kwh': ...} while a cycle runs
+        self.last_cycle = None
+        self._last_time = None
+        self._last_save = None
+        self._dirty = False
+        self._lock = threading.Lock()
+        if path:
+            self.load()
+
+    @property
+    def power(self):
+        """Heater power now, in W."""
+        return self.watts * self.duty / 100.0
+
+    def update(self, duty=None, now=None):
+        """Account for the time since the last update at the old duty, then switch to ``duty``."""
+        now = self.clock() if now is None else now
+        with self._lock:
+            if self._last_time is not None and now > self._last_time and self.duty > 0:
+                self._add(self.power * (now - self._last_time) / 3.6e6)
+            self._last_time = now
+            if duty is not None:
+                self.duty = max(0.0, min(100.0, float(duty)))
+
+    def _add(self, kwh):
+        self.total_kwh += kwh
+        day = self.today().isoformat()
+        self.days[day] = self.days.get(day, 0.0) + kwh
+        if self.cycle is not None:
+            self.cycle['kwh'] += kwh
+            entry = self.presets.setdefault(self.cycle['preset'], {'kwh': 0.0, 'cycles': 0})
+            entry['kwh'] += kwh
+        self._dirty = True
+
+    def start_cycle(self, preset):
+        """Begin charging energy to a cycle of ``preset``; an open cycle (resumed after a restart) continues."""
+        with self._lock:
+            if self.cycle is None:
+                self.cycle = {'preset': preset, 'kwh': 0.0}
+                self.presets.setdefault(preset, {'kwh': 0.0, 'cycles': 0})['cycles'] += 1
+            else:
+                self.cycle['preset'] = preset
+            self._dirty = True
+        self.save(force=True)
+
+    def change_preset(self, preset):
+        """A new preset mid-cycle: energy from now on is charged to it."""
+        self.update()
+        with self._lock:
+            if self.cycle is not None and self.cycle['preset'] != preset:
+                self.cycle['preset'] = preset
+                self.presets.setdefault(preset, {'kwh': 0.0, 'cycles': 0})
+                self._dirty = True
+
+    def end_cycle(self):
+        """Close the running cycle; returns its kWh (None if none was running)."""
+        self.update()
+        with self._lock:
+            cycle, self.cycle = self.cycle, None
+            if cycle is None:
+                return None
+            self.last_cycle = cycle
+            self._dirty = True
+        self.save(force=True)
+        return cycle['kwh']
+
+    def cost(self, kwh):
+        return kwh * self.price_per_kwh
+
+    def today_kwh(self):
+        return self.days.get(self.today().isoformat(), 0.0)
+
+    def snapshot(self):
+        """Totals for the published state, rounded so only visible changes cause deltas."""
+        with self._lock:
+            cycle_kwh = self.cycle['kwh'] if self.cycle is not None else None
+            last = self.last_cycle['kwh'] if self.last_cycle is not None else None
+            today, total = self.today_kwh(), self.total_kwh
+        return {'cycle_kwh': None if cycle_kwh is None else round(cycle_kwh, 4),
+                'cycle_cost': None if cycle_kwh is None else round(self.cost(cycle_kwh), 3),
+                'last_cycle_kwh': None if last is None else round(last, 4),
+                'today_kwh': round(today, 4),
+                'total_kwh': round(total, 3),
+                'total_cost': round(self.cost(total), 2),
+                'currency': self.currency}
+
+    def preset_totals(self):
+        with self._lock:
+            return {name: dict(entry) for name, entry in self.presets.items()}
+
+    # Persistence
+
+    def load(self):
+        try:
+            with open(self.path) as file:
+                data = json.load(file)
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as e:
+            print(f'Could not read energy totals {self.path}: {e}')
+            return
+        if not isinstance(data, dict):
+            return
+        self.total_kwh = float(data.get('total_kwh', 0.0))
+        self.presets = {name: {'kwh': float(entry.get('kwh', 0.0)), 'cycles': int(entry.get('cycles', 0))}
+                        for name, entry in (data.get('presets') or {}).items()}
+        self.days = {day: float(kwh) for day, kwh in (data.get('days') or {}).items()}
+        self.cycle = data.get('cycle')
+        self.last_cycle = data.get('last_cycle')
+
+    def save(self, now=None, force=False):
+        """Write the totals if they changed and ``save_interval`` has passed (or ``force``)."""
+        if not self.path:
+            return
+        now = self.clock() if now is None else now
+        with self._lock:
+            if not self._dirty:
+                return
+            if not force and self._last_save is not None and now - self._last_save < self.save_interval:
+                return
+            for day in sorted(self.days)[:-MAX_DAYS]:
+                del self.days[day]
+            data = {'total_kwh': self.total_kwh, 'presets': self.presets, 'days': self.days,
+                    'cycle': self.cycle, 'last_cycle': self.last_cycle}
+            text = json.dumps(data)
+            self._dirty = False
+            self._last_save = now
+        directory = os.path.dirname(self.path) or '.'
+        try:
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=directory, prefix='.energy-')
+            with os.fdopen(fd, 'w') as file:
+                file.write(text)
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(tmp, self.path)
+        except OSError as e:
+            print(f'Could not save energy totals {self.path}: {e}')
+
+    def close(self):
+        self.update()
+        self.save(force=True)
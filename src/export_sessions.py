@@ -0,0 +1,62 @@
+# export_sessions.py
+# Command-line export of run logs, e.g. to copy them off a headless Pi:
+#
+#   python -m src.export_sessions [--format csv|npz|parquet] [--out DIR]
+#                                 [--since ISO] [--until ISO] [SESSION ...]
+#
+# Without SESSION arguments every log in --session-dir is exported, skipping
+# the ones whose export is already up to date.
+
+import sys
+import argparse
+from datetime import datetime
+from src.exporter import (EXPORT_DIR, EXPORT_FORMATS, CHUNK_SIZE, ExportError, export_session,
+                          export_sessions)
+from src.session_log import SESSION_DIR, list_sessions
+
+
+def timestamp(text):
+    """Unix time from an ISO date or date and time (local time)."""
+    try:
+        return datetime.fromisoformat(text).timestamp()
+    except ValueError:
+        raise argparse.ArgumentTypeError(f'not an ISO date/time: {text!r}')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Export filament dryer run logs')
+    parser.add_argument('sessions', nargs='*', help='session logs (default: all in --session-dir)')
+    parser.add_argument('--format', choices=EXPORT_FORMATS, default='csv')
+    parser.add_argument('--out', default=EXPORT_DIR, help='directory for the exported files')
+    parser.add_argument('--session-dir', default=SESSION_DIR, help='directory of the run logs')
+    parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE, help='records read at a time')
+    parser.add_argument('--since', type=timestamp, help='only samples from this time on')
+    parser.add_argument('--until', type=timestamp, help='only samples before this time')
+    parser.add_argument('--force', action='store_true', help='re-export logs whose export is up to date')
+    args = parser.parse_args(argv)
+    if args.chunk_size < 1:
+        parser.error('--chunk-size must be positive')
+
+    if args.since is not None or args.until is not None:
+        # A time window makes every export different, so nothing is skipped
+        written, errors = [], []
+        for session in args.sessions or list_sessions(args.session_dir):
+            try:
+                written.append(export_session(session, args.out, args.format, args.chunk_size,
+                                              args.since, args.until))
+            except (OSError, ExportError) as e:
+                errors.append(f'{session}: {e}')
+    else:
+        written, errors = export_sessions(args.sessions or list_sessions(args.session_dir), args.out,
+                                          args.format, args.chunk_size, skip_current=not args.force)
+    for path in written:
+        print(f'Exported {path}')
+    for error in errors:
+        print(f'Could not export {error}')
+    if not written and not errors:
+        print('Nothing to export')
+    return 1 if errors else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,50 +1,21 @@
+import os
 import sys
 import json
+import argparse
+from src import startup_trace, instrumentation
+# Before the heavy imports below, so they show up in the trace
+startup_trace.enable_from_env()
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QTabWidget, QWidget, QVBoxLayout, QLabel, QStatusBar, QMessageBox, QHBoxLayout)
 from PyQt5.QtCore import Qt, QTimer
 from PyQt5.QtGui import QFont
 from PyQt5.QtCore import Qt
 from src.main_page import MainPage
-from src.settings_page import SettingsPage
-from src.debugging_page import DebuggingPage
+from src.lazy_page import LazyPage
+from src.theme import apply_theme, set_state, led_level
+from src.preset_repository import PresetRepository, watch_with_qt
 
 class FilamentDryerGUI(QMainWindow):
-    def __init__(self):
-        super().__init__()
-        self.setWindowTitle('Filament Dryer Control System')
-        self.setWindowState(self.windowState() | Qt.WindowState.WindowFullScreen)
-
-        # Create tab widget for navigation
-        self.tabs = QTabWidget()
-        self.tabs.setFont(QFont('Segoe UI', 18, QFont.Weight.Bold))
-        self.tabs.setStyleSheet('''
-            QTabBar::tab {
-                height: 60px;
-                font-size: 20pt;
-                min-width: 180px;
-                max-width: 180px;
-                border-radius: 16px;
-                background: #353941;
-                color: #f0f0f0;
-            }
-            QTabBar::tab:selected {
-                background: #0078d7;
-                color: #fff;
-                border: 2px solid #ff9800;
-            }
-            QTabBar { min-height: 60px; }
-        ''')
-
-        # Create pages before adding tabs or connecting signals
-        self.main_page = MainPage()
-        self.settings_page = SettingsPage()
-        self.debugging_page = DebuggingPage(main_page=self.main_page, settings_page=self.settings_page)
-
-        # Add tabs
-        self.tabs.addTab(self.main_page, "Main")
-        self.tabs.addTab(self.settings_page, "Settings")
-        self.tabs.addTab(self.debugging_page, "Debug")
-    def __init__(self):
+    def __init__(self, controller=None, chambers=None):
         super().__init__()
         self.setWindowTitle('Filament Dryer Control System')
         # Set window to full screen for 7" touchscreen
@@ -53,58 +24,54 @@ class FilamentDryerGUI(QMainWindow):
         # Create tab widget for navigation
         self.tabs = QTabWidget()
         self.tabs.setFont(QFont('Segoe UI', 18, QFont.Weight.Bold))
-        self.tabs.setStyleSheet('''
-            QTabBar::tab {
-                height: 60px;
-                font-size: 20pt;
-                min-width: 180px;
-                max-width: 180px;
-                border-radius: 16px;
-                background: #353941;
-                color: #f0f0f0;
-            }
-            QTabBar::tab:selected {
-                background: #0078d7;
-                color: #fff;
-                border: 2px solid #ff9800;
-            }
-            QTabBar { min-height: 60px; }
-        ''')
+
+        # One preset repository for every page, reloaded when presets.json
+        # is changed on disk
+        self.preset_repository = PresetRepository()
+        self.preset_watcher = watch_with_qt(self.preset_repository, self)
 
         # Create pages before adding tabs or connecting signals
-        self.main_page = MainPage()
-        self.settings_page = SettingsPage()
-        self.debugging_page = DebuggingPage(main_page=self.main_page, settings_page=self.settings_page)
+        # Without a controller the page runs its own in-process one
+        with startup_trace.span('MainPage'):
+            self.main_page = MainPage(controller=controller, repository=self.preset_repository)
+        # The other tabs are built the first time they are opened
+        self.settings_tab = LazyPage(self.create_settings_page, 'SettingsPage')
+        self.debugging_tab = LazyPage(self.create_debugging_page, 'DebuggingPage')
+        self.materials_tab = LazyPage(self.create_materials_page, 'PresetSelectionPage')
 
         # Add tabs
         self.tabs.addTab(self.main_page, "Main")
-        self.tabs.addTab(self.settings_page, "Settings")
-        self.tabs.addTab(self.debugging_page, "Debug")
+        # Multi-chamber setups (src.chamber.ChamberManager) get an overview;
+        # the main page then drives the first chamber
+        self.chambers = chambers
+        if chambers is not None:
+            self.overview_tab = LazyPage(self.create_overview_page, 'ChamberOverviewPage')
+            self.tabs.addTab(self.overview_tab, "Chambers")
+            # Histories are sampled whether or not the overview is open
+            self.chamber_timer = QTimer(self)
+            instrumentation.connect_timer(self.chamber_timer, 'FilamentDryerGUI.chamber_timer', chambers.sample)
+            self.chamber_timer.start(1000)
+        self.tabs.addTab(self.materials_tab, "Materials")
+        self.tabs.addTab(self.settings_tab, "Settings")
+        self.tabs.addTab(self.debugging_tab, "Debug")
 
         # Status bar (now includes time and LED)
         self.status = QStatusBar()
-        self.status.setStyleSheet('''
-            QStatusBar {
-                background: qlineargradient(x1:0, y1:0, x2:1, y2:0, stop:0 #232629, stop:1 #353941);
-                color: #ff9800;
-                font-weight: bold;
-                font-size: 20px;
-                border-bottom: 2px solid #0078d7;
-                min-height: 48px;
-            }
-        ''')
         self.status_label = QLabel("Temperature: 0°C | Humidity: --% | Status: Idle | Preset: None | Time Remaining: --:--")
         self.status_label.setFont(QFont('Segoe UI', 20, QFont.Weight.Bold))
         self.status_label.setMinimumHeight(48)
         self.status.addWidget(self.status_label)
         self.status.addPermanentWidget(QWidget(), 1)  # stretch
+        self.energy_label = QLabel()
+        self.energy_label.setFont(QFont('Segoe UI', 16))
+        self.status.addPermanentWidget(self.energy_label)
         self.time_label = QLabel()
         self.time_label.setFont(QFont('Segoe UI', 18, QFont.Weight.Bold))
-        self.time_label.setStyleSheet('color: #ff9800;')
+        self.time_label.setObjectName('clock')
         self.status.addPermanentWidget(self.time_label)
         self.led_label = QLabel()
         self.led_label.setFixedSize(32, 32)
-        self.led_label.setStyleSheet('border-radius: 16px; background: #353941; border: 2px solid #232629;')
+        self.led_label.setObjectName('statusLed')
         self.status.addPermanentWidget(self.led_label)
 
         # Layout
@@ -117,66 +84,140 @@ class FilamentDryerGUI(QMainWindow):
         central_widget.setLayout(central_layout)
         self.setCentralWidget(central_widget)
 
-        # Timer for updating time and LED
-        self.gui_timer = QTimer()
-        self.gui_timer.timeout.connect(self.update_top_bar)
+        # Timer for the clock
+        self.gui_timer = QTimer(self)
+        instrumentation.connect_timer(self.gui_timer, 'FilamentDryerGUI.gui_timer', self.update_top_bar)
         self.gui_timer.start(1000)
+        # Measures how long the GUI thread was too busy to process events
+        self.watchdog = instrumentation.EventLoopWatchdog(parent=self)
 
-        # Connect signals for navigation and preset updates
-        self.main_page.switch_to_settings.connect(lambda: self.tabs.setCurrentWidget(self.settings_page))
-        self.settings_page.switch_to_main.connect(lambda: self.tabs.setCurrentWidget(self.main_page))
-        self.settings_page.presets_changed.connect(self.main_page.update_presets)
+        # Navigation; the settings page connects its own signals once built
+        self.main_page.switch_to_settings.connect(lambda: self.tabs.setCurrentWidget(self.settings_tab))
 
-        # Initial status bar update
-        self.update_status_bar()
+        # Status bar and LED re-render only when the fields they show change
+        store = self.main_page.store
+        store.subscribe(('temperature', 'humidity', 'preset', 'setpoint', 'drying_time', 'remaining_time'),
+                        self.update_status_bar)
+        store.subscribe(('heater_on', 'pwm_value'), self.update_led)
+        store.subscribe(('power', 'energy'), self.update_energy)
+        self.update_top_bar()
+
+    @property
+    def settings_page(self):
+        return self.settings_tab.page
+
+    @property
+    def debugging_page(self):
+        return self.debugging_tab.page
+
+    @property
+    def materials_page(self):
+        return self.materials_tab.page
+
+    def create_settings_page(self):
+        from src.settings_page import SettingsPage
+        # Preset edits reach the main page through the shared repository
+        page = SettingsPage(repository=self.preset_repository)
+        page.switch_to_main.connect(lambda: self.tabs.setCurrentWidget(self.main_page))
+        page.pid_changed.connect(self.main_page.set_pid_gains)
+        page.autotune_requested.connect(self.main_page.start_autotune)
+        self.main_page.autotune_status.connect(page.autotune_status_label.setText)
+        self.main_page.autotune_finished.connect(page.apply_tuned_pid_values)
+        page.end_mode_changed.connect(self.main_page.set_end_mode)
+        self.main_page.store.subscribe(('end_mode',), lambda changes: page.show_end_mode(changes['end_mode']))
+        if self.debugging_tab.built:
+            self.debugging_page.settings_page = page
+        return page
+
+    def create_overview_page(self):
+        from src.chamber_overview import ChamberOverviewPage
+        return ChamberOverviewPage(self.chambers, self.preset_repository)
+
+    def create_materials_page(self):
+        from src.preset_selection_page import PresetSelectionPage
+        page = PresetSelectionPage(repository=self.preset_repository)
+        page.switch_to_main.connect(self.show_main_with_preset)
+        return page
+
+    def show_main_with_preset(self, preset):
+        # None means "back" without choosing
+        if preset:
+            self.main_page.change_preset(preset)
+        self.tabs.setCurrentWidget(self.main_page)
+
+    def create_debugging_page(self):
+        from src.debugging_page import DebuggingPage
+        # Settings are only shown if that page exists; opening Debug does not build it
+        settings_page = self.settings_page if self.settings_tab.built else None
+        return DebuggingPage(main_page=self.main_page, settings_page=settings_page)
+
+    def closeEvent(self, event):
+        # Child widgets get no close event of their own when the window goes
+        self.main_page.close()
+        if self.chambers is not None:
+            self.chambers.close()
+        self.watchdog.stop()
+        super().closeEvent(event)
         
-    def update_status_bar(self):
-        from datetime import datetime
-        temp = self.main_page.temperature_label.text() if hasattr(self.main_page, 'temperature_label') else '--'
-        preset_info = self.main_page.preset_info_label.text() if hasattr(self.main_page, 'preset_info_label') else '--'
-        countdown = self.main_page.countdown_label.text() if hasattr(self.main_page, 'countdown_label') else '--:--'
-        humidity = self.main_page.humidity_label.text() if hasattr(self.main_page, 'humidity_label') else '--'
-        now = datetime.now().strftime('%H:%M:%S')
-        # Remove duplicated 'Time Remaining:' label, only show value
-        self.status_label.setText(f"{temp} | {humidity} | {preset_info} | {countdown}")
-        self.time_label.setText(now)
+    def update_status_bar(self, changes=None):
+        store = self.main_page.store
+        temp = store['temperature']
+        humidity = store['humidity']
+        mins, secs = divmod(store['remaining_time'], 60)
+        self.status_label.setText(
+            f"Temperature: {'--' if temp is None else f'{temp:.1f}'}°C | "
+            f"Humidity: {'--' if humidity is None else f'{humidity:.1f}'}% | "
+            f"Preset: {store['preset']} | Temp: {store['setpoint']:g}°C | Time: {store['drying_time']} min | "
+            f"Time Remaining: {mins:02d}:{secs:02d}")
+
+    def update_energy(self, changes=None):
+        store = self.main_page.store
+        energy = store['energy'] or {}
+        text = f"{store['power']:.0f} W"
+        if energy.get('cycle_kwh') is not None:
+            # Cost of the running cycle, else the running total
+            text += f" | Cycle {energy['cycle_kwh']:.2f} kWh {energy['currency']}{energy['cycle_cost']:.2f}"
+        elif energy:
+            text += f" | Total {energy['total_kwh']:.1f} kWh {energy['currency']}{energy['total_cost']:.2f}"
+        self.energy_label.setText(text)
+
+    def update_led(self, changes=None):
+        store = self.main_page.store
+        # Red with brightness from the 0-255 PWM while heating, else gray;
+        # only a change of step re-polishes the LED
+        set_state(self.led_label, 'level', str(led_level(store['heater_on'], store['pwm_value'])))
 
     def update_top_bar(self):
-        # Update LED color/brightness
-        heater_on = getattr(self.main_page, 'heater_on', False)
-        pwm_value = getattr(self.main_page, 'pwm_value', 0)
-        # LED color: red if heater_on, else gray
-        if heater_on:
-            # Brightness based on PWM (0-255)
-            brightness = int(80 + pwm_value * 0.7)  # 80-255
-            self.led_label.setStyleSheet(f'border-radius: 16px; background: rgb({brightness},0,0); border: 2px solid #232629;')
-        else:
-            self.led_label.setStyleSheet('border-radius: 16px; background: #353941; border: 2px solid #232629;')
-        # Also update the status bar to refresh the time
-        self.update_status_bar()
+        from datetime import datetime
+        # Only the clock needs a timer; state-driven parts are pushed by the store
+        self.time_label.setText(datetime.now().strftime('%H:%M:%S'))
 
 def main():
-    app = QApplication(sys.argv)
-    # Modern dark theme using Qt stylesheets
-    dark_stylesheet = """
-    QWidget { background-color: #232629; color: #f0f0f0; font-family: 'Segoe UI', Arial, sans-serif; }
-    QTabBar::tab { background: #353941; color: #f0f0f0; border-radius: 16px; margin: 4px; padding: 8px 24px; box-shadow: 0 2px 8px rgba(0,0,0,0.15); }
-    QTabBar::tab:selected { background: #0078d7; color: #fff; border: 2px solid #ff9800; }
-    QStatusBar { background: qlineargradient(x1:0, y1:0, x2:1, y2:0, stop:0 #232629, stop:1 #353941); color: #ff9800; font-weight: bold; font-size: 20px; border-bottom: 2px solid #0078d7; min-height: 48px; }
-    QGroupBox { border: 2px solid #0078d7; border-radius: 16px; margin-top: 18px; background: #353941; color: #f0f0f0; box-shadow: 0 2px 8px rgba(0,0,0,0.10); }
-    QGroupBox:title { subcontrol-origin: margin; left: 18px; padding: 0 6px 0 6px; font-size: 18px; font-weight: bold; }
-    QPushButton { background-color: #0078d7; color: #fff; border-radius: 12px; padding: 10px 24px; font-size: 18px; font-weight: 600; box-shadow: 0 2px 8px rgba(0,0,0,0.10); }
-    QPushButton:hover { background-color: #005fa3; box-shadow: 0 4px 16px rgba(0,120,215,0.15); }
-    QPushButton:checked { background-color: #ff9800; color: #232629; border: 2px solid #0078d7; }
-    QComboBox { background-color: #353941; color: #f0f0f0; border-radius: 12px; padding: 6px; font-size: 16px; }
-    QSlider::groove:horizontal { height: 10px; background: #353941; border-radius: 5px; }
-    QSlider::handle:horizontal { background: #0078d7; border: 2px solid #353941; width: 22px; margin: -6px 0; border-radius: 11px; }
-    QLabel { font-size: 18px; }
-    QVBoxLayout, QHBoxLayout { margin: 12px; }
-    """
-    app.setStyleSheet(dark_stylesheet)
-    gui = FilamentDryerGUI()
+    parser = argparse.ArgumentParser(description='Filament dryer GUI')
+    parser.add_argument('--connect', metavar='SOCKET', default=os.environ.get('FD_DAEMON_SOCKET'),
+                        help='drive a running dryer daemon instead of the hardware directly')
+    parser.add_argument('--chambers', type=int, default=1, metavar='N',
+                        help='control N drying chambers from this process (pins from CHAMBER_PINS)')
+    args, qt_args = parser.parse_known_args()
+    if args.chambers > 1 and args.connect:
+        parser.error('--chambers cannot be combined with --connect')
+    app = QApplication(sys.argv[:1] + qt_args)
+    # One precompiled stylesheet for the whole GUI
+    apply_theme(app)
+    controller = None
+    chambers = None
+    if args.connect:
+        from src.ipc import RemoteController
+        controller = RemoteController(args.connect)
+    elif args.chambers > 1:
+        from src.chamber import ChamberManager
+        chambers = ChamberManager(args.chambers)
+        controller = chambers[0].controller
+    with startup_trace.span('FilamentDryerGUI'):
+        gui = FilamentDryerGUI(controller=controller, chambers=chambers)
     gui.show()
+    # Runs once the event loop has painted the first frame
+    QTimer.singleShot(0, startup_trace.report)
     sys.exit(app.exec())
 
 if __name__ == '__main__':
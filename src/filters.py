@@ -0,0 +1,210 @@
+# filters.py
+# Signal conditioning between the sensors and everything that reads them.
+# A SensorPipeline takes blocks of raw (oversampled) readings and runs them
+# through outlier rejection (Hampel or plain median), smoothing (EMA or a
+# 1-D Kalman filter) and decimation, all as NumPy operations on the whole
+# block. Each stage keeps just enough state (the last few samples, the
+# filter output) for consecutive blocks to join seamlessly, so filtering
+# block by block gives the same result as filtering the whole stream.
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+MAD_SCALE = 1.4826   # MAD -> standard deviation for Gaussian noise
+MIN_DECAY_LOG = -600.0  # natural log of the smallest cumulative decay a chunk may reach
+
+
+def _padded(values, window, history):
+    # The block preceded by exactly window - 1 earlier samples (the oldest
+    # one repeated while there are fewer), with gaps filled
+    if history is not None and len(history):
+        earlier = np.asarray(history, dtype=np.float64)
+    else:
+        earlier = values[:1]
+    earlier = earlier[max(0, len(earlier) - (window - 1)):]
+    earlier = np.concatenate([earlier[:1].repeat(window - 1 - len(earlier)), earlier])
+    return _fill_nan(np.concatenate([earlier, values]))
+
+
+def hampel(values, window=7, n_sigma=3.0, history=None, min_deviation=0.0):
+    """Replace outliers by the median of their trailing window.
+
+    A sample is an outlier if it is more than ``n_sigma`` scaled MADs (and
+    more than ``min_deviation``, which keeps a quantised, steady signal
+    from flagging every step) from the median of the ``window`` samples
+    ending at it. ``history`` holds earlier samples so the first ones of a
+    block get full windows. Returns ``(cleaned, outlier_mask)``.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    windows = sliding_window_view(_padded(values, window, history), window)[-len(values):]
+    median = np.median(windows, axis=1)
+    mad = MAD_SCALE * np.median(np.abs(windows - median[:, None]), axis=1)
+    outliers = np.abs(values - median) > np.maximum(n_sigma * mad, min_deviation)
+    # NaNs (missed reads) also take the median
+    outliers |= np.isnan(values)
+    return np.where(outliers, median, values), outliers
+
+
+def median_filter(values, window=5, history=None):
+    """Trailing running median; returns ``(filtered, mask of changed samples)``."""
+    values = np.asarray(values, dtype=np.float64)
+    median = np.median(sliding_window_view(_padded(values, window, history), window)[-len(values):], axis=1)
+    return median, median != values
+
+
+def _fill_nan(values):
+    # Carry the last finite value forward so windows stay finite
+    mask = np.isnan(values)
+    if not mask.any():
+        return values
+    index = np.where(mask, 0, np.arange(len(values)))
+    np.maximum.accumulate(index, out=index)
+    filled = values[index]
+    if np.isnan(filled[0]) and not mask.all():
+        # Leading gap: back-fill from the first finite value
+        filled[np.isnan(filled)] = values[~mask][0]
+    return filled
+
+
+def first_order(values, gains, y0):
+    """``y[n] = y[n-1] + gains[n] * (values[n] - y[n-1])`` for a whole block at once.
+
+    Solved in closed form with cumulative products instead of a Python
+    loop: with c[n] = prod(1 - gains[:n+1]), y[n] = c[n] * (y0 + sum(gains[k]
+    * values[k] / c[k])). Runs in chunks short enough that 1 / c stays far
+    from overflow; gains must be below 1.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    gains = np.broadcast_to(np.asarray(gains, dtype=np.float64), values.shape)
+    if len(values) == 0:
+        return values.copy()
+    chunk_size = max(1, int(MIN_DECAY_LOG / np.log1p(-gains.max())))
+    out = np.empty_like(values)
+    y = float(y0)
+    for start in range(0, len(values), chunk_size):
+        x = values[start:start + chunk_size]
+        k = gains[start:start + chunk_size]
+        decay = np.cumprod(1.0 - k)
+        chunk = decay * (y + np.cumsum(k * x / decay))
+        out[start:start + len(x)] = chunk
+        y = chunk[-1]
+    return out
+
+
+class EMA:
+    """Exponential moving average with smoothing factor ``alpha`` (0-1]."""
+
+    def __init__(self, alpha=0.2):
+        if not 0 < alpha <= 1:
+            raise ValueError('alpha must be in (0, 1]')
+        self.alpha = alpha
+        self.value = None
+
+    def __call__(self, values):
+        if len(values) == 0:
+            return values
+        if self.alpha == 1:
+            out = np.array(values, dtype=np.float64)
+        else:
+            out = first_order(values, self.alpha, values[0] if self.value is None else self.value)
+        self.value = out[-1]
+        return out
+
+
+class Kalman1D:
+    """Scalar Kalman filter for a slowly drifting value (random-walk model).
+
+    ``process_variance`` is how much the true value may move per sample,
+    ``measurement_variance`` the sensor noise. The error covariance does not
+    depend on the data, so the per-sample gains of a block are computed
+    first and the estimate is then a first_order recursion.
+    """
+
+    def __init__(self, process_variance=1e-3, measurement_variance=0.05, initial_variance=1.0):
+        if measurement_variance <= 0 or process_variance < 0:
+            raise ValueError('variances must be positive')
+        self.q = process_variance
+        self.r = measurement_variance
+        self.p = initial_variance
+        self.value = None
+
+    def gains(self, count):
+        gains = np.empty(count)
+        p = self.p
+        for i in range(count):
+            # Scalar arithmetic only; converges to a constant within a few samples
+            p += self.q
+            gains[i] = p / (p + self.r)
+            p *= 1.0 - gains[i]
+        self.p = p
+        return gains
+
+    def __call__(self, values):
+        if len(values) == 0:
+            return values
+        y0 = values[0] if self.value is None else self.value
+        out = first_order(values, self.gains(len(values)), y0)
+        self.value = out[-1]
+        return out
+
+
+class SensorPipeline:
+    """Oversampled raw readings in, one conditioned value per ``oversample`` out.
+
+    ``outlier`` is 'hampel', 'median' or None and ``smoothing`` 'ema',
+    'kalman' or None. Decimation averages each group of ``oversample``
+    smoothed samples (a boxcar, which also acts as the anti-alias filter).
+    """
+
+    def __init__(self, oversample=1, outlier='hampel', window=7, n_sigma=3.0, min_deviation=0.0,
+                 smoothing='ema', alpha=0.2, process_variance=1e-3, measurement_variance=0.05):
+        if oversample < 1:
+            raise ValueError('oversample must be at least 1')
+        if outlier not in ('hampel', 'median', None):
+            raise ValueError(f'unknown outlier filter {outlier!r}')
+        if smoothing not in ('ema', 'kalman', None):
+            raise ValueError(f'unknown smoothing {smoothing!r}')
+        self.oversample = int(oversample)
+        self.outlier = outlier
+        self.window = window
+        self.n_sigma = n_sigma
+        self.min_deviation = min_deviation
+        if smoothing == 'ema':
+            self.smoother = EMA(alpha)
+        elif smoothing == 'kalman':
+            self.smoother = Kalman1D(process_variance, measurement_variance)
+        else:
+            self.smoother = None
+        self._history = np.empty(0)
+        self._pending = np.empty(0)   # smoothed samples not yet in a full decimation group
+        self.samples = 0
+        self.rejected = 0
+
+    def process(self, values):
+        """Filter a block of raw samples; returns the decimated outputs it completes."""
+        values = np.asarray(values, dtype=np.float64)
+        if len(values) == 0:
+            return values
+        self.samples += len(values)
+        if self.outlier == 'hampel':
+            cleaned, mask = hampel(values, self.window, self.n_sigma, self._history, self.min_deviation)
+            self.rejected += int(np.count_nonzero(mask))
+        elif self.outlier == 'median':
+            cleaned, _ = median_filter(values, self.window, self._history)
+        else:
+            cleaned = values
+        if self.outlier is not None:
+            # Raw samples, so a genuine step is recognised once the window sees it
+            combined = np.concatenate([self._history, values])
+            self._history = combined[max(0, len(combined) - (self.window - 1)):]
+        if np.isnan(cleaned).all():
+            return np.empty(0)
+        cleaned = _fill_nan(cleaned)
+        smoothed = self.smoother(cleaned) if self.smoother is not None else cleaned
+        pending = np.concatenate([self._pending, smoothed])
+        groups = len(pending) // self.oversample
+        self._pending = pending[groups * self.oversample:]
+        return pending[:groups * self.oversample].reshape(groups, self.oversample).mean(axis=1)
+
+    def stats(self):
+        return {'samples': self.samples, 'rejected': self.rejected}
@@ -0,0 +1,91 @@
+# hardware.py
+# GPIO access shared by the pages: real RPi.GPIO on the Pi, a simulated
+# chamber (src.thermal_model) everywhere else
+
+from src.pin_definitions import HEATER_PIN, CHAMBER_PINS
+from src.thermal_model import SimulatedChamber, SimulatedGPIO
+
+HEATER_PWM_FREQUENCY = 2  # Hz; slow PWM suits an SSR-switched heater
+
+# GPIO detection
+def is_raspberry_pi():
+    try:
+        with open('/proc/cpuinfo', 'r') as f:
+            cpuinfo = f.read()
+            return 'Raspberry Pi' in cpuinfo or 'BCM' in cpuinfo
+    except Exception:
+        return False
+
+# Physics model standing in for the chamber when no hardware is attached; the
+# heater PWM warms it and the simulated sensors read it back
+SIMULATED_CHAMBER = SimulatedChamber()
+
+try:
+    import RPi.GPIO as GPIO
+    GPIO_AVAILABLE = True
+except ImportError:
+    GPIO = SimulatedGPIO(SIMULATED_CHAMBER, heater_pins=[HEATER_PIN])
+    GPIO_AVAILABLE = False
+
+def open_heater_pwm(pin=HEATER_PIN, frequency=HEATER_PWM_FREQUENCY):
+    """Configure the heater pin and return its PWM channel, started at 0% duty."""
+    GPIO.setmode(GPIO.BCM)
+    GPIO.setup(pin, GPIO.OUT)
+    pwm = GPIO.PWM(pin, frequency)
+    pwm.start(0)
+    return pwm
+
+
+# One simulated chamber per extra heater pin
+_simulated_chambers = {HEATER_PIN: SIMULATED_CHAMBER}
+_sensor_hub = None
+
+def sensor_hub():
+    """The process-wide src.sensors.SensorHub, discovered and started on first use."""
+    global _sensor_hub
+    if _sensor_hub is None:
+        from src.sensors import SensorHub
+        _sensor_hub = SensorHub.discover()
+        print(f'Sensors: {len(_sensor_hub.probes)} DS18B20, {len(_sensor_hub.humidity_sensors)} humidity, '
+              f'bulk conversion {"on" if _sensor_hub.triggers else "off"}')
+        _sensor_hub.start()
+    return _sensor_hub
+
+def _hardware_sensors(heater_pin):
+    # Chamber n uses the probes listed in its pin group, else the n-th probe,
+    # and the n-th humidity sensor
+    from src.sensors import DS18B20_MAX_RATE_HZ
+    hub = sensor_hub()
+    index = next((i for i, pins in enumerate(CHAMBER_PINS) if pins['heater'] == heater_pin), 0)
+    probe_ids = CHAMBER_PINS[index].get('temp_probes') or \
+        ([hub.probes[index].id] if index < len(hub.probes) else [])
+    humidity = hub.humidity_sensors[index] if index < len(hub.humidity_sensors) else None
+    if probe_ids:
+        read_temperature = hub.channel(probe_ids, DS18B20_MAX_RATE_HZ)
+    elif humidity is not None:
+        read_temperature = hub.channel([f'{humidity.id}:temperature'], humidity.max_rate_hz)
+    else:
+        read_temperature = hub.channel([])
+    read_humidity = hub.channel([f'{humidity.id}:humidity'] if humidity else [],
+                                humidity.max_rate_hz if humidity else None)
+    return read_temperature, read_humidity
+
+def chamber_sensors(heater_pin=HEATER_PIN):
+    """(read_temperature, read_humidity) for the chamber heated by ``heater_pin``.
+
+    On the Pi these are the kernel-driver sensors of src.sensors, read in
+    the background; elsewhere a simulated chamber per heater pin.
+    """
+    if GPIO_AVAILABLE:
+        return _hardware_sensors(heater_pin)
+    chamber = _simulated_chambers.get(heater_pin)
+    if chamber is None:
+        chamber = _simulated_chambers[heater_pin] = SimulatedChamber()
+        GPIO.attach(heater_pin, chamber)
+    return chamber.read_temperature, chamber.read_humidity
+
+def read_temperature():
+    return chamber_sensors()[0]()
+
+def read_humidity():
+    return chamber_sensors()[1]()
@@ -0,0 +1,150 @@
+# history.py
+# Multi-resolution sample history so long drying sessions can be plotted
+# with a constant number of points
+
+import numpy as np
+from src.ring_buffer import SampleRingBuffer, SAMPLE_FIELDS
+
+# (bucket width in seconds, number of buckets) per tier, finest first.
+# Tier 0 stores every sample as it arrives; the others hold bucket means.
+DEFAULT_TIERS = (
+    (1, 3600),    # 1 h at full rate
+    (10, 2880),   # 8 h at 10 s
+    (60, 1440),   # 24 h at 60 s
+)
+
+
+def lttb(x, y, n_out):
+    """Largest-Triangle-Three-Buckets downsampling of ``(x, y)`` to ``n_out`` points.
+
+    Returns the selected indices. The first and last samples are always kept,
+    and every bucket keeps the point forming the largest triangle with the
+    previously kept point and the mean of the next bucket, which preserves
+    peaks that plain averaging would flatten.
+    """
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    # Bucket edges over the interior points [1, n - 1)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.intp)
+    starts = edges[:-1]
+    ends = edges[1:]
+    # Mean of each bucket, plus the final point acting as the bucket after the last
+    x_mean = np.append(np.add.reduceat(x[1:n - 1], starts - 1) / (ends - starts), x[n - 1])
+    y_mean = np.append(np.add.reduceat(y[1:n - 1], starts - 1) / (ends - starts), y[n - 1])
+    indices = np.empty(n_out, dtype=np.intp)
+    indices[0] = 0
+    indices[-1] = n - 1
+    prev = 0
+    for b in range(n_out - 2):
+        lo, hi = starts[b], ends[b]
+        px, py = x[prev], y[prev]
+        nx, ny = x_mean[b + 1], y_mean[b + 1]
+        # Twice the triangle area; the constant factor does not change argmax
+        area = np.abs((px - nx) * (y[lo:hi] - py) - (px - x[lo:hi]) * (ny - py))
+        prev = lo + int(np.argmax(area))
+        indices[b + 1] = prev
+    return indices
+
+
+def minmax_decimate(y, n_out):
+    """Indices of the min and max of each of ``n_out // 2`` equal buckets, in order."""
+    n = len(y)
+    buckets = n_out // 2
+    if buckets < 1 or n <= n_out:
+        return np.arange(n)
+    usable = (n // buckets) * buckets
+    offset = n - usable  # drop the oldest remainder so the newest data is kept
+    blocks = y[offset:].reshape(buckets, -1)
+    base = offset + np.arange(buckets) * blocks.shape[1]
+    lo = base + np.nanargmin(blocks, axis=1)
+    hi = base + np.nanargmax(blocks, axis=1)
+    return np.sort(np.concatenate((lo, hi)))
+
+
+class _Tier:
+    def __init__(self, resolution, capacity):
+        self.resolution = resolution
+        self.buffer = SampleRingBuffer(capacity)
+        self.span = resolution * capacity
+        # Running sums of the bucket currently being filled
+        self._bucket = None
+        self._sums = np.zeros(len(SAMPLE_FIELDS))
+        self._count = 0
+
+    def add(self, values):
+        bucket = int(values[0] // self.resolution)
+        if self._bucket is not None and bucket != self._bucket:
+            self.flush()
+        self._bucket = bucket
+        self._sums += values
+        self._count += 1
+
+    def flush(self):
+        if self._count:
+            self.buffer.append(*(self._sums / self._count))
+        self._sums[:] = 0
+        self._count = 0
+
+
+class TieredHistory:
+    """Full-rate recent samples plus progressively coarser, incrementally built tiers.
+
+    ``window()`` picks the finest tier that covers the requested time span and
+    decimates it to the number of points the plot can actually show.
+    """
+
+    def __init__(self, tiers=DEFAULT_TIERS):
+        self.tiers = [_Tier(resolution, capacity) for resolution, capacity in tiers]
+
+    @property
+    def recent(self):
+        """Ring buffer of the most recent samples at full rate."""
+        return self.tiers[0].buffer
+
+    def __len__(self):
+        return len(self.recent)
+
+    def append(self, timestamp, temperature, humidity, pwm):
+        self.recent.append(timestamp, temperature, humidity, pwm)
+        values = np.array((timestamp, temperature, humidity, pwm), dtype=np.float64)
+        for tier in self.tiers[1:]:
+            tier.add(values)
+
+    def tier_for(self, span, max_points):
+        """Finest tier covering ``span`` seconds without needing heavy decimation."""
+        for tier in self.tiers:
+            if tier.span >= span and span / tier.resolution <= 4 * max_points:
+                return tier
+        return self.tiers[-1]
+
+    def window(self, field, span, max_points, now=None, method='lttb'):
+        """Return ``(timestamps, values)`` for the last ``span`` seconds, at most ``max_points`` long.
+
+        When no decimation is needed the arrays are views into the tier's ring
+        buffer, so the plot gets them without a copy.
+        """
+        tier = self.tier_for(span, max_points)
+        timestamps = tier.buffer.view('timestamp')
+        values = tier.buffer.view(field)
+        if not len(timestamps):
+            return timestamps, values
+        if now is None:
+            now = timestamps[-1]
+        start = np.searchsorted(timestamps, now - span)
+        timestamps = timestamps[start:]
+        values = values[start:]
+        if len(timestamps) <= max_points:
+            return timestamps, values
+        if method == 'minmax':
+            indices = minmax_decimate(values, max_points)
+        else:
+            indices = lttb(timestamps, values, max_points)
+        return timestamps[indices], values[indices]
+
+    def clear(self):
+        for tier in self.tiers:
+            tier.buffer.clear()
+            tier._bucket = None
+            tier._sums[:] = 0
+            tier._count = 0
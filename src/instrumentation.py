@@ -0,0 +1,225 @@
+# instrumentation.py
+# Where GUI-thread time goes. Timer slots and signal handlers are wrapped so
+# each call records its execution time and, for timers, how late it fired,
+# into HDR-style log-linear histograms: a fixed array of counters with 16
+# sub-buckets per power of two (about 6% resolution from 1 µs to over half
+# an hour), so recording is an index computation and an increment. A
+# watchdog timer measures how long the event loop was stalled. The Debug tab
+# shows the summaries and dump() writes them to a file for offline digging.
+
+import json
+import time
+import functools
+
+SUB_BUCKET_BITS = 4
+SUB_BUCKETS = 1 << SUB_BUCKET_BITS
+MAX_BUCKETS = 32 * SUB_BUCKETS + 2 * SUB_BUCKETS   # values up to 2**32 µs
+WATCHDOG_INTERVAL_MS = 100
+STALL_THRESHOLD = 0.1   # seconds of event-loop lateness counted as a stall
+DUMP_FILE = 'latency-report.json'
+
+
+def _bucket_index(value):
+    if value < 2 * SUB_BUCKETS:
+        return value
+    shift = value.bit_length() - (SUB_BUCKET_BITS + 1)
+    return min(shift * SUB_BUCKETS + (value >> shift), MAX_BUCKETS - 1)
+
+
+def _bucket_value(index):
+    """Lowest value (µs) that lands in bucket ``index``."""
+    if index < 2 * SUB_BUCKETS:
+        return index
+    shift = index // SUB_BUCKETS - 1
+    return (index - shift * SUB_BUCKETS) << shift
+
+
+class LatencyHistogram:
+    """Log-linear histogram of durations, recorded in seconds, kept in µs."""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.counts = [0] * MAX_BUCKETS
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds):
+        if seconds < 0:
+            seconds = 0.0
+        self.counts[_bucket_index(int(seconds * 1e6))] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+    def percentile(self, p):
+        """Value in seconds at or below which ``p`` percent of samples fall (bucket midpoint)."""
+        if not self.count:
+            return 0.0
+        rank = max(1, int(round(p / 100.0 * self.count)))
+        seen = 0
+        for index, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank:
+                low, high = _bucket_value(index), _bucket_value(index + 1)
+                return min((low + high) / 2.0 / 1e6, self.max)
+        return self.max
+
+    def summary(self):
+        return {'count': self.count, 'mean': self.mean, 'p50': self.percentile(50),
+                'p90': self.percentile(90), 'p99': self.percentile(99), 'max': self.max}
+
+    def buckets(self):
+        """Non-empty buckets as (lowest µs, count)."""
+        return [(_bucket_value(i), n) for i, n in enumerate(self.counts) if n]
+
+
+class Probe:
+    """Execution time and scheduling lateness of one callback."""
+
+    def __init__(self, name):
+        self.name = name
+        self.exec_time = LatencyHistogram()
+        self.lateness = LatencyHistogram()
+
+    def reset(self):
+        self.exec_time.reset()
+        self.lateness.reset()
+
+
+_probes = {}
+
+
+def probe(name):
+    p = _probes.get(name)
+    if p is None:
+        p = _probes[name] = Probe(name)
+    return p
+
+
+def probes():
+    return dict(_probes)
+
+
+def reset():
+    for p in _probes.values():
+        p.reset()
+
+
+def instrument(name, func):
+    """Wrap ``func`` (a slot or handler) so each call's duration is recorded under ``name``."""
+    histogram = probe(name).exec_time
+
+    @functools.wraps(func)
+    def wrapper(*args):
+        start = time.perf_counter()
+        try:
+            return func(*args)
+        finally:
+            histogram.record(time.perf_counter() - start)
+    return wrapper
+
+
+def connect_timer(timer, name, slot):
+    """Connect ``slot`` to ``timer.timeout``, recording its run time and how late each tick fired.
+
+    The wrapper is not tied to the slot's object, so give ``timer`` that object as parent.
+    """
+    p = probe(name)
+    last = [None]
+
+    def tick():
+        start = time.perf_counter()
+        if last[0] is not None and timer.isActive():
+            p.lateness.record(start - last[0] - timer.interval() / 1000.0)
+        last[0] = start
+        try:
+            slot()
+        finally:
+            p.exec_time.record(time.perf_counter() - start)
+
+    timer.timeout.connect(tick)
+    return tick
+
+
+def single_shot(interval_ms, name, callback):
+    """QTimer.singleShot with lateness and run time recorded under ``name``."""
+    from PyQt5.QtCore import QTimer
+
+    p = probe(name)
+    due = time.perf_counter() + interval_ms / 1000.0
+
+    def fire():
+        start = time.perf_counter()
+        p.lateness.record(start - due)
+        try:
+            callback()
+        finally:
+            p.exec_time.record(time.perf_counter() - start)
+
+    QTimer.singleShot(interval_ms, fire)
+
+
+class EventLoopWatchdog:
+    """Ticks every ``interval_ms`` on the GUI thread; a late tick means the loop was blocked that long."""
+
+    NAME = 'event loop'
+
+    def __init__(self, interval_ms=WATCHDOG_INTERVAL_MS, threshold=STALL_THRESHOLD, parent=None):
+        from PyQt5.QtCore import QTimer
+
+        self.interval = interval_ms / 1000.0
+        self.threshold = threshold
+        self.stalls = 0
+        self.probe = probe(self.NAME)
+        self._last = None
+        self.timer = QTimer(parent)
+        self.timer.timeout.connect(self._tick)
+        self.timer.start(interval_ms)
+
+    def _tick(self):
+        now = time.perf_counter()
+        if self._last is not None:
+            stall = now - self._last - self.interval
+            self.probe.lateness.record(stall)
+            if stall >= self.threshold:
+                self.stalls += 1
+        self._last = now
+
+    def stop(self):
+        self.timer.stop()
+        self._last = None
+
+
+def rows():
+    """Per-probe summary rows for display: (name, calls, exec p50/p99/max, late p99/max) in seconds."""
+    result = {}
+    for name, p in sorted(_probes.items()):
+        e, l = p.exec_time, p.lateness
+        executed = e.count > 0
+        result[name] = (max(e.count, l.count),
+                        e.percentile(50) if executed else None, e.percentile(99) if executed else None,
+                        e.max if executed else None,
+                        l.percentile(99) if l.count else None, l.max if l.count else None)
+    return result
+
+
+def snapshot():
+    return {name: {'exec_time': dict(p.exec_time.summary(), buckets=p.exec_time.buckets()),
+                   'lateness': dict(p.lateness.summary(), buckets=p.lateness.buckets())}
+            for name, p in sorted(_probes.items())}
+
+
+def dump(path=DUMP_FILE):
+    """Write every probe's summaries and histogram buckets (µs) to ``path`` as JSON."""
+    with open(path, 'w') as file:
+        json.dump({'time': time.time(), 'probes': snapshot()}, file, indent=2)
+    return path
+
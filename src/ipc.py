@@ -0,0 +1,429 @@
+# ipc.py
+# Local IPC between the control daemon and GUI clients over a Unix socket.
+#
+# Every message is a length-prefixed frame ('<I' byte count) holding one
+# value in a small tagged binary encoding (None, bools, ints, floats,
+# strings, lists and dicts). Messages are dicts:
+#
+#   client -> daemon   {'id': n, 'cmd': name, 'args': {...}}
+#   daemon -> client   {'id': n, 'ok': True, 'result': value}
+#                      {'id': n, 'ok': False, 'error': message}
+#                      {'delta': {key: value, ...}}
+#
+# The 'subscribe' command replies with the full state and then streams
+# deltas containing only the keys that changed.
+
+import os
+import queue
+import socket
+import struct
+import numbers
+import threading
+
+DEFAULT_SOCKET_PATH = os.path.join(os.environ.get('XDG_RUNTIME_DIR', '/tmp'), 'filament-dryer.sock')
+MAX_MESSAGE_SIZE = 1 << 20
+RECONNECT_INTERVAL = 2.0  # seconds between attempts after the daemon goes away
+REPLY_TIMEOUT = 5.0
+
+# Controller methods a client may call
+COMMANDS = ('start', 'stop', 'select_preset', 'set_pid_gains', 'set_end_mode', 'start_autotune')
+
+_FRAME = struct.Struct('<I')
+_COUNT = struct.Struct('<I')
+_INT = struct.Struct('<q')
+_FLOAT = struct.Struct('<d')
+
+
+def encode(value):
+    """Serialise a value to bytes."""
+    out = bytearray()
+    _encode_into(value, out)
+    return bytes(out)
+
+
+def _encode_into(value, out):
+    if value is None:
+        out += b'n'
+    elif value is True:
+        out += b't'
+    elif value is False:
+        out += b'f'
+    elif isinstance(value, numbers.Integral):
+        out += b'i' + _INT.pack(int(value))
+    elif isinstance(value, numbers.Real):
+        out += b'd' + _FLOAT.pack(float(value))
+    elif isinstance(value, str):
+        data = value.encode('utf-8')
+        out += b's' + _COUNT.pack(len(data)) + data
+    elif isinstance(value, (list, tuple)):
+        out += b'l' + _COUNT.pack(len(value))
+        for item in value:
+            _encode_into(item, out)
+    elif isinstance(value, dict):
+        out += b'm' + _COUNT.pack(len(value))
+        for key, item in value.items():
+            _encode_into(key, out)
+            _encode_into(item, out)
+    else:
+        raise TypeError(f'cannot encode {type(value).__name__}')
+
+
+def decode(data):
+    """Inverse of encode()."""
+    value, offset = _decode_from(memoryview(data), 0)
+    if offset != len(data):
+        raise ValueError('trailing bytes after message')
+    return value
+
+
+def _decode_from(data, offset):
+    tag = bytes(data[offset:offset + 1])
+    offset += 1
+    if tag == b'n':
+        return None, offset
+    if tag == b't':
+        return True, offset
+    if tag == b'f':
+        return False, offset
+    if tag == b'i':
+        return _INT.unpack_from(data, offset)[0], offset + _INT.size
+    if tag == b'd':
+        return _FLOAT.unpack_from(data, offset)[0], offset + _FLOAT.size
+    if tag in (b's', b'l', b'm'):
+        count = _COUNT.unpack_from(data, offset)[0]
+        offset += _COUNT.size
+        if tag == b's':
+            if offset + count > len(data):
+                raise ValueError('truncated string')
+            return str(data[offset:offset + count], 'utf-8'), offset + count
+        if tag == b'l':
+            items = []
+            for _ in range(count):
+                item, offset = _decode_from(data, offset)
+                items.append(item)
+            return items, offset
+        result = {}
+        for _ in range(count):
+            key, offset = _decode_from(data, offset)
+            result[key], offset = _decode_from(data, offset)
+        return result, offset
+    raise ValueError(f'unknown tag {tag!r}')
+
+
+def send_message(sock, message):
+    payload = encode(message)
+    sock.sendall(_FRAME.pack(len(payload)) + payload)
+
+
+def _recv_exact(sock, size):
+    chunks = []
+    while size:
+        chunk = sock.recv(size)
+        if not chunk:
+            raise ConnectionError('connection closed')
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b''.join(chunks)
+
+
+def recv_message(sock):
+    """Block until one whole message arrives; ConnectionError when the peer closes."""
+    size = _FRAME.unpack(_recv_exact(sock, _FRAME.size))[0]
+    if size > MAX_MESSAGE_SIZE:
+        raise ValueError(f'message of {size} bytes exceeds the limit')
+    return decode(_recv_exact(sock, size))
+
+
+class _ClientConnection:
+    """One connected client: a reader thread for commands and a writer thread
+    for replies and deltas, so a slow client never blocks the controller."""
+
+    def __init__(self, server, sock):
+        self.server = server
+        self.sock = sock
+        self.outbox = queue.Queue()
+        self.subscribed = False
+        self.lock = threading.Lock()
+        self._reader = threading.Thread(target=self._read, name='ipc-client-read', daemon=True)
+        self._writer = threading.Thread(target=self._write, name='ipc-client-write', daemon=True)
+
+    def start(self):
+        self._reader.start()
+        self._writer.start()
+
+    def push_delta(self, delta):
+        with self.lock:
+            if self.subscribed:
+                self.outbox.put(('delta', delta))
+
+    def subscribe(self, state, reply):
+        # Under the lock, so every delta for a change the snapshot missed is
+        # queued behind the reply and none is lost in between
+        with self.lock:
+            self.subscribed = True
+            reply.update(ok=True, result=state())
+            self.outbox.put(('reply', reply))
+
+    def close(self):
+        self.outbox.put(('close', None))
+        try:
+            self.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+
+    def _read(self):
+        try:
+            while True:
+                reply = self.server.handle(self, recv_message(self.sock))
+                if reply is not None:
+                    self.outbox.put(('reply', reply))
+        except (ConnectionError, OSError, ValueError):
+            pass
+        finally:
+            self.server.remove_client(self)
+            self.outbox.put(('close', None))
+
+    def _write(self):
+        carry = None
+        try:
+            while True:
+                kind, message = carry or self.outbox.get()
+                carry = None
+                if kind == 'close':
+                    break
+                if kind == 'delta':
+                    # Coalesce a backlog of deltas into one message
+                    delta = dict(message)
+                    while carry is None:
+                        try:
+                            pending = self.outbox.get_nowait()
+                        except queue.Empty:
+                            break
+                        if pending[0] == 'delta':
+                            delta.update(pending[1])
+                        else:
+                            carry = pending
+                    message = {'delta': delta}
+                send_message(self.sock, message)
+        except OSError:
+            pass
+        finally:
+            self.sock.close()
+
+
+class ControlServer:
+    """Serves a DryerController to GUI clients on a Unix socket."""
+
+    def __init__(self, controller, path=DEFAULT_SOCKET_PATH):
+        self.controller = controller
+        self.path = path
+        self._clients = []
+        self._clients_lock = threading.Lock()
+        self._sock = None
+        self._thread = None
+
+    def start(self):
+        if os.path.exists(self.path):
+            # Left behind by a daemon that did not shut down cleanly
+            os.unlink(self.path)
+        self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._sock.bind(self.path)
+        os.chmod(self.path, 0o660)
+        self._sock.listen()
+        self.controller.subscribe(self._broadcast)
+        self._thread = threading.Thread(target=self._accept, name='ipc-server', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self.controller.unsubscribe(self._broadcast)
+        if self._sock is not None:
+            self._sock.close()
+            self._sock = None
+        with self._clients_lock:
+            clients, self._clients = self._clients, []
+        for client in clients:
+            client.close()
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+    def _accept(self):
+        while self._sock is not None:
+            try:
+                sock, _ = self._sock.accept()
+            except OSError:
+                break
+            client = _ClientConnection(self, sock)
+            with self._clients_lock:
+                self._clients.append(client)
+            client.start()
+
+    def remove_client(self, client):
+        with self._clients_lock:
+            if client in self._clients:
+                self._clients.remove(client)
+
+    def _broadcast(self, delta):
+        with self._clients_lock:
+            clients = list(self._clients)
+        for client in clients:
+            client.push_delta(delta)
+
+    def handle(self, client, request):
+        """Run one command and build its reply (None if already queued)."""
+        reply = {'id': request.get('id')}
+        command = request.get('cmd')
+        if command == 'subscribe':
+            client.subscribe(lambda: self.controller.state, reply)
+            return None
+        try:
+            if command == 'state':
+                result = self.controller.state
+            elif command in COMMANDS:
+                result = getattr(self.controller, command)(**request.get('args', {}))
+            else:
+                raise ValueError(f'unknown command {command!r}')
+            reply.update(ok=True, result=result)
+        except Exception as e:
+            reply.update(ok=False, error=str(e))
+        return reply
+
+
+class RemoteController:
+    """Client-side stand-in for DryerController talking to a daemon.
+
+    Keeps a mirror of the daemon's state from the delta stream and offers the
+    same command methods and ``subscribe`` interface, so the GUI does not
+    care which one it drives. Deltas are delivered on the reader thread; the
+    mirror gains a 'connected' key and reconnects when the daemon restarts.
+    """
+
+    def __init__(self, path=DEFAULT_SOCKET_PATH, timeout=REPLY_TIMEOUT):
+        self.path = path
+        self.timeout = timeout
+        self._state = {'connected': False}
+        self._state_lock = threading.Lock()
+        self._subscribers = []
+        self._pending = {}
+        self._next_id = 0
+        self._send_lock = threading.Lock()
+        self._sock = None
+        self._closed = threading.Event()
+        self._connect()
+        self._thread = threading.Thread(target=self._run, name='ipc-remote', daemon=True)
+        self._thread.start()
+        self._call('subscribe', snapshot=True)
+
+    @property
+    def state(self):
+        with self._state_lock:
+            return dict(self._state)
+
+    def subscribe(self, callback):
+        self._subscribers.append(callback)
+
+    def unsubscribe(self, callback):
+        if callback in self._subscribers:
+            self._subscribers.remove(callback)
+
+    def start(self):
+        return self._call('start')
+
+    def stop(self):
+        return self._call('stop')
+
+    def select_preset(self, name, temperature, drying_time, segments=None):
+        return self._call('select_preset', name=name, temperature=temperature, drying_time=drying_time,
+                          segments=segments)
+
+    def set_pid_gains(self, gains):
+        return self._call('set_pid_gains', gains=dict(gains))
+
+    def set_end_mode(self, mode):
+        return self._call('set_end_mode', mode=mode)
+
+    def start_autotune(self):
+        return self._call('start_autotune')
+
+    def close(self):
+        """Disconnect; the daemon keeps controlling the heater."""
+        self._closed.set()
+        sock = self._sock
+        if sock is not None:
+            try:
+                sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+    def _connect(self):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.connect(self.path)
+        self._sock = sock
+
+    def _call(self, command, snapshot=False, **args):
+        with self._send_lock:
+            self._next_id += 1
+            request_id = self._next_id
+            waiter = self._pending[request_id] = [threading.Event(), None, snapshot]
+            if self._sock is None:
+                del self._pending[request_id]
+                raise ConnectionError('not connected to the dryer daemon')
+            send_message(self._sock, {'id': request_id, 'cmd': command, 'args': args})
+        if not waiter[0].wait(self.timeout):
+            self._pending.pop(request_id, None)
+            raise TimeoutError(f'no reply to {command}')
+        reply = waiter[1]
+        if not reply.get('ok'):
+            raise RuntimeError(reply.get('error'))
+        return reply.get('result')
+
+    def _apply(self, delta):
+        with self._state_lock:
+            self._state.update(delta)
+        for callback in list(self._subscribers):
+            try:
+                callback(delta)
+            except Exception as e:
+                print(f'State subscriber failed: {e}')
+
+    def _run(self):
+        while not self._closed.is_set():
+            sock = self._sock
+            try:
+                while True:
+                    message = recv_message(sock)
+                    if 'delta' in message:
+                        self._apply(message['delta'])
+                        continue
+                    waiter = self._pending.pop(message.get('id'), None)
+                    if waiter is None:
+                        continue
+                    if waiter[2] and message.get('ok'):
+                        # Subscription reply: the full state, applied before any delta
+                        self._apply(dict(message['result'], connected=True))
+                    waiter[1] = message
+                    waiter[0].set()
+            except (ConnectionError, OSError, ValueError) as e:
+                if self._closed.is_set():
+                    break
+                print(f'Lost connection to dryer daemon: {e}')
+            with self._send_lock:
+                self._sock = None
+            sock.close()
+            self._apply({'connected': False})
+            self._reconnect()
+
+    def _reconnect(self):
+        while not self._closed.wait(RECONNECT_INTERVAL):
+            try:
+                self._connect()
+            except OSError:
+                continue
+            # Resubscribe from a helper thread: the reply arrives on this one
+            threading.Thread(target=self._resubscribe, daemon=True).start()
+            return
+
+    def _resubscribe(self):
+        try:
+            self._call('subscribe', snapshot=True)
+        except Exception as e:
+            print(f'Resubscribing to dryer daemon failed: {e}')
@@ -0,0 +1,35 @@
+# lazy_page.py
+# Tab placeholder that builds the real page the first time it is shown, so
+# pages the operator never opens cost nothing at startup.
+
+from PyQt5.QtWidgets import QWidget, QVBoxLayout
+from src import startup_trace
+
+
+class LazyPage(QWidget):
+    """Container for a page created by ``factory()`` on first show (or on ``page`` access)."""
+
+    def __init__(self, factory, name=None, parent=None):
+        super().__init__(parent)
+        self.factory = factory
+        self.name = name or getattr(factory, '__name__', 'page')
+        self._page = None
+        layout = QVBoxLayout()
+        layout.setContentsMargins(0, 0, 0, 0)
+        self.setLayout(layout)
+
+    @property
+    def built(self):
+        return self._page is not None
+
+    @property
+    def page(self):
+        if self._page is None:
+            with startup_trace.span(f'build {self.name}'):
+                self._page = self.factory()
+            self.layout().addWidget(self._page)
+        return self._page
+
+    def showEvent(self, event):
+        self.page
+        super().showEvent(event)
@@ -1,87 +1,121 @@
 import sys
-import random
-import datetime
+import time
 from PyQt5.QtWidgets import (QApplication, QWidget, QVBoxLayout, QHBoxLayout, QLabel, 
                              QPushButton, QSlider, QGridLayout, QGroupBox, QComboBox)
 from PyQt5.QtCore import Qt, pyqtSignal, QTimer
 from PyQt5.QtGui import QFont
-import pyqtgraph as pg
 from src.pin_definitions import HEATER_PIN, FAN_PIN, TEMP_SENSOR_PIN, HUMIDITY_SENSOR_PIN, BUZZER_PIN, LED_PIN, BUTTON_PIN, PINS
+from src import startup_trace, instrumentation
+from src.history import TieredHistory
+from src.rolling_stats import RollingStats
+from src.theme import set_state
+from src.preset_diff import reconcile, snapshot_presets
+from src.preset_repository import PresetRepository
+from src.session_log import SESSION_DIR
+from src.controller import DryerController
+from src.state_store import StateStore, qt_frame_scheduler
+
+# Selectable time spans of the live graph (label, seconds)
+GRAPH_SPANS = (('1 h', 3600), ('8 h', 8 * 3600), ('24 h', 24 * 3600))
+DISPLAY_REFRESH_MS = 1000
+
+
+def _state_property(field):
+    # Page attribute backed by a field of the page's StateStore
+    return property(lambda self: self.store[field],
+                    lambda self, value: self.store.update({field: value}))
 
 class MainPage(QWidget):
-    # Add heater and PWM state
-    heater_on = False
-    pwm_value = 0
+    # Heater, preset and countdown state live in self.store
+    heater_on = _state_property('heater_on')
+    pwm_value = _state_property('pwm_value')
+    timer_running = _state_property('timer_running')
+    remaining_time = _state_property('remaining_time')
+    selected_preset = _state_property('preset')
+    target_temperature = _state_property('setpoint')
+    preset_time = _state_property('drying_time')
+    temperature = _state_property('temperature')
+    humidity = _state_property('humidity')
     def update_presets(self, presets):
+        """Add/remove only the preset buttons that changed; the rest keep their state."""
         self.presets = presets
-        layout = self.layout()
-        # Remove old preset card
-        for i in range(layout.count()):
-            item = layout.itemAt(i)
-            widget = item.widget() if item is not None else None
-            if isinstance(widget, QGroupBox) and widget.title() == 'Presets':
-                layout.removeWidget(widget)
-                widget.deleteLater()
-                break
-        # Recreate preset card
-        preset_card = QGroupBox('Presets')
-        preset_card.setStyleSheet('QGroupBox { border-radius: 16px; background: #353941; margin-top: 18px; } QGroupBox:title { font-size: 20px; font-weight: bold; color: #ff9800; }')
-        preset_layout = QHBoxLayout()
-        preset_label = QLabel('Preset:')
-        preset_label.setFont(QFont('Segoe UI', 18, QFont.Weight.Bold))
-        preset_layout.addWidget(preset_label)
-        self.preset_buttons = {}
-        for preset in self.presets:
-            btn = QPushButton(preset)
-            btn.setFont(QFont('Segoe UI', 18, QFont.Weight.Bold))
-            btn.setCheckable(True)
-            btn.setStyleSheet('QPushButton:checked { background-color: #ff9800; color: #232629; border: 2px solid #0078d7; }')
-            btn.clicked.connect(lambda checked, p=preset: self.change_preset(p))
-            self.preset_buttons[preset] = btn
-            preset_layout.addWidget(btn)
-        preset_card.setLayout(preset_layout)
-        layout.insertWidget(0, preset_card)
+        reconcile(self.preset_buttons, self._shown_presets, presets,
+                  create=self.create_preset_button, destroy=self.remove_preset_button)
+        self._shown_presets = snapshot_presets(presets)
+        # Keep the buttons in preset order after the preset label
+        for index, name in enumerate(presets, start=1):
+            btn = self.preset_buttons[name]
+            if self.preset_layout.indexOf(btn) != index:
+                self.preset_layout.removeWidget(btn)
+                self.preset_layout.insertWidget(index, btn)
+
+    def create_preset_button(self, preset, data=None):
+        btn = QPushButton(preset)
+        btn.setFont(QFont('Segoe UI', 18, QFont.Weight.Bold))
+        btn.setCheckable(True)
+        btn.setProperty('role', 'preset')
+        btn.setProperty('selected', preset == self.selected_preset)
+        btn.setChecked(preset == self.selected_preset)
+        btn.clicked.connect(lambda checked, p=preset: self.change_preset(p))
+        self.preset_layout.addWidget(btn)
+        return btn
+
+    def remove_preset_button(self, preset, btn):
+        self.preset_layout.removeWidget(btn)
+        btn.deleteLater()
+
     def start_dryer(self):
-        print(f'Dryer started at {self.temperature_label.text()}')
-        self.heater_on = True
-        self.pwm_value = 255  # Example: full power
-        self.timer_running = True
-        self.countdown_timer.start(1000)
+        self.run_command(self.controller.start)
 
     def stop_dryer(self):
-        print('Dryer stopped')
-        self.heater_on = False
-        self.pwm_value = 0
-        self.timer_running = False
-        self.countdown_timer.stop()
+        self.run_command(self.controller.stop)
+
+    def run_command(self, command, *args):
+        # A remote controller raises if the daemon is unreachable
+        try:
+            command(*args)
+        except Exception as e:
+            print(f'Dryer command failed: {e}')
     switch_to_settings = pyqtSignal()
+    autotune_status = pyqtSignal(str)
+    autotune_finished = pyqtSignal(dict)
+    # Carries controller state deltas from its thread onto the GUI thread
+    state_changed = pyqtSignal(dict)
     
-    def __init__(self):
+    def __init__(self, controller=None, session_dir=SESSION_DIR, repository=None):
         print("MainPage constructor called")
         super().__init__()
-        self.selected_preset = "PLA"
-        self.target_temperature = 34
-        self.temperature_history = []
-        self.humidity_history = []
-        self.time_history = []
-        # Preset data (should match settings_page)
-        self.presets = {
-            "PLA": {"temperature": 66, "drying_time": 60},
-            "ABS": {"temperature": 59, "drying_time": 90},
-            "PETG": {"temperature": 55, "drying_time": 75},
-            "PC": {"temperature": 80, "drying_time": 120}
-        }
-        self.selected_preset = "PLA"
-        self.target_temperature = self.presets[self.selected_preset]["temperature"]
-        self.preset_time = self.presets[self.selected_preset]["drying_time"]
-        self.remaining_time = self.preset_time * 60
-        self.timer_running = False
+        # The heater is driven by the controller (in-process or the daemon);
+        # this page only sends commands and renders its state
+        self.controller = controller if controller is not None else DryerController(session_dir=session_dir)
+        # Views subscribe to fields of this store; bursts of changes are
+        # rendered once per frame
+        self.store = StateStore(schedule=qt_frame_scheduler())
+        self.history = TieredHistory()
+        # Windowed statistics for the Debug tab, updated per sample
+        self.stats = {'temperature': RollingStats(), 'humidity': RollingStats()}
+        self.graph_span = GRAPH_SPANS[0][1]
+        # Same preset source as the settings page; edits there (or to the
+        # file) reach the buttons through the subscription
+        self.repository = repository if repository is not None else PresetRepository()
+        self.presets = self.repository.presets
         self.init_ui()
-        self.simulate_timer = QTimer()
-        self.simulate_timer.timeout.connect(self.simulate_environment)
-        self.simulate_timer.start(1000)
-        self.countdown_timer = QTimer()
-        self.countdown_timer.timeout.connect(self.update_countdown)
+        self.repository.subscribe(self.update_presets)
+        self.state_changed.connect(instrumentation.instrument('MainPage.apply_state', self.apply_state))
+        self.controller.subscribe(self.state_changed.emit)
+        # Start from whatever the controller is doing (a daemon may be mid-run)
+        self.apply_state(self.controller.state)
+        self.store.subscribe(('temperature', 'connected'), self.show_temperature)
+        self.store.subscribe(('humidity',), self.show_humidity)
+        self.store.subscribe(('remaining_time', 'cycle_notice', 'profile_status', 'dryness_status'),
+                             lambda changes: self.update_countdown_label())
+        self.store.subscribe(('preset', 'setpoint', 'drying_time'),
+                             lambda changes: self.show_selected_preset(self.selected_preset))
+        # Samples the history even while another tab is shown; the graph
+        # itself is only redrawn while visible
+        self.display_timer = QTimer(self)
+        instrumentation.connect_timer(self.display_timer, 'MainPage.display_timer', self.update_environment)
+        self.display_timer.start(DISPLAY_REFRESH_MS)
 
 
     def init_ui(self):
@@ -89,28 +123,21 @@ class MainPage(QWidget):
 
         # Preset quick-select (buttons) in a rounded card
         preset_card = QGroupBox('Presets')
-        preset_card.setStyleSheet('QGroupBox { border-radius: 16px; background: #353941; margin-top: 18px; box-shadow: 0 2px 8px rgba(0,0,0,0.10); } QGroupBox:title { font-size: 20px; font-weight: bold; color: #ff9800; }')
         preset_layout = QHBoxLayout()
         preset_label = QLabel('Preset:')
         preset_label.setFont(QFont('Segoe UI', 18, QFont.Weight.Bold))
         preset_layout.addWidget(preset_label)
+        self.preset_layout = preset_layout
         self.preset_buttons = {}
-        for preset in self.presets:
-            btn = QPushButton(preset)
-            btn.setFont(QFont('Segoe UI', 18, QFont.Weight.Bold))
-            btn.setCheckable(True)
-            btn.setStyleSheet('QPushButton:checked { background-color: #ff9800; color: #232629; border: 2px solid #0078d7; }')
-            btn.clicked.connect(lambda checked, p=preset: self.change_preset(p))
-            self.preset_buttons[preset] = btn
-        for btn in self.preset_buttons.values():
-            preset_layout.addWidget(btn)
+        self._shown_presets = {}
+        self.update_presets(self.presets)
         preset_card.setLayout(preset_layout)
         layout.addWidget(preset_card)
 
         # Divider
         divider1 = QLabel()
         divider1.setFixedHeight(2)
-        divider1.setStyleSheet('background: #0078d7; margin: 12px 0;')
+        divider1.setProperty('role', 'divider')
         layout.addWidget(divider1)
 
         # Humidity label
@@ -128,7 +155,7 @@ class MainPage(QWidget):
         # Divider
         divider2 = QLabel()
         divider2.setFixedHeight(2)
-        divider2.setStyleSheet('background: #0078d7; margin: 12px 0;')
+        divider2.setProperty('role', 'divider')
         layout.addWidget(divider2)
 
         # Preset info and countdown
@@ -144,7 +171,6 @@ class MainPage(QWidget):
 
         # Control buttons in a rounded card
         control_card = QGroupBox('Controls')
-        control_card.setStyleSheet('QGroupBox { border-radius: 16px; background: #353941; margin-top: 18px; box-shadow: 0 2px 8px rgba(0,0,0,0.10); } QGroupBox:title { font-size: 20px; font-weight: bold; color: #ff9800; }')
         button_layout = QHBoxLayout()
         self.start_button = QPushButton('Start Dryer')
         self.start_button.setFont(QFont('Segoe UI', 18, QFont.Weight.Bold))
@@ -159,75 +185,150 @@ class MainPage(QWidget):
 
         # Live graph (PyQtGraph) in a rounded card
         graph_group = QGroupBox("Live Environment Graph")
-        graph_group.setStyleSheet('QGroupBox { border-radius: 16px; background: #353941; margin-top: 18px; box-shadow: 0 2px 8px rgba(0,0,0,0.10); } QGroupBox:title { font-size: 20px; font-weight: bold; color: #ff9800; }')
         graph_layout = QVBoxLayout()
-        self.graph_widget = pg.PlotWidget()
-        self.graph_widget.setBackground('w')
-        self.graph_widget.showGrid(x=True, y=True)
-        self.graph_widget.setMinimumHeight(250)
-        self.temp_curve = self.graph_widget.plot(pen=pg.mkPen('r', width=2), name="Temperature (°C)")
-        self.hum_curve = self.graph_widget.plot(pen=pg.mkPen('b', width=2), name="Humidity (%)")
-        graph_layout.addWidget(self.graph_widget)
+        span_layout = QHBoxLayout()
+        self.span_buttons = {}
+        for label, span in GRAPH_SPANS:
+            btn = QPushButton(label)
+            btn.setFont(QFont('Segoe UI', 16, QFont.Weight.Bold))
+            btn.setCheckable(True)
+            btn.setChecked(span == self.graph_span)
+            btn.clicked.connect(lambda checked, s=span: self.set_graph_span(s))
+            self.span_buttons[span] = btn
+            span_layout.addWidget(btn)
+        graph_layout.addLayout(span_layout)
+        # The plot (and pyqtgraph) is created after the page is first shown
+        self.graph_layout = graph_layout
+        self.graph_widget = None
         graph_group.setLayout(graph_layout)
         layout.addWidget(graph_group)
 
         self.setLayout(layout)
 
     def update_selected_preset(self, preset):
-        self.selected_preset = preset
+        temperature = self.presets[preset]["temperature"]
+        drying_time = self.presets[preset]["drying_time"]
+        self.store.update(preset=preset, setpoint=temperature, drying_time=drying_time,
+                          remaining_time=drying_time * 60, profile_status='')
+        self.run_command(self.controller.select_preset, preset, temperature, drying_time,
+                         self.presets[preset].get('segments'))
+        # Direct touch input: render now rather than on the next frame
+        self.store.flush()
+
+    def show_selected_preset(self, preset):
+        # Only the buttons whose selection flips get re-polished
         for p, btn in self.preset_buttons.items():
-            if p == preset:
-                btn.setChecked(True)
-                btn.setStyleSheet('QPushButton { background-color: #0078d7; color: #fff; border: 2px solid #ff9800; }')
-            else:
-                btn.setChecked(False)
-                btn.setStyleSheet('QPushButton { background-color: #353941; color: #f0f0f0; border: none; }')
-        self.target_temperature = self.presets[preset]["temperature"]
-        self.preset_time = self.presets[preset]["drying_time"]
-        self.remaining_time = self.preset_time * 60
+            btn.setChecked(p == preset)
+            set_state(btn, 'selected', p == preset)
         self.update_preset_info()
-        self.update_countdown_label()
 
     def change_preset(self, preset):
         self.update_selected_preset(preset)
 
-    def simulate_environment(self):
-        # Simulate temperature and humidity
-        temp = 34 + random.uniform(-2, 2)
-        humidity = 30 + random.uniform(-5, 5)
-        self.temperature_label.setText(f'Temperature: {temp:.1f}°C')
-        self.humidity_label.setText(f'Humidity: {humidity:.1f}%')
-        self.temperature_history.append(temp)
-        self.humidity_history.append(humidity)
-        self.time_history.append(datetime.datetime.now().strftime('%H:%M:%S'))
-        if len(self.temperature_history) > 60:
-            self.temperature_history.pop(0)
-            self.humidity_history.pop(0)
-            self.time_history.pop(0)
-        self.update_graph()
+    def set_pid_gains(self, values):
+        self.run_command(self.controller.set_pid_gains, values)
+
+    def set_end_mode(self, mode):
+        self.run_command(self.controller.set_end_mode, mode)
+
+    def start_autotune(self):
+        self.run_command(self.controller.start_autotune)
+
+    def apply_state(self, delta):
+        """Feed a controller state delta into the store (GUI thread)."""
+        self.store.update(delta)
+        if delta.get('autotune_status'):
+            self.autotune_status.emit(delta['autotune_status'])
+        if delta.get('autotune_gains'):
+            self.autotune_finished.emit(delta['autotune_gains'])
+
+    def show_temperature(self, changes):
+        if not self.store['connected']:
+            self.temperature_label.setText('Temperature: -- (dryer daemon offline)')
+        elif self.temperature is not None:
+            self.temperature_label.setText(f'Temperature: {self.temperature:.1f}°C')
+
+    def show_humidity(self, changes):
+        if self.humidity is not None:
+            self.humidity_label.setText(f'Humidity: {self.humidity:.1f}%')
+
+    def update_environment(self):
+        # Sample the mirrored state into the graph history once per refresh
+        temp, humidity = self.temperature, self.humidity
+        if temp is None and humidity is None:
+            return
+        now = time.time()
+        self.stats['temperature'].add(now, temp)
+        self.stats['humidity'].add(now, humidity)
+        self.history.append(now,
+                            float('nan') if temp is None else temp,
+                            float('nan') if humidity is None else humidity,
+                            self.pwm_value)
+        if self.isVisible():
+            self.update_graph()
 
     def update_preset_info(self):
-        preset = self.selected_preset
-        temp = self.presets[preset]["temperature"]
-        time = self.presets[preset]["drying_time"]
-        self.preset_info_label.setText(f"Preset: {preset} | Temp: {temp}°C | Time: {time} min")
+        # The controller's values, so a preset started elsewhere still shows
+        self.preset_info_label.setText(f"Preset: {self.selected_preset} | Temp: {self.target_temperature:g}°C | "
+                                       f"Time: {self.preset_time} min")
 
     def update_countdown_label(self):
         mins, secs = divmod(self.remaining_time, 60)
-        self.countdown_label.setText(f"Time Remaining: {mins:02d}:{secs:02d}")
+        lines = [f"Time Remaining: {mins:02d}:{secs:02d}"]
+        lines += [text for text in (self.store['profile_status'], self.store['dryness_status'],
+                                    self.store['cycle_notice']) if text]
+        self.countdown_label.setText('\n'.join(lines))
+
+    def set_graph_span(self, span):
+        self.graph_span = span
+        for s, btn in self.span_buttons.items():
+            btn.setChecked(s == span)
+        self.update_graph()
+
+    def build_graph(self):
+        if self.graph_widget is not None:
+            return
+        # pyqtgraph takes a noticeable share of cold start on a Pi, so it is
+        # only imported once there is a graph to show
+        with startup_trace.span('build graph'):
+            import pyqtgraph as pg
+            # Timestamps go straight onto a date axis, so no per-tick x array is built
+            self.graph_widget = pg.PlotWidget(axisItems={'bottom': pg.DateAxisItem()})
+            self.graph_widget.setBackground('w')
+            self.graph_widget.showGrid(x=True, y=True)
+            self.graph_widget.setMinimumHeight(250)
+            self.temp_curve = self.graph_widget.plot(pen=pg.mkPen('r', width=2), name="Temperature (°C)")
+            self.hum_curve = self.graph_widget.plot(pen=pg.mkPen('b', width=2), name="Humidity (%)")
+            self.graph_layout.addWidget(self.graph_widget)
+        self.update_graph()
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        if self.graph_widget is None:
+            # After the first frame, so the labels appear before the plot is built
+            QTimer.singleShot(0, self.build_graph)
+        else:
+            self.update_graph()
 
     def update_graph(self):
-        # Use PyQtGraph for live plotting
-        x = list(range(len(self.temperature_history)))
-        self.temp_curve.setData(x, self.temperature_history)
-        self.hum_curve.setData(x, self.humidity_history)
-
-    def update_countdown(self):
-        if self.timer_running and self.remaining_time > 0:
-            self.remaining_time -= 1
-            self.update_countdown_label()
-            if self.remaining_time == 0:
-                self.stop_dryer()
+        if self.graph_widget is None:
+            return
+        # Plot no more points than the graph is wide; the history picks the tier
+        max_points = max(100, self.graph_widget.width())
+        now = time.time()
+        x, temps = self.history.window('temperature', self.graph_span, max_points, now=now)
+        hx, hums = self.history.window('humidity', self.graph_span, max_points, now=now)
+        self.temp_curve.setData(x, temps)
+        self.hum_curve.setData(hx, hums)
+        self.graph_widget.setXRange(now - self.graph_span, now, padding=0)
+
+    def closeEvent(self, event):
+        self.display_timer.stop()
+        self.repository.unsubscribe(self.update_presets)
+        self.controller.unsubscribe(self.state_changed.emit)
+        # Stops an in-process controller; a daemon keeps running on its own
+        self.controller.close()
+        super().closeEvent(event)
 
 if __name__ == "__main__":
     print("Main entry point reached")
@@ -0,0 +1,192 @@
+# material_library.py
+# Spool/material profiles by the thousand. Profiles live in a flat list and
+# typeahead search goes through an in-memory index: word prefixes for one-
+# and two-letter queries, trigrams for anything longer, so a query touches
+# only the candidate set instead of scanning every profile. Community spool
+# databases are stream-parsed (JSON array or JSON Lines) a chunk at a time
+# rather than loaded whole with json.load.
+
+import json
+from collections import namedtuple, defaultdict
+from src.preset_repository import DEFAULT_PRESETS
+
+MATERIALS_FILE = 'materials.json'
+READ_CHUNK = 64 * 1024
+
+Profile = namedtuple('Profile', ['name', 'brand', 'material', 'temperature', 'drying_time'])
+
+# Accepted spellings of each field in community databases
+_FIELDS = {
+    'name': ('name', 'title'),
+    'brand': ('brand', 'manufacturer', 'vendor'),
+    'material': ('material', 'type'),
+    'temperature': ('drying_temperature', 'dry_temp', 'temperature'),
+    'drying_time': ('drying_time', 'dry_time'),
+}
+
+
+def _field(record, field):
+    for key in _FIELDS[field]:
+        value = record.get(key)
+        if value not in (None, ''):
+            return value
+    return None
+
+
+def profile_from_record(record):
+    """Profile for one database record, or None if it cannot be used.
+
+    Records without drying settings take the defaults for their material.
+    """
+    if not isinstance(record, dict):
+        return None
+    name = _field(record, 'name')
+    material = str(_field(record, 'material') or '').upper()
+    defaults = DEFAULT_PRESETS.get(material, {})
+    temperature = _field(record, 'temperature') or defaults.get('temperature')
+    drying_time = _field(record, 'drying_time') or defaults.get('drying_time')
+    if not name or temperature is None or drying_time is None:
+        return None
+    try:
+        return Profile(str(name), str(_field(record, 'brand') or ''), material,
+                       float(temperature), int(drying_time))
+    except (TypeError, ValueError):
+        return None
+
+
+def iter_records(file, chunk_size=READ_CHUNK):
+    """Yield the objects of a JSON array or a JSON Lines stream, reading ``chunk_size`` at a time."""
+    decoder = json.JSONDecoder()
+    buffer = ''
+    pos = 0
+    in_array = None
+    eof = False
+    while True:
+        # Skip whitespace and, inside an array, separators
+        while pos < len(buffer) and buffer[pos] in ' \t\r\n,':
+            pos += 1
+        if in_array is None and pos < len(buffer):
+            in_array = buffer[pos] == '['
+            if in_array:
+                pos += 1
+            continue
+        if pos < len(buffer) and in_array and buffer[pos] == ']':
+            return
+        if pos < len(buffer):
+            try:
+                record, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                record = None
+            if record is not None:
+                pos = end
+                yield record
+                continue
+        elif eof:
+            return
+        # Need more input: drop what was consumed and read the next chunk
+        chunk = file.read(chunk_size)
+        buffer = buffer[pos:] + chunk
+        pos = 0
+        eof = not chunk
+
+
+def iter_profiles(path, chunk_size=READ_CHUNK):
+    """Usable profiles from a spool database file, streamed."""
+    with open(path, 'r', encoding='utf-8') as file:
+        for record in iter_records(file, chunk_size):
+            profile = profile_from_record(record)
+            if profile is not None:
+                yield profile
+
+
+def _words(text):
+    return [word for word in ''.join(c if c.isalnum() else ' ' for c in text.lower()).split()]
+
+
+def _trigrams(word):
+    return {word[i:i + 3] for i in range(len(word) - 2)}
+
+
+class MaterialIndex:
+    """Prefix/trigram index over profile name, brand and material."""
+
+    def __init__(self):
+        self._text = []                       # row -> searchable words joined
+        self._prefixes = defaultdict(set)     # 1-2 letter word prefix -> rows
+        self._trigrams = defaultdict(set)     # trigram -> rows
+        self._last = ('', None)               # previous query and its rows
+
+    def __len__(self):
+        return len(self._text)
+
+    def add(self, profile):
+        row = len(self._text)
+        words = _words(f'{profile.name} {profile.brand} {profile.material}')
+        self._text.append(' '.join(words))
+        for word in words:
+            self._prefixes[word[:1]].add(row)
+            self._prefixes[word[:2]].add(row)
+            for gram in _trigrams(word):
+                self._trigrams[gram].add(row)
+        self._last = ('', None)
+        return row
+
+    def _rows_for(self, term):
+        if len(term) < 3:
+            return self._prefixes.get(term, set())
+        grams = sorted(_trigrams(term), key=lambda g: len(self._trigrams.get(g, ())))
+        rows = set(self._trigrams.get(grams[0], ()))
+        for gram in grams[1:]:
+            rows &= self._trigrams.get(gram, set())
+            if not rows:
+                break
+        # Trigrams can match out of order; confirm the substring
+        return {row for row in rows if term in self._text[row]}
+
+    def search(self, query):
+        """Rows (in insertion order) whose words contain every term of ``query``."""
+        terms = _words(query)
+        if not terms:
+            return list(range(len(self._text)))
+        last_query, last_rows = self._last
+        last_terms = _words(last_query)
+        if last_rows is not None and last_terms and query.lower().startswith(last_query.lower()) \
+                and len(terms) == len(last_terms) and min(map(len, last_terms)) >= 3:
+            # Typeahead: extending substring terms can only narrow the previous result
+            rows = [row for row in last_rows if all(term in self._text[row] for term in terms)]
+        else:
+            candidates = None
+            for term in sorted(terms, key=len, reverse=True):
+                found = self._rows_for(term)
+                candidates = found if candidates is None else candidates & found
+                if not candidates:
+                    break
+            rows = sorted(candidates)
+        self._last = (query, rows)
+        return rows
+
+
+class MaterialLibrary:
+    """Profiles plus their search index."""
+
+    def __init__(self, profiles=()):
+        self.profiles = []
+        self.index = MaterialIndex()
+        self.extend(profiles)
+
+    def __len__(self):
+        return len(self.profiles)
+
+    def extend(self, profiles):
+        for profile in profiles:
+            self.profiles.append(profile)
+            self.index.add(profile)
+
+    def search(self, query):
+        return [self.profiles[row] for row in self.index.search(query)]
+
+    @classmethod
+    def from_file(cls, path):
+        return cls(iter_profiles(path))
@@ -0,0 +1,63 @@
+# material_model.py
+# Qt list model over a MaterialLibrary. The view only asks for the rows it
+# is painting, so thousands of profiles cost no more to show than a dozen;
+# filtering swaps the row list from the library's search index.
+
+from PyQt5.QtCore import Qt, QAbstractListModel, QModelIndex
+from src.material_library import MaterialLibrary
+
+ProfileRole = Qt.ItemDataRole.UserRole + 1
+
+
+def profile_text(profile):
+    brand = f'{profile.brand} ' if profile.brand else ''
+    return f'{profile.name}\n{brand}{profile.material} · {profile.temperature:g}°C, {profile.drying_time} min'
+
+
+class MaterialListModel(QAbstractListModel):
+    """Rows are the library profiles matching the current filter."""
+
+    def __init__(self, library=None, parent=None):
+        super().__init__(parent)
+        self.library = library if library is not None else MaterialLibrary()
+        self.query = ''
+        self._rows = list(range(len(self.library)))
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid() or index.row() >= len(self._rows):
+            return None
+        profile = self.library.profiles[self._rows[index.row()]]
+        if role == Qt.ItemDataRole.DisplayRole:
+            return profile_text(profile)
+        if role == ProfileRole:
+            return profile
+        return None
+
+    def profile(self, row):
+        return self.library.profiles[self._rows[row]]
+
+    def set_filter(self, query):
+        self.beginResetModel()
+        self.query = query
+        self._rows = self.library.index.search(query)
+        self.endResetModel()
+
+    def add_profiles(self, profiles):
+        """Append to the library; with no filter the new rows are inserted in place."""
+        start = len(self.library)
+        self.library.extend(profiles)
+        if self.query:
+            self.set_filter(self.query)
+        elif len(self.library) > start:
+            self.beginInsertRows(QModelIndex(), start, len(self.library) - 1)
+            self._rows.extend(range(start, len(self.library)))
+            self.endInsertRows()
+
+    def clear(self):
+        self.beginResetModel()
+        self.library = MaterialLibrary()
+        self._rows = []
+        self.endResetModel()
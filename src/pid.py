@@ -0,0 +1,271 @@
+# pid.py
+# PID heater control: the controller maths plus a fixed-period control loop
+# that runs on its own thread, independent of the Qt event loop
+
+import time
+import threading
+import numpy as np
+
+# Gains used until the operator saves their own on the Settings page
+DEFAULT_PID_GAINS = {'P': 8.0, 'I': 0.05, 'D': 20.0}
+DEFAULT_CONTROL_PERIOD = 0.5  # seconds
+
+
+class PIDController:
+    """Positional PID with the usual practical fixes for a heater.
+
+    - the derivative acts on the measurement, so setpoint changes do not kick
+    - the integral is stored as its output contribution and clamped to the
+      output range, and it stops growing while the output is saturated
+      (anti-windup)
+    - ``set_gains`` rebalances the integral so the output does not jump
+      (bumpless transfer)
+    """
+
+    def __init__(self, kp, ki, kd, setpoint=0.0, output_min=0.0, output_max=100.0,
+                 derivative_smoothing=0.0):
+        self.kp = kp
+        self.ki = ki
+        self.kd = kd
+        self.setpoint = setpoint
+        self.output_min = output_min
+        self.output_max = output_max
+        # 0 = raw derivative, towards 1 = heavier low-pass filtering
+        self.derivative_smoothing = derivative_smoothing
+        self.reset()
+
+    def reset(self, output=0.0):
+        """Forget history; the next update starts from ``output`` without a bump."""
+        self._integral = self._clamp(output)
+        self._last_measurement = None
+        self._derivative = 0.0
+        self.output = self._clamp(output)
+
+    def _clamp(self, value):
+        return max(self.output_min, min(self.output_max, value))
+
+    def update(self, measurement, dt):
+        """Advance the controller by ``dt`` seconds and return the new output."""
+        error = self.setpoint - measurement
+        if self._last_measurement is None or dt <= 0:
+            derivative = 0.0
+        else:
+            raw = -(measurement - self._last_measurement) / dt
+            a = self.derivative_smoothing
+            derivative = a * self._derivative + (1 - a) * raw
+        self._derivative = derivative
+        self._last_measurement = measurement
+
+        p_term = self.kp * error
+        d_term = self.kd * derivative
+        integral = self._integral + self.ki * error * dt
+        unclamped = p_term + integral + d_term
+        # Conditional integration: only accept the new integral if it does not
+        # push further into saturation
+        if (unclamped > self.output_max and error > 0) or (unclamped < self.output_min and error < 0):
+            integral = self._integral
+        self._integral = self._clamp(integral)
+        self.output = self._clamp(p_term + self._integral + d_term)
+        return self.output
+
+    def set_gains(self, kp, ki, kd):
+        """Change gains while holding the current output (bumpless transfer)."""
+        if self._last_measurement is not None:
+            error = self.setpoint - self._last_measurement
+            old_pd = self.kp * error + self.kd * self._derivative
+            new_pd = kp * error + kd * self._derivative
+            self._integral = self._clamp(self._integral + old_pd - new_pd)
+        self.kp, self.ki, self.kd = kp, ki, kd
+
+    @property
+    def gains(self):
+        return {'P': self.kp, 'I': self.ki, 'D': self.kd}
+
+
+class LoopStats:
+    """Running timing figures of a periodic loop (all values in seconds)."""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.iterations = 0
+        self.overruns = 0
+        self.jitter_max = 0.0
+        self.exec_max = 0.0
+        self._jitter_sum = 0.0
+        self._exec_sum = 0.0
+
+    def record(self, lateness, exec_time, period):
+        self.iterations += 1
+        self._jitter_sum += lateness
+        self._exec_sum += exec_time
+        self.jitter_max = max(self.jitter_max, lateness)
+        self.exec_max = max(self.exec_max, exec_time)
+        if lateness + exec_time > period:
+            self.overruns += 1
+
+    @property
+    def jitter_mean(self):
+        return self._jitter_sum / self.iterations if self.iterations else 0.0
+
+    @property
+    def exec_mean(self):
+        return self._exec_sum / self.iterations if self.iterations else 0.0
+
+    def snapshot(self):
+        return {
+            'iterations': self.iterations,
+            'overruns': self.overruns,
+            'jitter_mean': self.jitter_mean,
+            'jitter_max': self.jitter_max,
+            'exec_mean': self.exec_mean,
+            'exec_max': self.exec_max,
+        }
+
+
+class ControlLoop:
+    """Runs a PIDController every ``period`` seconds on a dedicated thread.
+
+    ``read_measurement`` returns the latest temperature (or None while no
+    reading is available) and ``write_output`` receives the heater duty in
+    percent. Deadlines are absolute on the monotonic clock, so a late wake-up
+    does not shift every later iteration. With a ``scheduler``
+    (src.scheduler.PeriodicScheduler) the loop runs as one of its tasks
+    instead of on its own thread.
+    """
+
+    def __init__(self, controller, read_measurement, write_output, period=DEFAULT_CONTROL_PERIOD,
+                 scheduler=None, name='pid-control'):
+        self.controller = controller
+        self.read_measurement = read_measurement
+        self.write_output = write_output
+        self.period = period
+        self.scheduler = scheduler
+        self.name = name
+        self.stats = LoopStats()
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._task = None
+        self._last_step = None
+
+    @property
+    def running(self):
+        if self._task is not None:
+            return not self._task.cancelled
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        if self.running:
+            return
+        self._stop_event.clear()
+        self._last_step = None
+        self.stats.reset()
+        if self.scheduler is not None:
+            self._task = self.scheduler.add(self.name, self.step, self.period, stats=self.stats)
+            return
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=2.0):
+        self._stop_event.set()
+        if self._task is not None:
+            # Waits for a step in progress, so it cannot overwrite the 0 below
+            self._task.cancel()
+            self._task = None
+        if self._thread is not None and self._thread.is_alive():
+            self._thread.join(timeout)
+        self._thread = None
+        self.write_output(0.0)
+
+    def set_gains(self, kp, ki, kd):
+        with self._lock:
+            self.controller.set_gains(kp, ki, kd)
+
+    def set_setpoint(self, setpoint):
+        with self._lock:
+            self.controller.setpoint = setpoint
+
+    def set_controller(self, controller):
+        """Swap the algorithm (e.g. a relay autotuner) without restarting the thread."""
+        with self._lock:
+            self.controller = controller
+
+    def step(self, now=None):
+        """Run one control iteration; returns the duty written (or None)."""
+        now = time.monotonic() if now is None else now
+        measurement = self.read_measurement()
+        if measurement is None:
+            return None
+        dt = self.period if self._last_step is None else now - self._last_step
+        self._last_step = now
+        with self._lock:
+            output = self.controller.update(measurement, dt)
+        self.write_output(output)
+        return output
+
+    def _run(self):
+        deadline = time.monotonic()
+        while not self._stop_event.is_set():
+            started = time.monotonic()
+            try:
+                self.step(started)
+            except Exception as e:
+                print(f'Control loop step failed: {e}')
+            finished = time.monotonic()
+            self.stats.record(max(0.0, started - deadline), finished - started, self.period)
+            deadline += self.period
+            if deadline < finished:
+                # Missed one or more periods: resynchronise instead of bursting
+                deadline = finished
+            self._stop_event.wait(deadline - time.monotonic())
+
+
+class BatchPIDController:
+    """NumPy version of PIDController running many independent loops at once.
+
+    Gains and setpoints may be scalars or arrays of shape ``(batch,)``; the
+    update rule (anti-windup, derivative on measurement, clamping) is the
+    same as PIDController's, which lets simulations and the autotuner score
+    hundreds of candidate gain sets in one pass.
+    """
+
+    def __init__(self, kp, ki, kd, setpoint=0.0, output_min=0.0, output_max=100.0,
+                 derivative_smoothing=0.0):
+        self.kp, self.ki, self.kd = (np.asarray(g, dtype=np.float64) for g in (kp, ki, kd))
+        self.setpoint = np.asarray(setpoint, dtype=np.float64)
+        self.output_min = output_min
+        self.output_max = output_max
+        self.derivative_smoothing = derivative_smoothing
+        self.batch = np.broadcast(self.kp, self.ki, self.kd, self.setpoint).shape
+        self.reset()
+
+    def reset(self, output=0.0):
+        self._integral = np.clip(np.broadcast_to(output, self.batch).astype(np.float64),
+                                 self.output_min, self.output_max)
+        self._last_measurement = None
+        self._derivative = np.zeros(self.batch)
+        self.output = self._integral.copy()
+
+    def update(self, measurement, dt):
+        measurement = np.asarray(measurement, dtype=np.float64)
+        error = self.setpoint - measurement
+        if self._last_measurement is None:
+            derivative = np.zeros(self.batch)
+        else:
+            raw = -(measurement - self._last_measurement) / dt
+            a = self.derivative_smoothing
+            derivative = a * self._derivative + (1 - a) * raw
+        self._derivative = derivative
+        self._last_measurement = measurement
+
+        p_term = self.kp * error
+        d_term = self.kd * derivative
+        integral = self._integral + self.ki * error * dt
+        unclamped = p_term + integral + d_term
+        winding = ((unclamped > self.output_max) & (error > 0)) | ((unclamped < self.output_min) & (error < 0))
+        integral = np.where(winding, self._integral, integral)
+        self._integral = np.clip(integral, self.output_min, self.output_max)
+        self.output = np.clip(p_term + self._integral + d_term, self.output_min, self.output_max)
+        return self.output
@@ -6,9 +6,9 @@ HEATER_PIN = 18
 FAN_PIN = 17
 TEMP_SENSOR_PIN = 4
 HUMIDITY_SENSOR_PIN = 5
-#BUZZER_PIN = 22
-#LED_PIN = 27
-#BUTTON_PIN = 23
+BUZZER_PIN = 22
+LED_PIN = 27
+BUTTON_PIN = 23
 # Add more pins as needed
 
 # You can also use a dictionary for grouped pins
@@ -20,4 +20,23 @@ PINS = {
     'buzzer': BUZZER_PIN,
     'led': LED_PIN,
     'button': BUTTON_PIN,
+    # ids of this chamber's DS18B20 probes, averaged (e.g. ['28-0316a2798cff']);
+    # None uses the first probe found on the bus
+    'temp_probes': None,
 }
+
+# Multi-chamber setups (src.chamber): heater and fan pins per chamber, the
+# first being the single-dryer group above. All DS18B20s share the 1-Wire
+# bus on TEMP_SENSOR_PIN and further humidity sensors sit on I2C, so only
+# the switched outputs need pins of their own.
+CHAMBER_PINS = (
+    PINS,
+    {'heater': 12, 'fan': 16, 'temp_sensor': TEMP_SENSOR_PIN},
+    {'heater': 13, 'fan': 19, 'temp_sensor': TEMP_SENSOR_PIN},
+    {'heater': 24, 'fan': 25, 'temp_sensor': TEMP_SENSOR_PIN},
+    {'heater': 26, 'fan': 20, 'temp_sensor': TEMP_SENSOR_PIN},
+    {'heater': 21, 'fan': 6, 'temp_sensor': TEMP_SENSOR_PIN},
+    {'heater': 7, 'fan': 8, 'temp_sensor': TEMP_SENSOR_PIN},
+    {'heater': 9, 'fan': 10, 'temp_sensor': TEMP_SENSOR_PIN},
+)
+MAX_CHAMBERS = len(CHAMBER_PINS)
@@ -0,0 +1,42 @@
+# preset_diff.py
+# Keyed reconciliation of preset widgets: compare the preset dict a view last
+# rendered with the new one and touch only the entries that were added,
+# removed or edited, so existing widgets (and their checked state) survive.
+
+from collections import namedtuple
+
+PresetDiff = namedtuple('PresetDiff', ['added', 'removed', 'changed'])
+
+
+def diff_presets(old, new):
+    """Names added, removed and with changed data between two preset dicts (in ``new`` order)."""
+    added = [name for name in new if name not in old]
+    removed = [name for name in old if name not in new]
+    changed = [name for name in new if name in old and old[name] != new[name]]
+    return PresetDiff(added, removed, changed)
+
+
+def snapshot_presets(presets):
+    """Copy of a preset dict to diff against later (views share and mutate the live one)."""
+    return {name: dict(data) for name, data in presets.items()}
+
+
+def reconcile(widgets, old, new, create, update=None, destroy=None):
+    """Bring ``widgets`` (name -> widget) in line with ``new``.
+
+    ``create(name, data)`` returns the widget for an added preset,
+    ``update(name, widget, data)`` refreshes an edited one and
+    ``destroy(name, widget)`` disposes of a removed one. Returns the diff.
+    """
+    diff = diff_presets(old, new)
+    for name in diff.removed:
+        widget = widgets.pop(name, None)
+        if widget is not None and destroy is not None:
+            destroy(name, widget)
+    if update is not None:
+        for name in diff.changed:
+            if name in widgets:
+                update(name, widgets[name], new[name])
+    for name in diff.added:
+        widgets[name] = create(name, new[name])
+    return diff
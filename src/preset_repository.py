@@ -0,0 +1,237 @@
+# preset_repository.py
+# The one place preset data is read from and written to. presets.json is
+# parsed and validated once and cached; writes go to a temp file that is
+# fsynced and renamed over the original, so a power cut leaves either the
+# old or the new file, never a torn one. Writers from several processes are
+# serialised with a lock file where fcntl is available. Subscribers are told
+# about every change, whether saved here or picked up from disk.
+
+import os
+import json
+import tempfile
+import threading
+from src.profiles import ProfileError, validate_segments, profile_summary
+
+try:
+    import fcntl
+except ImportError:
+    # Windows: writes are still atomic, only cross-process locking is lost
+    fcntl = None
+
+PRESETS_FILE = 'presets.json'
+MAX_TEMPERATURE = 120  # °C, above anything a filament dryer should reach
+
+DEFAULT_PRESETS = {
+    'PLA': {'temperature': 66, 'drying_time': 60},
+    'ABS': {'temperature': 59, 'drying_time': 90},
+    'PETG': {'temperature': 55, 'drying_time': 75},
+    'PC': {'temperature': 80, 'drying_time': 120},
+}
+
+
+class PresetError(ValueError):
+    """Preset data that cannot be used."""
+
+
+def validate_presets(data):
+    """Return a normalised copy of ``data`` or raise PresetError.
+
+    Accepts the old ``{"PLA": "34°C"}`` format, which gets a 60 min drying time.
+    A preset with ``segments`` (see src.profiles) gets its temperature and
+    drying time from them: the highest soak temperature and the total soak.
+    """
+    if not isinstance(data, dict) or not data:
+        raise PresetError('presets must be a non-empty object')
+    presets = {}
+    for name, value in data.items():
+        if not isinstance(name, str) or not name.strip():
+            raise PresetError(f'invalid preset name {name!r}')
+        if not isinstance(value, dict):
+            value = {'temperature': str(value).replace('°C', ''), 'drying_time': 60}
+        segments = None
+        if value.get('segments') is not None:
+            try:
+                segments = validate_segments(value['segments'], MAX_TEMPERATURE)
+            except ProfileError as e:
+                raise PresetError(f'preset "{name}" {e}')
+            temperature, drying_time = profile_summary(segments)
+            value = dict(value, temperature=temperature, drying_time=drying_time)
+        try:
+            temperature = float(value['temperature'])
+            drying_time = int(value['drying_time'])
+        except (KeyError, TypeError, ValueError):
+            raise PresetError(f'preset "{name}" needs a numeric temperature and drying_time')
+        if not 0 < temperature <= MAX_TEMPERATURE:
+            raise PresetError(f'preset "{name}" temperature {temperature} is out of range')
+        if drying_time <= 0:
+            raise PresetError(f'preset "{name}" drying time must be positive')
+        preset = dict(value)
+        # Whole degrees stay ints so the file and the labels read as before
+        preset['temperature'] = int(temperature) if temperature.is_integer() else temperature
+        preset['drying_time'] = drying_time
+        if segments is not None:
+            preset['segments'] = segments
+        presets[name] = preset
+    return presets
+
+
+def _copy(presets):
+    copies = {}
+    for name, data in presets.items():
+        copies[name] = dict(data)
+        if 'segments' in data:
+            copies[name]['segments'] = [dict(segment) for segment in data['segments']]
+    return copies
+
+
+class PresetRepository:
+    """Cached, validated access to one presets file."""
+
+    def __init__(self, path=PRESETS_FILE, defaults=DEFAULT_PRESETS):
+        self.path = path
+        self.defaults = validate_presets(defaults)
+        self._presets = None
+        self._signature = None
+        self._subscribers = []
+        self._lock = threading.RLock()
+
+    @property
+    def presets(self):
+        """Copy of the cached presets (loaded on first use)."""
+        with self._lock:
+            if self._presets is None:
+                self._presets, self._signature = self._read()
+            return _copy(self._presets)
+
+    def subscribe(self, callback):
+        """Call ``callback(presets)`` with a fresh copy after every change."""
+        self._subscribers.append(callback)
+
+    def unsubscribe(self, callback):
+        if callback in self._subscribers:
+            self._subscribers.remove(callback)
+
+    def _notify(self):
+        presets = self._presets
+        for callback in list(self._subscribers):
+            try:
+                callback(_copy(presets))
+            except Exception as e:
+                print(f'Preset subscriber failed: {e}')
+
+    def _file_signature(self):
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+    def _read(self):
+        signature = self._file_signature()
+        if signature is None:
+            return _copy(self.defaults), None
+        try:
+            with open(self.path, 'r') as file:
+                return validate_presets(json.load(file)), signature
+        except (OSError, ValueError) as e:
+            # JSONDecodeError and PresetError are ValueErrors
+            print(f'Could not load presets from {self.path}: {e}; using defaults')
+            return _copy(self.defaults), signature
+
+    def check_for_changes(self):
+        """Reload if the file changed on disk since it was last read or written; True if it did."""
+        with self._lock:
+            if self._file_signature() == self._signature:
+                return False
+            presets, self._signature = self._read()
+            changed = presets != self._presets
+            self._presets = presets
+        if changed:
+            self._notify()
+        return changed
+
+    def save(self, presets):
+        """Validate and atomically replace the file with ``presets``."""
+        presets = validate_presets(presets)
+        with self._lock, self._file_lock():
+            self._write(presets)
+        self._notify()
+
+    def modify(self, change):
+        """Read-modify-write under the lock: ``change(presets)`` edits the latest
+        on-disk presets in place, so concurrent writers do not lose updates."""
+        with self._lock, self._file_lock():
+            presets, _ = self._read()
+            change(presets)
+            self._write(validate_presets(presets))
+        self._notify()
+
+    def _write(self, presets):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp_path = tempfile.mkstemp(prefix='.presets-', suffix='.tmp', dir=directory)
+        try:
+            with os.fdopen(fd, 'w') as file:
+                json.dump(presets, file, indent=2)
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+        # Make the rename itself durable
+        if hasattr(os, 'O_DIRECTORY'):
+            dir_fd = os.open(directory, os.O_RDONLY | os.O_DIRECTORY)
+            try:
+                os.fsync(dir_fd)
+            finally:
+                os.close(dir_fd)
+        self._presets = presets
+        self._signature = self._file_signature()
+
+    def _file_lock(self):
+        return _FileLock(self.path + '.lock')
+
+
+class _FileLock:
+    """Exclusive advisory lock on a sidecar file (no-op without fcntl)."""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = None
+
+    def __enter__(self):
+        if fcntl is not None:
+            self._file = open(self.path, 'a')
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_EX)
+        return self
+
+    def __exit__(self, *exc):
+        if self._file is not None:
+            fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+            self._file.close()
+            self._file = None
+
+
+def watch_with_qt(repository, parent=None):
+    """QFileSystemWatcher that reloads ``repository`` when its file changes.
+
+    The directory is watched as well because an atomic replace (ours or
+    another writer's) swaps the file out from under a file-only watch.
+    """
+    from PyQt5.QtCore import QFileSystemWatcher
+
+    path = os.path.abspath(repository.path)
+    watcher = QFileSystemWatcher(parent)
+    watcher.addPath(os.path.dirname(path))
+
+    def changed(_):
+        if os.path.exists(path) and path not in watcher.files():
+            watcher.addPath(path)
+        repository.check_for_changes()
+
+    if os.path.exists(path):
+        watcher.addPath(path)
+    watcher.fileChanged.connect(changed)
+    watcher.directoryChanged.connect(changed)
+    return watcher
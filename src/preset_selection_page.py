@@ -1,19 +1,49 @@
+import os
 import sys
-import json
+import shutil
 from PyQt5.QtWidgets import (QApplication, QWidget, QVBoxLayout, QLabel, 
                              QPushButton, QGridLayout, QDialog, QDialogButtonBox,
-                             QSlider, QHBoxLayout, QMessageBox)
-from PyQt5.QtCore import Qt, pyqtSignal
+                             QSlider, QHBoxLayout, QMessageBox, QLineEdit, QListView,
+                             QFileDialog)
+from PyQt5.QtCore import Qt, pyqtSignal, QSize, QTimer
 from PyQt5.QtGui import QFont
+from src.preset_repository import PresetRepository
+from src.material_library import Profile, MATERIALS_FILE, iter_profiles
+from src.material_model import MaterialListModel
+
+# Profiles added to the library per event-loop turn while importing
+IMPORT_BATCH = 500
+
+
+def make_grid_view(model):
+    # Icon-mode list: a wrapping grid whose cells are painted only when visible
+    view = QListView()
+    view.setModel(model)
+    view.setViewMode(QListView.ViewMode.IconMode)
+    view.setResizeMode(QListView.ResizeMode.Adjust)
+    view.setMovement(QListView.Movement.Static)
+    view.setGridSize(QSize(220, 80))
+    view.setUniformItemSizes(True)
+    view.setLayoutMode(QListView.LayoutMode.Batched)
+    view.setWordWrap(True)
+    view.setFont(QFont('Arial', 12))
+    return view
+
 
 class PresetSelectionPage(QWidget):
     switch_to_main = pyqtSignal(str)
     
-    def __init__(self, presets_file='presets.json'):
+    def __init__(self, presets_file='presets.json', repository=None, materials_file=MATERIALS_FILE):
         super().__init__()
-        self.presets_file = presets_file
+        self.repository = repository if repository is not None else PresetRepository(presets_file)
+        self.presets_file = self.repository.path
+        self.materials_file = materials_file
         self.presets = self.load_presets()
+        self._import = None
         self.init_ui()
+        self.repository.subscribe(self.update_presets)
+        if os.path.exists(materials_file):
+            self.import_library(materials_file)
         
     def init_ui(self):
         layout = QVBoxLayout()
@@ -23,28 +53,35 @@ class PresetSelectionPage(QWidget):
         title_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
         title_label.setFont(QFont('Arial', 24, QFont.Weight.Bold))
         layout.addWidget(title_label)
-        
-        # Preset buttons grid
-        grid_layout = QGridLayout()
-        
-        row = 0
-        col = 0
-        for i, (preset, value) in enumerate(self.presets.items()):
-            button = QPushButton(f'{preset}\n{value}')
-            button.setFont(QFont('Arial', 16, QFont.Weight.Bold))
-            button.setFixedSize(150, 100)
-            # Store the preset name with the button for reference
-            button.preset_name = preset
-            button.clicked.connect(lambda checked, btn=button: self.select_preset(btn.preset_name))
-            
-            grid_layout.addWidget(button, row, col)
-            
-            col += 1
-            if col > 2:  # 3 columns
-                col = 0
-                row += 1
-                
-        layout.addLayout(grid_layout)
+
+        # Typeahead search over saved presets and the material library
+        self.search_edit = QLineEdit()
+        self.search_edit.setPlaceholderText('Search name, brand or material')
+        self.search_edit.setFont(QFont('Arial', 14))
+        self.search_edit.textChanged.connect(self.set_filter)
+        layout.addWidget(self.search_edit)
+
+        # Saved presets
+        self.preset_model = MaterialListModel()
+        self.update_presets(self.presets)
+        self.preset_view = make_grid_view(self.preset_model)
+        self.preset_view.clicked.connect(lambda index: self.select_profile(self.preset_model.profile(index.row())))
+        layout.addWidget(self.preset_view)
+
+        # Material library (e.g. an imported community spool database)
+        library_header = QHBoxLayout()
+        self.library_label = QLabel('Material library')
+        self.library_label.setFont(QFont('Arial', 14, QFont.Weight.Bold))
+        library_header.addWidget(self.library_label)
+        self.import_button = QPushButton('Import...')
+        self.import_button.setFont(QFont('Arial', 14))
+        self.import_button.clicked.connect(self.choose_library_file)
+        library_header.addWidget(self.import_button)
+        layout.addLayout(library_header)
+        self.library_model = MaterialListModel()
+        self.library_view = make_grid_view(self.library_model)
+        self.library_view.clicked.connect(lambda index: self.select_profile(self.library_model.profile(index.row())))
+        layout.addWidget(self.library_view, 2)
         
         # Edit button
         edit_layout = QHBoxLayout()
@@ -64,16 +101,80 @@ class PresetSelectionPage(QWidget):
         self.setLayout(layout)
         
     def load_presets(self):
+        return self.repository.presets
+
+    def update_presets(self, presets):
+        """Rebuild the (small) saved-preset model when the repository changes."""
+        self.presets = presets
+        self.preset_model.clear()
+        self.preset_model.add_profiles(Profile(name, '', 'Preset', float(data['temperature']), data['drying_time'])
+                                       for name, data in presets.items())
+        self.preset_model.set_filter(self.search_edit.text())
+
+    def set_filter(self, text):
+        self.preset_model.set_filter(text)
+        self.library_model.set_filter(text)
+
+    def choose_library_file(self):
+        path, _ = QFileDialog.getOpenFileName(self, 'Import spool database', '', 'JSON (*.json *.jsonl)')
+        if path:
+            self.import_library(path)
+
+    def import_library(self, path):
+        """Stream ``path`` into the library a batch per event-loop turn, then keep a copy."""
+        if self._import is not None:
+            self._import.stop()
+        self.library_model.clear()
+        profiles = iter_profiles(path)
+        timer = QTimer(self)
+
+        def step():
+            batch = []
+            try:
+                for profile in profiles:
+                    batch.append(profile)
+                    if len(batch) >= IMPORT_BATCH:
+                        break
+            except (OSError, ValueError) as e:
+                print(f'Could not import {path}: {e}')
+                batch = None
+            if batch:
+                self.library_model.add_profiles(batch)
+                self.library_label.setText(f'Material library ({len(self.library_model.library)})')
+                return
+            timer.stop()
+            self._import = None
+            if batch is not None:
+                self.library_model.set_filter(self.search_edit.text())
+                self.keep_library_copy(path)
+
+        timer.timeout.connect(step)
+        timer.start(0)
+        self._import = timer
+
+    def keep_library_copy(self, path):
+        # Imported databases become the library loaded on the next start
+        if os.path.abspath(path) == os.path.abspath(self.materials_file):
+            return
+        tmp_path = self.materials_file + '.tmp'
         try:
-            with open(self.presets_file, 'r') as file:
-                return json.load(file)
-        except (FileNotFoundError, json.JSONDecodeError):
-            return {
-                'PLA': '34°C',
-                'ABS': '69°C', 
-                'PETG': '55°C'
-            }
-            
+            shutil.copyfile(path, tmp_path)
+            os.replace(tmp_path, self.materials_file)
+        except OSError as e:
+            print(f'Could not keep a copy of {path}: {e}')
+
+    def select_profile(self, profile):
+        """Select a saved preset, or save a library profile as a preset first."""
+        if profile.name not in self.presets:
+            def add(presets):
+                presets[profile.name] = {'temperature': profile.temperature, 'drying_time': profile.drying_time}
+            try:
+                self.repository.modify(add)
+            except ValueError as e:
+                QMessageBox.warning(self, 'Invalid Profile', f'Cannot use "{profile.name}": {e}')
+                return
+        self.select_preset(profile.name)
+
     def select_preset(self, preset_name):
         """Select a preset and return to main page"""
         print(f"Selected preset: {preset_name} with value {self.presets[preset_name]}")
@@ -107,7 +208,7 @@ class PresetSelectionPage(QWidget):
             slider = QSlider(Qt.Orientation.Horizontal)
             slider.setMinimum(0)
             slider.setMaximum(100)
-            slider.setValue(int(value.replace('°C', '')))
+            slider.setValue(int(value['temperature']))
             
             # Value display label
             value_label = QLabel(f'{slider.value()}°C')
@@ -152,15 +253,17 @@ class PresetSelectionPage(QWidget):
         dialog.exec()
         
     def save_edited_presets(self, dialog):
-        # Update presets with new values
-        for preset_name, widgets in self.preset_edit_widgets.items():
-            value = f'{widgets["slider"].value()}°C'
-            self.presets[preset_name] = value
-            
-        # Save to file
+        temperatures = {name: widgets['slider'].value()
+                        for name, widgets in self.preset_edit_widgets.items()}
+
+        def apply(presets):
+            # Edit the latest presets on disk so changes saved elsewhere meanwhile survive
+            for preset_name, temperature in temperatures.items():
+                if preset_name in presets:
+                    presets[preset_name]['temperature'] = temperature
+
         try:
-            with open(self.presets_file, 'w') as file:
-                json.dump(self.presets, file)
+            self.repository.modify(apply)
             QMessageBox.information(self, 'Success', 'Presets saved successfully!')
             print('Presets saved:', self.presets)
             dialog.accept()
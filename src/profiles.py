@@ -0,0 +1,239 @@
+# profiles.py
+# Multi-stage drying profiles. A preset may carry a list of segments, each
+# ramping the setpoint to a soak temperature at a given rate and holding it
+# for a soak time; a cooldown segment ramps down and ends once the chamber
+# is cool enough. Soak time only counts while the measured temperature is
+# inside the segment's tolerance band, so a cold start or an opened lid
+# does not eat into the drying time. A soak can also end early once the
+# humidity has dropped to an exit value.
+#
+# Segment JSON (times in minutes, rates in °C/min, 0 or missing = step):
+#   {"ramp_rate": 2, "temperature": 60, "soak_time": 120, "tolerance": 2, "exit_humidity": 10}
+#   {"cooldown": true, "temperature": 40, "ramp_rate": 1}
+
+import os
+import json
+import math
+import tempfile
+
+DEFAULT_TOLERANCE = 2.0  # °C either side of the soak temperature
+MAX_SEGMENTS = 16
+
+
+class ProfileError(ValueError):
+    """Segments that cannot be run."""
+
+
+def _number(segment, key, default=None, minimum=0.0):
+    value = segment.get(key, default)
+    if value is None:
+        return None
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        raise ProfileError(f'{key} must be a number')
+    if math.isnan(value) or value < minimum:
+        raise ProfileError(f'{key} must be at least {minimum:g}')
+    # Whole numbers stay ints so the file reads as written
+    return int(value) if value.is_integer() else value
+
+
+def validate_segments(segments, max_temperature):
+    """Return a normalised copy of ``segments`` or raise ProfileError."""
+    if not isinstance(segments, list) or not segments:
+        raise ProfileError('segments must be a non-empty list')
+    if len(segments) > MAX_SEGMENTS:
+        raise ProfileError(f'at most {MAX_SEGMENTS} segments')
+    result = []
+    for index, segment in enumerate(segments, start=1):
+        if not isinstance(segment, dict):
+            raise ProfileError(f'segment {index} must be an object')
+        try:
+            cooldown = bool(segment.get('cooldown', False))
+            temperature = _number(segment, 'temperature')
+            if temperature is None or not 0 < temperature <= max_temperature:
+                raise ProfileError('temperature is missing or out of range')
+            normalised = {'temperature': temperature,
+                          'ramp_rate': _number(segment, 'ramp_rate', 0),
+                          'tolerance': _number(segment, 'tolerance', DEFAULT_TOLERANCE)}
+            if cooldown:
+                normalised['cooldown'] = True
+            else:
+                soak_time = _number(segment, 'soak_time')
+                if not soak_time:
+                    raise ProfileError('soak_time must be positive')
+                normalised['soak_time'] = soak_time
+                exit_humidity = _number(segment, 'exit_humidity')
+                if exit_humidity is not None:
+                    normalised['exit_humidity'] = exit_humidity
+        except ProfileError as e:
+            raise ProfileError(f'segment {index}: {e}')
+        result.append(normalised)
+    if all(segment.get('cooldown') for segment in result):
+        raise ProfileError('a profile needs at least one soak segment')
+    return result
+
+
+def soak_seconds(segments):
+    return sum(segment.get('soak_time', 0) * 60 for segment in segments)
+
+
+def profile_summary(segments):
+    """(highest soak temperature, total soak minutes) for a preset's single-value fields."""
+    soaks = [segment for segment in segments if not segment.get('cooldown')]
+    total = sum(segment['soak_time'] for segment in soaks)
+    return max(segment['temperature'] for segment in soaks), total
+
+
+class ProfileRunner:
+    """Steps through ``segments``; ``update`` is called every tick with the readings.
+
+    Not thread-safe; the controller calls it under its own lock.
+    """
+
+    def __init__(self, segments):
+        self.segments = segments
+        self.index = 0
+        self.phase = 'ramp'
+        self.setpoint = None
+        self.soak_elapsed = 0.0   # seconds in band in the current segment
+        self._ramp_from = None
+        self._ramp_start = None
+        self._last_update = None
+
+    @property
+    def segment(self):
+        return self.segments[self.index] if self.index < len(self.segments) else None
+
+    @property
+    def done(self):
+        return self.phase == 'done'
+
+    def start(self, now, temperature):
+        """Begin (or resume) at the current segment, ramping from ``temperature``."""
+        self._last_update = now
+        self._begin_segment(now, temperature)
+        if self.segment is not None:
+            self.setpoint = self._ramp_setpoint(now)
+
+    def seek(self, remaining):
+        """Position at the point with ``remaining`` soak seconds left (power-loss resume)."""
+        consumed = max(0.0, soak_seconds(self.segments) - remaining)
+        for index, segment in enumerate(self.segments):
+            soak = segment.get('soak_time', 0) * 60
+            if segment.get('cooldown'):
+                if consumed <= 0:
+                    break
+                continue
+            if consumed < soak:
+                break
+            consumed -= soak
+        else:
+            index = len(self.segments)
+        self.index = index
+        self.soak_elapsed = consumed if self.segment is not None and not self.segment.get('cooldown') else 0.0
+
+    def _begin_segment(self, now, temperature):
+        segment = self.segment
+        if segment is None:
+            self.phase = 'done'
+            return
+        self.phase = 'cooldown' if segment.get('cooldown') else 'ramp'
+        start = self.setpoint if self.setpoint is not None else temperature
+        self._ramp_from = segment['temperature'] if start is None else start
+        self._ramp_start = now
+
+    def _next_segment(self, now, temperature):
+        self.index += 1
+        self.soak_elapsed = 0.0
+        self._begin_segment(now, temperature)
+
+    def _ramp_setpoint(self, now):
+        segment = self.segment
+        target, rate = segment['temperature'], segment['ramp_rate']
+        if not rate:
+            return target
+        travelled = rate * (now - self._ramp_start) / 60.0
+        if target >= self._ramp_from:
+            return min(target, self._ramp_from + travelled)
+        return max(target, self._ramp_from - travelled)
+
+    def update(self, now, temperature, humidity=None):
+        """Advance with the latest readings; returns the setpoint to control to."""
+        dt = 0.0 if self._last_update is None else max(0.0, now - self._last_update)
+        self._last_update = now
+        if self.phase == 'done':
+            return self.setpoint
+        segment = self.segment
+        self.setpoint = self._ramp_setpoint(now)
+        target, tolerance = segment['temperature'], segment['tolerance']
+        if self.phase == 'cooldown':
+            if self.setpoint == target and temperature is not None and temperature <= target + tolerance:
+                self._next_segment(now, temperature)
+            return self.setpoint
+        if self.phase == 'ramp' and self.setpoint == target:
+            self.phase = 'soak'
+        if self.phase == 'soak' and temperature is not None and abs(temperature - target) <= tolerance:
+            self.soak_elapsed += dt
+            exit_humidity = segment.get('exit_humidity')
+            if (self.soak_elapsed >= segment['soak_time'] * 60 or
+                    (exit_humidity is not None and humidity is not None and humidity <= exit_humidity)):
+                self._next_segment(now, temperature)
+        return self.setpoint
+
+    def in_band(self, temperature):
+        segment = self.segment
+        return (segment is not None and temperature is not None and
+                abs(temperature - segment['temperature']) <= segment['tolerance'])
+
+    def remaining(self):
+        """Soak seconds still to run, this segment included."""
+        if self.segment is None:
+            return 0.0
+        later = soak_seconds(self.segments[self.index + 1:])
+        return later + max(0.0, self.segment.get('soak_time', 0) * 60 - self.soak_elapsed)
+
+    def status(self, temperature=None):
+        segment = self.segment
+        if segment is None:
+            return 'Profile done'
+        step = f'Stage {self.index + 1}/{len(self.segments)}'
+        target = f"{segment['temperature']:g}°C"
+        if self.phase == 'cooldown':
+            return f'{step}: cooling to {target}'
+        if self.phase == 'ramp':
+            return f'{step}: ramping to {target} (setpoint {self.setpoint:.1f}°C)'
+        if not self.in_band(temperature):
+            return f"{step}: waiting for {target} ±{segment['tolerance']:g}"
+        mins, secs = divmod(int(math.ceil(segment['soak_time'] * 60 - self.soak_elapsed)), 60)
+        return f'{step}: soaking at {target}, {mins:02d}:{secs:02d} left'
+
+
+def save_segments(path, segments, preset=None):
+    """Write the running profile next to the cycle checkpoint (atomic replace)."""
+    directory = os.path.dirname(path) or '.'
+    try:
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=directory, prefix='.profile-')
+        with os.fdopen(fd, 'w') as file:
+            json.dump({'preset': preset, 'segments': segments}, file)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(tmp, path)
+    except OSError as e:
+        print(f'Could not save profile {path}: {e}')
+
+
+def load_segments(path, preset=None):
+    """Segments saved by save_segments for ``preset``, or None."""
+    try:
+        with open(path) as file:
+            data = json.load(file)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        print(f'Could not read profile {path}: {e}')
+        return None
+    if not isinstance(data, dict) or (preset is not None and data.get('preset') != preset):
+        return None
+    return data.get('segments') or None
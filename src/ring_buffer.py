@@ -0,0 +1,84 @@
+# ring_buffer.py
+# Fixed-capacity sample history shared by the Main, Testing and Debug pages
+
+import numpy as np
+
+# Column order of every sample pushed into a SampleRingBuffer
+SAMPLE_FIELDS = ('timestamp', 'temperature', 'humidity', 'pwm')
+
+
+class SampleRingBuffer:
+    """Preallocated NumPy ring buffer of (timestamp, temperature, humidity, pwm) samples.
+
+    Each sample is written twice, at slot ``i`` and ``i + capacity``, so the
+    most recent ``len(self)`` values of any field are always a single
+    contiguous slice. ``view()`` hands that slice to pyqtgraph directly:
+    appending never allocates and nothing is copied per tick.
+    """
+
+    def __init__(self, capacity, fields=SAMPLE_FIELDS):
+        if capacity <= 0:
+            raise ValueError('capacity must be positive')
+        self.capacity = int(capacity)
+        self.fields = tuple(fields)
+        self._columns = {name: i for i, name in enumerate(self.fields)}
+        self._data = np.full((len(self.fields), 2 * self.capacity), np.nan)
+        self._x = np.arange(self.capacity, dtype=np.float64)
+        self._head = 0  # next slot to write, always in [0, capacity)
+        self._count = 0
+        self.total = 0  # samples appended since creation/clear
+
+    def __len__(self):
+        return self._count
+
+    def append(self, *values):
+        """Push one sample; values are given in ``self.fields`` order."""
+        if len(values) != len(self.fields):
+            raise ValueError(f'expected {len(self.fields)} values, got {len(values)}')
+        head = self._head
+        self._data[:, head] = values
+        self._data[:, head + self.capacity] = values
+        self._head = head + 1 if head + 1 < self.capacity else 0
+        if self._count < self.capacity:
+            self._count += 1
+        self.total += 1
+
+    def extend(self, block):
+        """Push a (len(fields), n) block of samples, oldest first."""
+        block = np.asarray(block, dtype=np.float64)
+        if block.ndim != 2 or block.shape[0] != len(self.fields):
+            raise ValueError(f'expected a ({len(self.fields)}, n) block')
+        n = block.shape[1]
+        if n == 0:
+            return
+        self.total += n
+        if n > self.capacity:
+            block = block[:, -self.capacity:]
+            n = self.capacity
+        slots = (self._head + np.arange(n)) % self.capacity
+        self._data[:, slots] = block
+        self._data[:, slots + self.capacity] = block
+        self._head = (self._head + n) % self.capacity
+        self._count = min(self.capacity, self._count + n)
+
+    def view(self, field):
+        """Contiguous read-only view of ``field``, oldest sample first."""
+        end = self._head + self.capacity
+        data = self._data[self._columns[field], end - self._count:end]
+        data.flags.writeable = False
+        return data
+
+    def x(self):
+        """Sample index axis (0..len-1) matching ``view()``, without reallocation."""
+        return self._x[:self._count]
+
+    def latest(self, field):
+        if not self._count:
+            return None
+        return float(self._data[self._columns[field], self._head + self.capacity - 1])
+
+    def clear(self):
+        self._data.fill(np.nan)
+        self._head = 0
+        self._count = 0
+        self.total = 0
@@ -0,0 +1,121 @@
+# rolling_stats.py
+# Statistics over a sliding time window, updated in O(1) amortised per
+# sample: running sums give mean, standard deviation and the least-squares
+# slope, and monotonic deques give min and max, so nothing is recomputed
+# from the whole window when a sample arrives or expires. Once per window
+# the sums are rebuilt from a new time origin, which bounds both their size
+# and accumulated rounding error (still O(1) amortised).
+
+import math
+from collections import deque
+
+DEFAULT_WINDOW = 600.0  # seconds
+
+
+class RollingStats:
+    """min/max/mean/stddev/slope of (t, value) samples from the last ``window`` seconds."""
+
+    def __init__(self, window=DEFAULT_WINDOW):
+        self.window = window
+        self.reset()
+
+    def reset(self):
+        self._samples = deque()
+        self._mins = deque()     # increasing values, candidates for min
+        self._maxs = deque()     # decreasing values, candidates for max
+        self._t0 = None          # time origin, keeps the sums small
+        self._n = 0
+        self._sum_y = self._sum_yy = 0.0
+        self._sum_t = self._sum_tt = self._sum_ty = 0.0
+        self.last = None
+
+    def __len__(self):
+        return self._n
+
+    def add(self, t, value):
+        """Add a sample; NaN (sensor dropout) is ignored."""
+        if value is None or math.isnan(value):
+            return
+        if self._t0 is None:
+            self._t0 = t
+        x = t - self._t0
+        self._samples.append((t, value))
+        self._n += 1
+        self._sum_y += value
+        self._sum_yy += value * value
+        self._sum_t += x
+        self._sum_tt += x * x
+        self._sum_ty += x * value
+        while self._mins and self._mins[-1][1] > value:
+            self._mins.pop()
+        self._mins.append((t, value))
+        while self._maxs and self._maxs[-1][1] < value:
+            self._maxs.pop()
+        self._maxs.append((t, value))
+        self.last = value
+        self._expire(t - self.window)
+
+    def _expire(self, cutoff):
+        while self._samples and self._samples[0][0] < cutoff:
+            t, value = self._samples.popleft()
+            x = t - self._t0
+            self._n -= 1
+            self._sum_y -= value
+            self._sum_yy -= value * value
+            self._sum_t -= x
+            self._sum_tt -= x * x
+            self._sum_ty -= x * value
+        while self._mins and self._mins[0][0] < cutoff:
+            self._mins.popleft()
+        while self._maxs and self._maxs[0][0] < cutoff:
+            self._maxs.popleft()
+        if not self._samples:
+            self.reset()
+        elif self._samples[0][0] - self._t0 > self.window:
+            self._rebase()
+
+    def _rebase(self):
+        self._t0 = self._samples[0][0]
+        self._sum_y = self._sum_yy = 0.0
+        self._sum_t = self._sum_tt = self._sum_ty = 0.0
+        for t, value in self._samples:
+            x = t - self._t0
+            self._sum_y += value
+            self._sum_yy += value * value
+            self._sum_t += x
+            self._sum_tt += x * x
+            self._sum_ty += x * value
+
+    @property
+    def min(self):
+        return self._mins[0][1] if self._mins else None
+
+    @property
+    def max(self):
+        return self._maxs[0][1] if self._maxs else None
+
+    @property
+    def mean(self):
+        return self._sum_y / self._n if self._n else None
+
+    @property
+    def stddev(self):
+        if self._n < 2:
+            return None
+        variance = (self._sum_yy - self._sum_y * self._sum_y / self._n) / (self._n - 1)
+        # Cancellation can leave a tiny negative number for a flat signal
+        return math.sqrt(max(variance, 0.0))
+
+    @property
+    def slope(self):
+        """Least-squares trend in units per second."""
+        if self._n < 2:
+            return None
+        denominator = self._n * self._sum_tt - self._sum_t * self._sum_t
+        if denominator <= 0:
+            return None
+        return (self._n * self._sum_ty - self._sum_t * self._sum_y) / denominator
+
+    def summary(self):
+        return {'last': self.last, 'min': self.min, 'max': self.max, 'mean': self.mean,
+                'stddev': self.stddev, 'slope': self.slope, 'count': self._n}
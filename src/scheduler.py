@@ -0,0 +1,125 @@
+# scheduler.py
+# Periodic work for many chambers without a thread per loop. One dispatcher
+# thread keeps a heap of absolute monotonic deadlines and hands due tasks to
+# a small worker pool. A task never overlaps itself: if its previous run is
+# still going when the next deadline comes, that period is skipped and
+# counted as an overrun, and a task that fell behind resynchronises instead
+# of bursting.
+
+import heapq
+import time
+import itertools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from src.pid import LoopStats
+
+DEFAULT_WORKERS = 4
+
+
+class ScheduledTask:
+    """Handle for a periodic task; ``stats`` holds its lateness and run times."""
+
+    def __init__(self, scheduler, name, func, period, stats):
+        self.scheduler = scheduler
+        self.name = name
+        self.func = func
+        self.period = period
+        self.stats = stats
+        self.cancelled = False
+        self.running = False
+        self._worker = None   # thread running it right now
+
+    def cancel(self, wait=True):
+        """Stop scheduling; with ``wait``, also let a run in progress finish."""
+        self.scheduler._cancel(self, wait)
+
+
+class PeriodicScheduler:
+    """Runs ``func`` every ``period`` seconds for every added task, on ``workers`` threads."""
+
+    def __init__(self, workers=DEFAULT_WORKERS, name='scheduler'):
+        self.name = name
+        self._heap = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=name)
+        self._thread = None
+        self._stopped = False
+
+    def add(self, name, func, period, stats=None, delay=0.0):
+        """Schedule ``func()`` every ``period`` seconds, first after ``delay``."""
+        if period <= 0:
+            raise ValueError('period must be positive')
+        task = ScheduledTask(self, name, func, period, stats if stats is not None else LoopStats())
+        with self._cond:
+            if self._stopped:
+                raise RuntimeError('scheduler is shut down')
+            heapq.heappush(self._heap, (time.monotonic() + delay, next(self._seq), task))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name=f'{self.name}-dispatch', daemon=True)
+                self._thread.start()
+            self._cond.notify()
+        return task
+
+    def _cancel(self, task, wait):
+        with self._cond:
+            task.cancelled = True
+            self._cond.notify_all()
+            if wait:
+                # Not from inside the task itself, which would wait forever
+                while task.running and task._worker is not threading.current_thread():
+                    self._cond.wait()
+
+    def _run(self):
+        with self._cond:
+            while not self._stopped:
+                if not self._heap:
+                    self._cond.wait()
+                    continue
+                deadline, _, task = self._heap[0]
+                if task.cancelled:
+                    heapq.heappop(self._heap)
+                    continue
+                now = time.monotonic()
+                if deadline > now:
+                    self._cond.wait(deadline - now)
+                    continue
+                heapq.heappop(self._heap)
+                if task.running:
+                    task.stats.overruns += 1
+                else:
+                    task.running = True
+                    self._pool.submit(self._execute, task, deadline)
+                next_deadline = deadline + task.period
+                if next_deadline < now:
+                    next_deadline = now
+                heapq.heappush(self._heap, (next_deadline, next(self._seq), task))
+
+    def _execute(self, task, deadline):
+        task._worker = threading.current_thread()
+        started = time.monotonic()
+        try:
+            task.func()
+        except Exception as e:
+            print(f'Scheduled task {task.name} failed: {e}')
+        finished = time.monotonic()
+        task.stats.record(max(0.0, started - deadline), finished - started, task.period)
+        with self._cond:
+            task.running = False
+            task._worker = None
+            self._cond.notify_all()
+
+    def tasks(self):
+        with self._cond:
+            return [task for _, _, task in self._heap if not task.cancelled]
+
+    def shutdown(self, wait=True):
+        with self._cond:
+            self._stopped = True
+            for _, _, task in self._heap:
+                task.cancelled = True
+            self._heap.clear()
+            self._cond.notify_all()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(2.0)
+        self._pool.shutdown(wait=wait)
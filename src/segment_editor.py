@@ -0,0 +1,111 @@
+# segment_editor.py
+# Editor for a preset's ramp/soak segments (src.profiles): one table row
+# per segment, with buttons to add soak or cooldown stages, remove the
+# selected one and clear the profile again.
+
+from PyQt5.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QPushButton, QTableWidget,
+                             QTableWidgetItem, QDialogButtonBox, QMessageBox, QHeaderView, QLabel)
+from PyQt5.QtCore import Qt
+from src.profiles import ProfileError, validate_segments, DEFAULT_TOLERANCE
+from src.preset_repository import MAX_TEMPERATURE
+
+# (segment key, header); cooldown rows leave soak time and exit humidity empty
+SEGMENT_COLUMNS = (
+    ('ramp_rate', 'Ramp °C/min'),
+    ('temperature', 'Temp °C'),
+    ('soak_time', 'Soak min'),
+    ('tolerance', '± °C'),
+    ('exit_humidity', 'Exit %RH'),
+)
+COOLDOWN_TEXT = 'cooldown'
+
+
+class SegmentTable(QTableWidget):
+    def __init__(self, segments=None):
+        super().__init__(0, len(SEGMENT_COLUMNS))
+        self.setHorizontalHeaderLabels([header for _, header in SEGMENT_COLUMNS])
+        self.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Stretch)
+        for segment in segments or []:
+            self.add_segment(segment)
+
+    def add_segment(self, segment):
+        row = self.rowCount()
+        self.insertRow(row)
+        cooldown = segment.get('cooldown', False)
+        for column, (key, _) in enumerate(SEGMENT_COLUMNS):
+            value = segment.get(key)
+            if cooldown and key == 'soak_time':
+                text = COOLDOWN_TEXT
+            else:
+                text = '' if value is None else f'{value:g}'
+            item = QTableWidgetItem(text)
+            if cooldown and key in ('soak_time', 'exit_humidity'):
+                item.setFlags(item.flags() & ~Qt.ItemFlag.ItemIsEditable)
+            self.setItem(row, column, item)
+
+    def segments(self):
+        """Segments as entered (unvalidated); numbers stay strings if they do not parse."""
+        result = []
+        for row in range(self.rowCount()):
+            segment = {}
+            for column, (key, _) in enumerate(SEGMENT_COLUMNS):
+                text = self.item(row, column).text().strip()
+                if text == COOLDOWN_TEXT:
+                    segment['cooldown'] = True
+                elif text:
+                    try:
+                        segment[key] = float(text)
+                    except ValueError:
+                        segment[key] = text
+            result.append(segment)
+        return result
+
+
+def edit_segments(parent, segments):
+    """Let the user edit ``segments``; returns the validated list, [] to clear, or None if cancelled."""
+    dialog = QDialog(parent)
+    dialog.setWindowTitle('Drying Profile')
+    dialog.setModal(True)
+    dialog.resize(640, 360)
+    layout = QVBoxLayout()
+    layout.addWidget(QLabel('Soak time only counts while the chamber is within ± °C of the stage temperature.'))
+    table = SegmentTable(segments)
+    layout.addWidget(table)
+
+    buttons = QHBoxLayout()
+    add_soak = QPushButton('Add Stage')
+    add_soak.clicked.connect(lambda: table.add_segment({'ramp_rate': 0, 'temperature': 60, 'soak_time': 60,
+                                                        'tolerance': DEFAULT_TOLERANCE}))
+    buttons.addWidget(add_soak)
+    add_cooldown = QPushButton('Add Cooldown')
+    add_cooldown.clicked.connect(lambda: table.add_segment({'cooldown': True, 'ramp_rate': 1, 'temperature': 40,
+                                                            'tolerance': DEFAULT_TOLERANCE}))
+    buttons.addWidget(add_cooldown)
+    remove = QPushButton('Remove')
+    remove.setProperty('role', 'danger')
+    remove.clicked.connect(lambda: table.removeRow(table.currentRow()) if table.currentRow() >= 0 else None)
+    buttons.addWidget(remove)
+    layout.addLayout(buttons)
+
+    result = []
+    button_box = QDialogButtonBox(QDialogButtonBox.StandardButton.Ok | QDialogButtonBox.StandardButton.Cancel)
+
+    def accept():
+        entered = table.segments()
+        if not entered:
+            # No rows: back to a single temperature and drying time
+            dialog.accept()
+            return
+        try:
+            result.extend(validate_segments(entered, MAX_TEMPERATURE))
+        except ProfileError as e:
+            QMessageBox.warning(dialog, 'Invalid Profile', str(e))
+            return
+        dialog.accept()
+    button_box.accepted.connect(accept)
+    button_box.rejected.connect(dialog.reject)
+    layout.addWidget(button_box)
+    dialog.setLayout(layout)
+    if not dialog.exec():
+        return None
+    return result
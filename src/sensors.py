@@ -0,0 +1,257 @@
+# sensors.py
+# Kernel-driver sensors read through sysfs, so no GPIO bit-banging happens
+# in Python:
+#   DS18B20   w1-gpio + w1_therm: /sys/bus/w1/devices/28-*/w1_slave
+#   DHT22     dht11 IIO driver:   /sys/bus/iio/devices/iio:device*/in_*_input
+#   SHT3x     sht3x hwmon driver: /sys/class/hwmon/hwmon*/{temp1,humidity1}_input
+#
+# A DS18B20 takes up to 750 ms to convert, so reading four probes one after
+# the other cannot keep a 1 Hz loop. SensorHub converts them together:
+# through the bus master's therm_bulk_read trigger where the kernel offers
+# it (every probe converts at once, then each result is a quick scratchpad
+# read), otherwise with one pool thread per probe (w1_therm releases the
+# bus while a conversion runs, so the waits overlap). Humidity sensors are
+# read on the same pool. Results land in a cache; the acquisition reads
+# that, so a slow or failing sensor never blocks a poll.
+
+import os
+import glob
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+W1_DEVICES = '/sys/bus/w1/devices'
+IIO_DEVICES = '/sys/bus/iio/devices'
+HWMON_DEVICES = '/sys/class/hwmon'
+DS18B20_FAMILIES = ('28', '10', '22', '3b', '42')   # DS18B20, DS18S20, DS1822, MAX31850, DS28EA00
+DS18B20_POWER_ON = 85000   # scratchpad reset value, read when a conversion did not happen
+CONVERSION_TIMEOUT = 1.0   # s; 12-bit conversion is 750 ms
+CONVERSION_POLL = 0.05
+HUB_PERIOD = 1.0           # s between conversion rounds
+STALE_AFTER = 3            # periods after which a cached value is no longer reported
+HWMON_HUMIDITY_DRIVERS = ('sht3x', 'sht4x', 'sht21', 'hdc2010', 'htu21', 'si7020')
+DHT_MAX_RATE_HZ = 0.5      # the DHT22 needs 2 s between reads
+DS18B20_MAX_RATE_HZ = 1.0 / HUB_PERIOD
+
+
+def read_text(path):
+    with open(path) as file:
+        return file.read()
+
+
+def parse_w1_slave(text):
+    """°C from a w1_slave file, or None on a CRC failure or a missed conversion."""
+    lines = text.strip().splitlines()
+    if len(lines) < 2 or not lines[0].rstrip().endswith('YES'):
+        return None
+    _, sep, value = lines[1].rpartition('t=')
+    if not sep:
+        return None
+    try:
+        millidegrees = int(value)
+    except ValueError:
+        return None
+    if millidegrees == DS18B20_POWER_ON:
+        return None
+    return millidegrees / 1000.0
+
+
+def read_milli(path):
+    """A sysfs value in thousandths (m°C, m%RH) as a float, or None if the read fails."""
+    try:
+        return int(read_text(path).strip()) / 1000.0
+    except (OSError, ValueError):
+        # The DHT driver returns EIO whenever the sensor misses its timing
+        return None
+
+
+class DS18B20:
+    def __init__(self, path):
+        self.path = path
+        self.id = os.path.basename(path)
+
+    def read(self):
+        try:
+            return parse_w1_slave(read_text(os.path.join(self.path, 'w1_slave')))
+        except OSError:
+            return None
+
+
+class HumiditySensor:
+    """Temperature and humidity files of one IIO (DHT) or hwmon (SHT3x) device."""
+
+    def __init__(self, name, temperature_path, humidity_path, max_rate_hz):
+        self.name = name
+        # Driver names repeat (two DHTs are both 'dht11'); the device directory does not
+        self.id = os.path.basename(os.path.dirname(humidity_path))
+        self.temperature_path = temperature_path
+        self.humidity_path = humidity_path
+        self.max_rate_hz = max_rate_hz
+
+    def read(self):
+        return read_milli(self.humidity_path), read_milli(self.temperature_path)
+
+
+def discover_ds18b20(root=W1_DEVICES):
+    """Temperature probes on every 1-Wire bus, sorted by id."""
+    paths = []
+    for family in DS18B20_FAMILIES:
+        paths += glob.glob(os.path.join(root, f'{family}-*'))
+    return [DS18B20(path) for path in sorted(paths, key=os.path.basename)]
+
+
+def bulk_triggers(root=W1_DEVICES):
+    """therm_bulk_read files of the bus masters (kernel 5.10+)."""
+    return sorted(glob.glob(os.path.join(root, 'w1_bus_master*', 'therm_bulk_read')))
+
+
+def discover_humidity(iio_root=IIO_DEVICES, hwmon_root=HWMON_DEVICES):
+    """DHT sensors (IIO) followed by I2C sensors (hwmon), each in device order."""
+    sensors = []
+    for path in sorted(glob.glob(os.path.join(iio_root, 'iio:device*'))):
+        humidity = os.path.join(path, 'in_humidityrelative_input')
+        if os.path.exists(humidity):
+            name = _device_name(path)
+            sensors.append(HumiditySensor(name, os.path.join(path, 'in_temp_input'), humidity,
+                                          DHT_MAX_RATE_HZ if name.startswith('dht') else 1.0))
+    for path in sorted(glob.glob(os.path.join(hwmon_root, 'hwmon*'))):
+        if _device_name(path) in HWMON_HUMIDITY_DRIVERS:
+            sensors.append(HumiditySensor(_device_name(path), os.path.join(path, 'temp1_input'),
+                                          os.path.join(path, 'humidity1_input'), 1.0 / HUB_PERIOD))
+    return sensors
+
+
+def _device_name(path):
+    try:
+        return read_text(os.path.join(path, 'name')).strip()
+    except OSError:
+        return ''
+
+
+class SensorChannel:
+    """Callable for SensorAcquisition returning one cached hub value (or None).
+
+    ``max_rate_hz`` tells the acquisition how often fresh values can appear,
+    so it does not oversample a cache.
+    """
+
+    def __init__(self, hub, keys, max_rate_hz):
+        self.hub = hub
+        self.keys = keys
+        self.max_rate_hz = max_rate_hz
+
+    def __call__(self):
+        # Several probes in one chamber are averaged
+        values = [value for value in (self.hub.value(key) for key in self.keys) if value is not None]
+        return sum(values) / len(values) if values else None
+
+
+class SensorHub:
+    """Converts every probe together and reads every sensor concurrently, in the background."""
+
+    def __init__(self, probes, humidity_sensors=(), triggers=(), period=HUB_PERIOD, workers=None):
+        self.probes = list(probes)
+        self.humidity_sensors = list(humidity_sensors)
+        self.triggers = list(triggers)
+        self.period = period
+        self.errors = 0
+        self.rounds = 0
+        self.last_round_time = 0.0
+        self._values = {}   # key: (value, monotonic time)
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=workers or max(1, len(self.probes) + len(self.humidity_sensors)),
+                                        thread_name_prefix='sensor')
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    @classmethod
+    def discover(cls, w1_root=W1_DEVICES, iio_root=IIO_DEVICES, hwmon_root=HWMON_DEVICES, **kwargs):
+        return cls(discover_ds18b20(w1_root), discover_humidity(iio_root, hwmon_root),
+                   bulk_triggers(w1_root), **kwargs)
+
+    def value(self, key):
+        with self._lock:
+            entry = self._values.get(key)
+        if entry is None or time.monotonic() - entry[1] > STALE_AFTER * self.period:
+            return None
+        return entry[0]
+
+    def values(self):
+        return {key: self.value(key) for key in list(self._values)}
+
+    def _store(self, key, value):
+        if value is None:
+            self.errors += 1
+            return
+        with self._lock:
+            self._values[key] = (value, time.monotonic())
+
+    def convert_all(self):
+        """Start every conversion; returns once they are all complete (or timed out)."""
+        if not self.triggers:
+            return False
+        for trigger in self.triggers:
+            try:
+                with open(trigger, 'w') as file:
+                    file.write('trigger\n')
+            except OSError:
+                return False
+        deadline = time.monotonic() + CONVERSION_TIMEOUT
+        pending = list(self.triggers)
+        while pending and time.monotonic() < deadline:
+            # -1 while any probe on that master is still converting
+            pending = [trigger for trigger in pending if _read_or_empty(trigger).strip() == '-1']
+            if pending:
+                time.sleep(CONVERSION_POLL)
+        return True
+
+    def poll(self):
+        """One round: convert and read every probe and humidity sensor."""
+        started = time.monotonic()
+        humidity = [(sensor, self._pool.submit(sensor.read)) for sensor in self.humidity_sensors]
+        # After a bulk conversion each read only fetches the scratchpad;
+        # without one, each read converts, on its own pool thread
+        self.convert_all()
+        probes = [(probe, self._pool.submit(probe.read)) for probe in self.probes]
+        for probe, future in probes:
+            self._store(probe.id, future.result())
+        for sensor, future in humidity:
+            rh, temperature = future.result()
+            self._store(f'{sensor.id}:humidity', rh)
+            self._store(f'{sensor.id}:temperature', temperature)
+        self.rounds += 1
+        self.last_round_time = time.monotonic() - started
+
+    def channel(self, keys, max_rate_hz=None):
+        return SensorChannel(self, list(keys), max_rate_hz or 1.0 / self.period)
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='sensor-hub', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        deadline = time.monotonic()
+        while not self._stop_event.is_set():
+            try:
+                self.poll()
+            except Exception as e:
+                print(f'Sensor round failed: {e}')
+            deadline += self.period
+            if deadline < time.monotonic():
+                deadline = time.monotonic()
+            self._stop_event.wait(deadline - time.monotonic())
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(2.0)
+            self._thread = None
+        self._pool.shutdown(wait=False)
+
+
+def _read_or_empty(path):
+    try:
+        return read_text(path)
+    except OSError:
+        return ''
@@ -0,0 +1,256 @@
+# session_log.py
+# Append-only binary log of one drying run, written through a memory map.
+#
+# File layout: a 64-byte header followed by fixed 32-byte records. The header
+# records how many samples were committed at the last batch write; records
+# past that point are only trusted if their sequence number and CRC check
+# out, which is how a run cut short by a power loss is recovered.
+
+import os
+import glob
+import mmap
+import time
+import zlib
+import struct
+import numpy as np
+
+MAGIC = b'FDSESS01'
+VERSION = 1
+HEADER_FORMAT = '<8sHHIdQ32s'  # magic, version, record size, flags, start time, committed count, preset
+HEADER_SIZE = 64
+FLAG_CLOSED = 0x1  # set when the run ended cleanly
+
+RECORD_DTYPE = np.dtype([
+    ('timestamp', '<f8'),
+    ('temperature', '<f4'),
+    ('humidity', '<f4'),
+    ('pwm', '<f4'),
+    ('setpoint', '<f4'),
+    ('seq', '<u4'),
+    ('crc', '<u4'),
+])
+RECORD_SIZE = RECORD_DTYPE.itemsize
+_CRC_BYTES = RECORD_SIZE - 4  # the CRC covers everything before it
+
+SESSION_DIR = 'sessions'
+SESSION_SUFFIX = '.fdlog'
+DEFAULT_BATCH_SIZE = 32
+DEFAULT_SYNC_INTERVAL = 10.0  # seconds between msync calls
+GROW_RECORDS = 32768  # file grows 1 MiB at a time, never per sample
+
+assert struct.calcsize(HEADER_FORMAT) == HEADER_SIZE
+assert RECORD_SIZE == 32
+
+
+class SessionHeader:
+    def __init__(self, start_time, preset='', count=0, flags=0, version=VERSION):
+        self.start_time = start_time
+        self.preset = preset
+        self.count = count
+        self.flags = flags
+        self.version = version
+
+    @property
+    def closed(self):
+        return bool(self.flags & FLAG_CLOSED)
+
+    def pack(self):
+        return struct.pack(HEADER_FORMAT, MAGIC, self.version, RECORD_SIZE, self.flags,
+                           self.start_time, self.count, self.preset.encode('utf-8')[:32])
+
+    @classmethod
+    def unpack(cls, data):
+        if len(data) < HEADER_SIZE:
+            raise ValueError('session file is shorter than its header')
+        magic, version, record_size, flags, start_time, count, preset = struct.unpack(
+            HEADER_FORMAT, data[:HEADER_SIZE])
+        if magic != MAGIC:
+            raise ValueError('not a session log')
+        if record_size != RECORD_SIZE:
+            raise ValueError(f'unsupported record size {record_size}')
+        preset = preset.rstrip(b'\0').decode('utf-8', errors='replace')
+        return cls(start_time, preset, count, flags, version)
+
+
+def _record_crcs(records):
+    raw = records.view(np.uint8).reshape(len(records), RECORD_SIZE)
+    return np.fromiter((zlib.crc32(row[:_CRC_BYTES].tobytes()) for row in raw),
+                       dtype=np.uint32, count=len(records))
+
+
+class SessionRecorder:
+    """Writes one drying run to an append-only memory-mapped log.
+
+    Samples are staged in memory and copied into the map ``batch_size`` at a
+    time; dirty pages are synced at most every ``sync_interval`` seconds, so
+    the SD card sees a few large writes instead of one per sample.
+    """
+
+    def __init__(self, path, start_time=None, preset='', batch_size=DEFAULT_BATCH_SIZE,
+                 sync_interval=DEFAULT_SYNC_INTERVAL):
+        self.path = path
+        self.header = SessionHeader(time.time() if start_time is None else start_time, preset)
+        self.batch_size = batch_size
+        self.sync_interval = sync_interval
+        self._pending = np.zeros(batch_size, dtype=RECORD_DTYPE)
+        self._pending_count = 0
+        self._last_sync = time.monotonic()
+        self._file = open(path, 'w+b')
+        self._file.write(self.header.pack())
+        self._capacity = 0
+        self._mmap = None
+        self._records = None
+        self._grow(GROW_RECORDS)
+
+    @property
+    def count(self):
+        """Samples appended so far, including ones not yet written to the map."""
+        return self.header.count + self._pending_count
+
+    def _grow(self, capacity):
+        self._release_map()
+        self._file.truncate(HEADER_SIZE + capacity * RECORD_SIZE)
+        self._mmap = mmap.mmap(self._file.fileno(), HEADER_SIZE + capacity * RECORD_SIZE)
+        self._records = np.frombuffer(self._mmap, dtype=RECORD_DTYPE, count=capacity, offset=HEADER_SIZE)
+        self._capacity = capacity
+
+    def _release_map(self):
+        # The NumPy view must go before the map can be closed
+        self._records = None
+        if self._mmap is not None:
+            self._mmap.flush()
+            self._mmap.close()
+            self._mmap = None
+
+    def append(self, timestamp, temperature, humidity, pwm, setpoint=float('nan')):
+        record = self._pending[self._pending_count]
+        record['timestamp'] = timestamp
+        record['temperature'] = temperature
+        record['humidity'] = humidity
+        record['pwm'] = pwm
+        record['setpoint'] = setpoint
+        self._pending_count += 1
+        if self._pending_count >= self.batch_size:
+            self.write_batch()
+        if time.monotonic() - self._last_sync >= self.sync_interval:
+            self.sync()
+
+    def write_batch(self):
+        """Copy staged samples into the map and advance the committed count."""
+        n = self._pending_count
+        if not n:
+            return
+        start = self.header.count
+        if start + n > self._capacity:
+            self._grow(self._capacity + max(GROW_RECORDS, n))
+        batch = self._pending[:n]
+        batch['seq'] = np.arange(start, start + n, dtype=np.uint32)
+        batch['crc'] = _record_crcs(batch)
+        self._records[start:start + n] = batch
+        self.header.count = start + n
+        self._mmap[:HEADER_SIZE] = self.header.pack()
+        self._pending_count = 0
+
+    def sync(self):
+        self.write_batch()
+        self._mmap.flush()
+        self._last_sync = time.monotonic()
+
+    def close(self):
+        if self._file is None:
+            return
+        self.write_batch()
+        self.header.flags |= FLAG_CLOSED
+        self._mmap[:HEADER_SIZE] = self.header.pack()
+        self._release_map()
+        # Drop the unused preallocated tail
+        self._file.truncate(HEADER_SIZE + self.header.count * RECORD_SIZE)
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._file.close()
+        self._file = None
+
+
+class SessionReader:
+    """Read-only access to a session log without loading it into memory."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self.header = SessionHeader.unpack(f.read(HEADER_SIZE))
+            f.seek(0, os.SEEK_END)
+            available = (f.tell() - HEADER_SIZE) // RECORD_SIZE
+        self.count = min(self.header.count, available)
+
+    def __len__(self):
+        return self.count
+
+    def records(self):
+        """Memory-mapped array of all committed records (pages load on access)."""
+        if not self.count:
+            return np.zeros(0, dtype=RECORD_DTYPE)
+        return np.memmap(self.path, dtype=RECORD_DTYPE, mode='r', offset=HEADER_SIZE, shape=(self.count,))
+
+    def iter_chunks(self, chunk_size=65536):
+        records = self.records()
+        for start in range(0, self.count, chunk_size):
+            yield records[start:start + chunk_size]
+
+
+def recover_session(path):
+    """Repair a log that was not closed cleanly and return its header.
+
+    Records written after the last header update are kept as long as their
+    sequence numbers and CRCs are intact; the first bad record marks the torn
+    tail, which is cut off together with any unused preallocated space.
+    """
+    with open(path, 'r+b') as f:
+        header = SessionHeader.unpack(f.read(HEADER_SIZE))
+        if header.closed:
+            return header
+        f.seek(0, os.SEEK_END)
+        available = (f.tell() - HEADER_SIZE) // RECORD_SIZE
+        count = min(header.count, available)
+        if available > count:
+            tail = np.memmap(f, dtype=RECORD_DTYPE, mode='r', offset=HEADER_SIZE + count * RECORD_SIZE,
+                             shape=(available - count,))
+            expected = np.arange(count, available, dtype=np.uint32)
+            candidates = np.flatnonzero(tail['seq'] != expected)
+            valid = candidates[0] if len(candidates) else len(tail)
+            if valid:
+                crc_ok = _record_crcs(np.array(tail[:valid])) == tail['crc'][:valid]
+                bad = np.flatnonzero(~crc_ok)
+                valid = bad[0] if len(bad) else valid
+            count += int(valid)
+            del tail
+        header.count = count
+        header.flags |= FLAG_CLOSED
+        f.seek(0)
+        f.write(header.pack())
+        f.truncate(HEADER_SIZE + count * RECORD_SIZE)
+        f.flush()
+        os.fsync(f.fileno())
+    return header
+
+
+def session_path(directory, start_time=None):
+    stamp = time.strftime('%Y%m%d-%H%M%S', time.localtime(start_time))
+    return os.path.join(directory, f'session-{stamp}{SESSION_SUFFIX}')
+
+
+def list_sessions(directory=SESSION_DIR):
+    return sorted(glob.glob(os.path.join(directory, f'*{SESSION_SUFFIX}')))
+
+
+def recover_sessions(directory=SESSION_DIR):
+    """Recover every unfinished log in ``directory``; returns ``[(path, header)]``."""
+    recovered = []
+    for path in list_sessions(directory):
+        try:
+            with open(path, 'rb') as f:
+                if SessionHeader.unpack(f.read(HEADER_SIZE)).closed:
+                    continue
+            recovered.append((path, recover_session(path)))
+        except (OSError, ValueError) as e:
+            print(f'Could not recover session {path}: {e}')
+    return recovered
@@ -1,12 +1,26 @@
 import sys
 import platform
 import subprocess
-import json
-from PyQt6.QtWidgets import (QApplication, QWidget, QVBoxLayout, QLabel, 
+import functools
+from PyQt5.QtWidgets import (QApplication, QWidget, QVBoxLayout, QLabel, 
                              QPushButton, QGridLayout, QDialog, QDialogButtonBox,
-                             QSlider, QLineEdit, QHBoxLayout, QMessageBox, QGroupBox)
-from PyQt6.QtCore import Qt, pyqtSignal
-from PyQt6.QtGui import QFont
+                             QSlider, QLineEdit, QHBoxLayout, QMessageBox, QGroupBox, QComboBox)
+from PyQt5.QtCore import Qt, pyqtSignal
+from PyQt5.QtGui import QFont
+from src.pid import DEFAULT_PID_GAINS
+from src.preset_diff import reconcile, snapshot_presets
+from src.preset_repository import PresetRepository, PresetError
+from src.profiles import profile_summary
+from src.segment_editor import edit_segments
+
+# src.dryness_estimator END_MODES with their labels
+END_MODE_LABELS = (
+    ('off', 'Fixed time only'),
+    ('monitor', 'Fixed time, show prediction'),
+    ('end', 'End early when dry'),
+    ('extend', 'Extend while still wet'),
+    ('adaptive', 'End early or extend'),
+)
 
 class OSKLineEdit(QLineEdit):
     def __init__(self, *args, osk_mode=None, **kwargs):
@@ -27,6 +41,9 @@ class OSKLineEdit(QLineEdit):
 
 class SettingsPage(QWidget):
     presets_changed = pyqtSignal(dict)
+    pid_changed = pyqtSignal(dict)
+    autotune_requested = pyqtSignal()
+    end_mode_changed = pyqtSignal(str)
     def open_add_preset_dialog(self):
         dialog = QDialog(self)
         dialog.setWindowTitle('Add New Preset')
@@ -44,12 +61,13 @@ class SettingsPage(QWidget):
         layout.addWidget(temp_edit)
         layout.addWidget(QLabel('Drying Time (min):'))
         layout.addWidget(time_edit)
+        segments = self.add_profile_button(layout, temp_edit, time_edit, None)
         button_box = QDialogButtonBox(QDialogButtonBox.StandardButton.Ok | QDialogButtonBox.StandardButton.Cancel)
         def accept():
             name = name_edit.text().strip()
             try:
-                temp = int(temp_edit.text().strip())
-                time = int(time_edit.text().strip())
+                temp = int(float(temp_edit.text().strip()))
+                time = int(float(time_edit.text().strip()))
             except ValueError:
                 QMessageBox.warning(self, 'Input Error', 'Temperature and drying time must be numbers.')
                 return
@@ -59,7 +77,7 @@ class SettingsPage(QWidget):
             if name in self.presets:
                 QMessageBox.warning(self, 'Duplicate', 'Preset already exists.')
                 return
-            self.presets[name] = {'temperature': temp, 'drying_time': time}
+            self.presets[name] = self.preset_data(temp, time, segments)
             self.save_presets()
             self.refresh_presets_grid()
             self.presets_changed.emit(self.presets)
@@ -88,15 +106,16 @@ class SettingsPage(QWidget):
         layout.addWidget(temp_edit)
         layout.addWidget(QLabel('Drying Time (min):'))
         layout.addWidget(time_edit)
+        segments = self.add_profile_button(layout, temp_edit, time_edit, data.get('segments'))
 
         button_box = QDialogButtonBox(QDialogButtonBox.StandardButton.Ok | QDialogButtonBox.StandardButton.Cancel)
         delete_btn = QPushButton('Delete')
-        delete_btn.setStyleSheet('background-color: #d32f2f; color: #fff; font-weight: bold; border-radius: 8px; padding: 6px 12px;')
+        delete_btn.setProperty('role', 'danger')
         def accept():
             name = name_edit.text().strip()
             try:
-                temp = int(temp_edit.text().strip())
-                time = int(time_edit.text().strip())
+                temp = int(float(temp_edit.text().strip()))
+                time = int(float(time_edit.text().strip()))
             except ValueError:
                 QMessageBox.warning(self, 'Input Error', 'Temperature and drying time must be numbers.')
                 return
@@ -106,7 +125,7 @@ class SettingsPage(QWidget):
             # Remove old if renamed
             if name != preset:
                 del self.presets[preset]
-            self.presets[name] = {'temperature': temp, 'drying_time': time}
+            self.presets[name] = self.preset_data(temp, time, segments)
             self.save_presets()
             self.refresh_presets_grid()
             self.presets_changed.emit(self.presets)
@@ -129,12 +148,48 @@ class SettingsPage(QWidget):
         layout.addWidget(delete_btn)
         dialog.setLayout(layout)
         dialog.exec()
+    def add_profile_button(self, layout, temp_edit, time_edit, segments):
+        """'Profile...' button for a preset dialog; returns the list it keeps the edited segments in."""
+        current = list(segments or [])
+        button = QPushButton()
+
+        def show():
+            button.setText(f'Profile: {len(current)} stages' if current else 'Profile: single stage')
+            # A profile decides the preset's temperature and time
+            temp_edit.setEnabled(not current)
+            time_edit.setEnabled(not current)
+            if current:
+                temperature, drying_time = profile_summary(current)
+                temp_edit.setText(f'{temperature:g}')
+                time_edit.setText(f'{drying_time:g}')
+
+        def edit():
+            edited = edit_segments(self, current)
+            if edited is not None:
+                current[:] = edited
+                show()
+        button.clicked.connect(edit)
+        show()
+        layout.addWidget(button)
+        return current
+
+    def preset_data(self, temperature, drying_time, segments):
+        if segments:
+            return {'temperature': temperature, 'drying_time': drying_time, 'segments': list(segments)}
+        return {'temperature': temperature, 'drying_time': drying_time}
+
     switch_to_main = pyqtSignal()
     
-    def __init__(self, presets_file='presets.json'):
+    def __init__(self, presets_file='presets.json', repository=None):
         super().__init__()
-        self.presets_file = presets_file
+        # Page-wide rules (smaller fonts and buttons) come from the theme
+        self.setObjectName('settingsPage')
+        # Shared with the main page when built by the main window
+        self.repository = repository if repository is not None else PresetRepository(presets_file)
+        self.presets_file = self.repository.path
         self.presets = self.load_presets()
+        self.repository.subscribe(self.on_presets_reloaded)
+        self.pid_values = dict(DEFAULT_PID_GAINS)
         self.init_ui()
         
     def init_ui(self):
@@ -149,16 +204,20 @@ class SettingsPage(QWidget):
         # Divider
         divider1 = QLabel()
         divider1.setFixedHeight(2)
-        divider1.setStyleSheet('background: #0078d7; margin: 12px 0;')
+        divider1.setProperty('role', 'divider')
         layout.addWidget(divider1)
 
         # Preset buttons grid in a rounded card
         preset_card = QGroupBox('Presets')
-        preset_card.setStyleSheet('QGroupBox { border-radius: 16px; background: #353941; margin-top: 18px; box-shadow: 0 2px 8px rgba(0,0,0,0.10); } QGroupBox:title { font-size: 20px; font-weight: bold; color: #ff9800; }')
         preset_card_layout = QVBoxLayout()
         self.grid_layout = QGridLayout()
+        self.grid_layout.setSpacing(10)
+        self.grid_layout.setContentsMargins(20, 10, 20, 10)
         self.preset_buttons = {}
         self.preset_labels = {}
+        self.preset_rows = {}        # name -> (label, button)
+        self._shown_presets = {}     # presets as last rendered
+        self._grid_positions = {}    # name -> (row, column)
         self.refresh_presets_grid()
         preset_card_layout.addLayout(self.grid_layout)
         preset_card_layout.addStretch()
@@ -166,7 +225,7 @@ class SettingsPage(QWidget):
         plus_btn = QPushButton('+')
         plus_btn.setFont(QFont('Segoe UI', 24, QFont.Weight.Bold))
         plus_btn.setFixedSize(40, 40)
-        plus_btn.setStyleSheet('background-color: #0078d7; color: #fff; border-radius: 20px;')
+        plus_btn.setProperty('role', 'round')
         plus_btn.clicked.connect(self.open_add_preset_dialog)
         add_layout.addStretch()
         add_layout.addWidget(plus_btn)
@@ -177,13 +236,26 @@ class SettingsPage(QWidget):
         # Divider
         divider2 = QLabel()
         divider2.setFixedHeight(2)
-        divider2.setStyleSheet('background: #0078d7; margin: 12px 0;')
+        divider2.setProperty('role', 'divider')
         layout.addWidget(divider2)
 
+        # When a cycle ends: the fixed drying time, or the humidity decay
+        end_group = QGroupBox('End of Drying')
+        end_layout = QHBoxLayout()
+        end_layout.addWidget(QLabel('Mode:'))
+        self.end_mode_combo = QComboBox()
+        for mode, label in END_MODE_LABELS:
+            self.end_mode_combo.addItem(label, mode)
+        self.end_mode_combo.setCurrentIndex(1)
+        self.end_mode_combo.activated.connect(
+            lambda index: self.end_mode_changed.emit(self.end_mode_combo.itemData(index)))
+        end_layout.addWidget(self.end_mode_combo, 1)
+        end_group.setLayout(end_layout)
+        layout.addWidget(end_group)
+
         # Collapsible PID Controls Section
-        from PyQt6.QtWidgets import QToolButton
+        from PyQt5.QtWidgets import QToolButton
         pid_group = QGroupBox('PID Heater Control')
-        pid_group.setStyleSheet('QGroupBox { border-radius: 16px; background: #353941; margin-top: 18px; box-shadow: 0 2px 8px rgba(0,0,0,0.10); } QGroupBox:title { font-size: 20px; font-weight: bold; color: #ff9800; }')
         pid_layout = QVBoxLayout()
         pid_desc = QLabel('Adjust PID values for PWM heater control to minimize overshoot and hysteresis.')
         pid_desc.setWordWrap(True)
@@ -204,17 +276,25 @@ class SettingsPage(QWidget):
         self.pid_p_edit = pid_p_edit
         self.pid_i_edit = pid_i_edit
         self.pid_d_edit = pid_d_edit
+        self.show_pid_values()
 
         pid_save_btn = QPushButton('Save PID Values')
         pid_save_btn.setFont(QFont('Segoe UI', 18, QFont.Weight.Bold))
-        pid_save_btn.setStyleSheet('background-color: #0078d7; color: #fff; border-radius: 12px; padding: 10px 24px; font-size: 18px; font-weight: 600; box-shadow: 0 2px 8px rgba(0,0,0,0.10);')
         pid_save_btn.clicked.connect(self.save_pid_values)
         pid_layout.addWidget(pid_save_btn)
 
+        autotune_btn = QPushButton('Autotune PID')
+        autotune_btn.setFont(QFont('Segoe UI', 18, QFont.Weight.Bold))
+        autotune_btn.clicked.connect(self.autotune_requested.emit)
+        pid_layout.addWidget(autotune_btn)
+        self.autotune_status_label = QLabel('')
+        self.autotune_status_label.setWordWrap(True)
+        pid_layout.addWidget(self.autotune_status_label)
+
         # Collapsible button
         collapse_btn = QToolButton()
         collapse_btn.setText('▼')
-        collapse_btn.setStyleSheet('font-size: 18px; color: #ff9800; background: transparent; border: none;')
+        collapse_btn.setObjectName('collapse')
         collapse_btn.setCheckable(True)
         collapse_btn.setChecked(True)
         def toggle_pid():
@@ -225,73 +305,87 @@ class SettingsPage(QWidget):
         pid_group.setLayout(pid_layout)
         layout.addWidget(pid_group)
         self.setLayout(layout)
+    def show_end_mode(self, mode):
+        # Follows the controller; only user choices emit end_mode_changed
+        index = self.end_mode_combo.findData(mode)
+        if index >= 0:
+            self.end_mode_combo.setCurrentIndex(index)
+
     def save_pid_values(self):
         try:
             p = float(self.pid_p_edit.text())
             i = float(self.pid_i_edit.text())
             d = float(self.pid_d_edit.text())
             self.pid_values = {'P': p, 'I': i, 'D': d}
+            self.pid_changed.emit(self.pid_values)
             QMessageBox.information(self, 'PID Saved', f'PID values saved: P={p}, I={i}, D={d}')
         except ValueError:
             QMessageBox.warning(self, 'Input Error', 'PID values must be numbers.')
+    def apply_tuned_pid_values(self, values):
+        self.pid_values = dict(values)
+        self.show_pid_values()
+        self.pid_changed.emit(self.pid_values)
+    def show_pid_values(self):
+        self.pid_p_edit.setText(str(self.pid_values['P']))
+        self.pid_i_edit.setText(str(self.pid_values['I']))
+        self.pid_d_edit.setText(str(self.pid_values['D']))
     def refresh_presets_grid(self):
-        # Clear grid
-        for i in reversed(range(self.grid_layout.count())):
-            widget = self.grid_layout.itemAt(i).widget()
-            if widget:
-                self.grid_layout.removeWidget(widget)
-                widget.deleteLater()
-        self.preset_buttons.clear()
-        self.preset_labels.clear()
-        # Sort presets top-down
-        presets_sorted = sorted(self.presets.keys())
-        for idx, preset in enumerate(presets_sorted):
-            data = self.presets[preset]
-            label = QLabel(f'{preset}:')
-            label.setFont(QFont('Arial', 14))
-            self.preset_labels[preset] = label
-            # Ensure btn_text is always a string
-            temp = data.get('temperature', '')
-            time = data.get('drying_time', '')
-            btn_text = f"{temp}°C, {time} min"
-            button = QPushButton(str(btn_text))
-            button.setFont(QFont('Arial', 16, QFont.Weight.Bold))
-            button.setFixedSize(120, 40)
-            import functools
-            button.clicked.connect(functools.partial(self.open_edit_preset_dialog, preset))
-            self.preset_buttons[preset] = button
-            row = idx // 2
-            col = (idx % 2) * 2
-            self.grid_layout.addWidget(label, row, col)
-            self.grid_layout.addWidget(button, row, col + 1)
-
-        # Modern style for grid
-        self.grid_layout.setSpacing(10)
-        self.grid_layout.setContentsMargins(20, 10, 20, 10)
-        self.setStyleSheet('QLabel { font-size: 16px; } QPushButton { font-size: 16px; padding: 6px 12px; border-radius: 8px; background-color: #0078d7; color: #fff; } QPushButton:hover { background-color: #005fa3; } QLineEdit { font-size: 16px; border-radius: 8px; padding: 4px; }')
-        
+        """Bring the grid in line with self.presets, touching only changed rows."""
+        reconcile(self.preset_rows, self._shown_presets, self.presets,
+                  create=self.create_preset_row, update=self.update_preset_row,
+                  destroy=self.remove_preset_row)
+        self._shown_presets = snapshot_presets(self.presets)
+        # Rows are sorted top-down, two per line; only rows whose cell changed move
+        for idx, preset in enumerate(sorted(self.presets)):
+            position = (idx // 2, (idx % 2) * 2)
+            if self._grid_positions.get(preset) != position:
+                label, button = self.preset_rows[preset]
+                self.grid_layout.removeWidget(label)
+                self.grid_layout.removeWidget(button)
+                self.grid_layout.addWidget(label, position[0], position[1])
+                self.grid_layout.addWidget(button, position[0], position[1] + 1)
+                self._grid_positions[preset] = position
+
+    def create_preset_row(self, preset, data):
+        label = QLabel(f'{preset}:')
+        label.setFont(QFont('Arial', 14))
+        button = QPushButton(self.preset_button_text(data))
+        button.setFont(QFont('Arial', 16, QFont.Weight.Bold))
+        button.setFixedSize(120, 40)
+        button.clicked.connect(functools.partial(self.open_edit_preset_dialog, preset))
+        self.preset_labels[preset] = label
+        self.preset_buttons[preset] = button
+        return label, button
+
+    def update_preset_row(self, preset, row, data):
+        row[1].setText(self.preset_button_text(data))
+
+    def remove_preset_row(self, preset, row):
+        for widget in row:
+            self.grid_layout.removeWidget(widget)
+            widget.deleteLater()
+        self.preset_labels.pop(preset, None)
+        self.preset_buttons.pop(preset, None)
+        self._grid_positions.pop(preset, None)
+
+    def preset_button_text(self, data):
+        # Ensure btn_text is always a string
+        temp = data.get('temperature', '')
+        time = data.get('drying_time', '')
+        if data.get('segments'):
+            return f"{len(data['segments'])} stages, {time} min"
+        return f"{temp}°C, {time} min"
+
     def load_presets(self):
-        try:
-            with open(self.presets_file, 'r') as file:
-                data = json.load(file)
-            # Migrate old format if needed
-            migrated = {}
-            for k, v in data.items():
-                if isinstance(v, dict):
-                    migrated[k] = v
-                else:
-                    migrated[k] = {
-                        'temperature': int(str(v).replace('°C','')), 
-                        'drying_time': 60
-                    }
-            return migrated
-        except (FileNotFoundError, json.JSONDecodeError):
-            return {
-                'PLA': {'temperature': 34, 'drying_time': 60},
-                'ABS': {'temperature': 69, 'drying_time': 120},
-                'PETG': {'temperature': 55, 'drying_time': 90}
-            }
-            
+        # Parsed, migrated and validated once by the repository
+        return self.repository.presets
+
+    def on_presets_reloaded(self, presets):
+        # Saved by another page or process; our own saves arrive here too
+        if presets != self.presets:
+            self.presets = presets
+            self.refresh_presets_grid()
+
     def open_slider_popup(self, preset):
         dialog = QDialog(self)
         dialog.setWindowTitle(f'Set {preset}')
@@ -387,19 +481,21 @@ class SettingsPage(QWidget):
                 print(f'Invalid preset data for {k}:', v)
                 return
         try:
-            with open(self.presets_file, 'w') as file:
-                json.dump(self.presets, file)
+            self.repository.save(self.presets)
             # Update all button labels to reflect saved values
             for preset, button in self.preset_buttons.items():
                 if preset in self.presets:
                     data = self.presets[preset]
                     if isinstance(data, dict):
-                        btn_text = f"{data.get('temperature', '')}°C, {data.get('drying_time', '')} min"
+                        btn_text = self.preset_button_text(data)
                     else:
                         btn_text = str(data)
                     button.setText(btn_text)
             QMessageBox.information(self, 'Success', 'Presets saved successfully!')
             print('Presets saved:', self.presets)
+        except PresetError as e:
+            QMessageBox.critical(self, 'Error', f'Presets are invalid and were not saved: {str(e)}')
+            print(f'Invalid presets: {e}')
         except Exception as e:
             QMessageBox.critical(self, 'Error', f'Failed to save presets: {str(e)}')
             print(f'Failed to save presets: {e}')
@@ -0,0 +1,105 @@
+# startup_trace.py
+# Optional cold-start profiling. With FD_STARTUP_TRACE=1 in the environment
+# every first-time import on the main thread and every traced span (page
+# constructors) is timed, and report() prints the breakdown once the first
+# frame is up. When disabled everything here is a no-op.
+
+import os
+import sys
+import time
+import builtins
+import threading
+from contextlib import contextmanager
+
+ENV_VAR = 'FD_STARTUP_TRACE'
+REPORT_TOP_IMPORTS = 15
+
+_original_import = builtins.__import__
+_enabled = False
+_t0 = None
+_imports = []   # (name, total s, self s, depth)
+_spans = []     # (name, start offset s, duration s)
+_stack = []     # child time accumulated per active import
+
+
+def enabled():
+    return _enabled
+
+
+def enable():
+    """Start timing imports and spans from now on."""
+    global _enabled, _t0
+    if _enabled:
+        return
+    _enabled = True
+    _t0 = time.perf_counter()
+    builtins.__import__ = _timed_import
+
+
+def enable_from_env():
+    if os.environ.get(ENV_VAR, '') not in ('', '0'):
+        enable()
+
+
+def disable():
+    global _enabled
+    _enabled = False
+    builtins.__import__ = _original_import
+
+
+def _timed_import(name, globals=None, locals=None, fromlist=(), level=0):
+    # Cached and relative imports, and other threads, pass straight through
+    if level or name in sys.modules or threading.current_thread() is not threading.main_thread():
+        return _original_import(name, globals, locals, fromlist, level)
+    depth = len(_stack)
+    _stack.append(0.0)
+    start = time.perf_counter()
+    try:
+        return _original_import(name, globals, locals, fromlist, level)
+    finally:
+        elapsed = time.perf_counter() - start
+        children = _stack.pop()
+        if _stack:
+            _stack[-1] += elapsed
+        _imports.append((name, elapsed, elapsed - children, depth))
+
+
+@contextmanager
+def span(name):
+    """Time a block (e.g. a page constructor) when tracing is enabled."""
+    if not _enabled:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _spans.append((name, start - _t0, time.perf_counter() - start))
+
+
+def imports():
+    return list(_imports)
+
+
+def spans():
+    return list(_spans)
+
+
+def report(file=None):
+    """Print the recorded timings; stops tracing imports."""
+    if not _enabled:
+        return
+    disable()
+    file = file or sys.stderr
+    total = time.perf_counter() - _t0
+    print(f'Startup trace: {total * 1000:.1f} ms since tracing began', file=file)
+    print('Spans:', file=file)
+    for name, offset, duration in _spans:
+        print(f'  {duration * 1000:8.1f} ms  {name} (at +{offset * 1000:.1f} ms)', file=file)
+    print('Top-level imports (total ms):', file=file)
+    for name, elapsed, own, depth in sorted(_imports, key=lambda i: -i[1]):
+        if depth == 0:
+            print(f'  {elapsed * 1000:8.1f} ms  {name}', file=file)
+    print(f'Slowest imports by self time (top {REPORT_TOP_IMPORTS}):', file=file)
+    for name, elapsed, own, depth in sorted(_imports, key=lambda i: -i[2])[:REPORT_TOP_IMPORTS]:
+        print(f'  {own * 1000:8.1f} ms  {name}', file=file)
@@ -0,0 +1,139 @@
+# state_store.py
+# Observable dryer state for the views. Updates only record changes; views
+# subscribe to the fields they show and are called once per frame with the
+# fields that actually changed since they were last notified, instead of
+# polling widgets on a timer.
+
+import threading
+
+FRAME_INTERVAL_MS = 16  # coalescing window of the Qt scheduler (~60 Hz)
+
+# name: (type, default); fields defaulting to None also accept None
+DRYER_FIELDS = {
+    'temperature': (float, None),
+    'humidity': (float, None),
+    'preset': (str, 'PLA'),
+    'setpoint': (float, 66.0),
+    'drying_time': (int, 60),       # minutes
+    'remaining_time': (int, 3600),  # seconds
+    'timer_running': (bool, False),
+    'heater_on': (bool, False),
+    'duty': (float, 0.0),
+    'pwm_value': (int, 0),
+    'connected': (bool, True),
+    'cycle_notice': (str, ''),      # resume/abort after a power cut
+    'profile_status': (str, ''),    # stage of a ramp/soak profile
+    'end_mode': (str, 'monitor'),   # how the humidity decay may end a cycle
+    'dryness_status': (str, ''),    # moisture release and predicted time to dry
+    'power': (float, 0.0),          # heater W
+    'energy': (dict, None),         # kWh and cost totals (src.energy.EnergyMeter.snapshot)
+}
+
+
+class StateStore:
+    """Typed key/value state with change-only, frame-coalesced notifications.
+
+    ``schedule(callback)`` arranges for ``callback`` to run soon (e.g. on the
+    next frame); without one, subscribers are notified synchronously on
+    every update. Keys not declared in ``fields`` are ignored, so a whole
+    controller delta can be fed in as is.
+    """
+
+    def __init__(self, fields=DRYER_FIELDS, schedule=None):
+        self.fields = dict(fields)
+        self.schedule = schedule
+        self._values = {name: default for name, (kind, default) in self.fields.items()}
+        self._subscribers = []   # [fields, callback, last values it saw]
+        self._dirty = set()
+        self._flush_pending = False
+        self._lock = threading.Lock()
+
+    def __getitem__(self, name):
+        return self._values[name]
+
+    def get(self, name, default=None):
+        return self._values.get(name, default)
+
+    def snapshot(self):
+        return dict(self._values)
+
+    def _coerce(self, name, value):
+        kind, default = self.fields[name]
+        if value is None:
+            if default is not None:
+                raise ValueError(f'{name} cannot be None')
+            return None
+        return kind(value)
+
+    def update(self, values=None, **kwargs):
+        """Set fields; returns the names whose value changed."""
+        values = dict(values or {}, **kwargs)
+        with self._lock:
+            changed = set()
+            for name, value in values.items():
+                if name not in self.fields:
+                    continue
+                value = self._coerce(name, value)
+                if self._values[name] != value:
+                    self._values[name] = value
+                    changed.add(name)
+            self._dirty |= changed
+            needs_flush = changed and not self._flush_pending
+            if needs_flush and self.schedule is not None:
+                self._flush_pending = True
+        if needs_flush:
+            if self.schedule is None:
+                self.flush()
+            else:
+                self.schedule(self.flush)
+        return changed
+
+    def subscribe(self, fields, callback, initial=True):
+        """Call ``callback(changes)`` with the subset of ``fields`` that changed.
+
+        With ``initial`` the callback first receives the current values so the
+        view can render straight away.
+        """
+        fields = tuple(fields)
+        unknown = set(fields) - set(self.fields)
+        if unknown:
+            raise KeyError(f'unknown state fields: {sorted(unknown)}')
+        seen = {name: self._values[name] for name in fields}
+        entry = [fields, callback, seen]
+        self._subscribers.append(entry)
+        if initial:
+            callback(dict(seen))
+        return entry
+
+    def unsubscribe(self, entry):
+        if entry in self._subscribers:
+            self._subscribers.remove(entry)
+
+    def flush(self):
+        """Deliver pending changes now (the scheduler calls this once per burst)."""
+        with self._lock:
+            self._flush_pending = False
+            dirty, self._dirty = self._dirty, set()
+            values = dict(self._values)
+        if not dirty:
+            return
+        for entry in list(self._subscribers):
+            fields, callback, seen = entry
+            # A value that changed and changed back within the frame is skipped
+            changes = {name: values[name] for name in fields if name in dirty and seen[name] != values[name]}
+            if not changes:
+                continue
+            seen.update(changes)
+            try:
+                callback(changes)
+            except Exception as e:
+                print(f'State view update failed: {e}')
+
+
+def qt_frame_scheduler(interval_ms=FRAME_INTERVAL_MS):
+    """Scheduler for StateStore that runs the flush on the Qt event loop."""
+    from src import instrumentation
+
+    def schedule(callback):
+        instrumentation.single_shot(interval_ms, 'StateStore.flush', callback)
+    return schedule
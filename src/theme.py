@@ -0,0 +1,97 @@
+# theme.py
+# The application's look in one place. The stylesheet is compiled once and
+# set on the QApplication; widgets only get an objectName or a dynamic
+# property ('role', 'selected', 'level', ...) and state changes flip a
+# property and re-polish that single widget instead of calling
+# setStyleSheet, which would re-style the widget's whole subtree.
+
+from string import Template
+
+PALETTE = {
+    'background': '#232629',
+    'surface': '#353941',
+    'text': '#f0f0f0',
+    'accent': '#0078d7',
+    'accent_hover': '#005fa3',
+    'highlight': '#ff9800',
+    'danger': '#d32f2f',
+}
+
+# Heater LED brightness steps (status bar); 0 is off
+LED_LEVELS = 5
+
+_STYLESHEET = Template('''
+QWidget { background-color: $background; color: $text; font-family: 'Segoe UI', Arial, sans-serif; }
+QLabel { font-size: 18px; }
+
+QTabBar { min-height: 60px; }
+QTabBar::tab { height: 60px; font-size: 20pt; min-width: 180px; max-width: 180px; margin: 4px; padding: 8px 24px;
+               border-radius: 16px; background: $surface; color: $text; }
+QTabBar::tab:selected { background: $accent; color: #fff; border: 2px solid $highlight; }
+
+QStatusBar { background: qlineargradient(x1:0, y1:0, x2:1, y2:0, stop:0 $background, stop:1 $surface);
+             color: $highlight; font-weight: bold; font-size: 20px; border-bottom: 2px solid $accent; min-height: 48px; }
+QLabel#clock { color: $highlight; }
+QLabel#statusLed { border-radius: 16px; background: $surface; border: 2px solid $background; }
+$led_rules
+
+QGroupBox { border: 2px solid $accent; border-radius: 16px; margin-top: 18px; background: $surface; color: $text; }
+QGroupBox:title { subcontrol-origin: margin; left: 18px; padding: 0 6px 0 6px; font-size: 20px; font-weight: bold;
+                  color: $highlight; }
+QLabel[role="divider"] { background: $accent; margin: 12px 0; }
+
+QPushButton { background-color: $accent; color: #fff; border-radius: 12px; padding: 10px 24px; font-size: 18px;
+              font-weight: 600; }
+QPushButton:hover { background-color: $accent_hover; }
+QPushButton:checked { background-color: $highlight; color: $background; border: 2px solid $accent; }
+QPushButton[role="preset"] { background-color: $surface; color: $text; border: none; }
+QPushButton[role="preset"][selected="true"] { background-color: $accent; color: #fff; border: 2px solid $highlight; }
+QPushButton[role="danger"] { background-color: $danger; color: #fff; font-weight: bold; border-radius: 8px;
+                             padding: 6px 12px; }
+QPushButton[role="round"] { border-radius: 20px; padding: 0; }
+QToolButton#collapse { font-size: 18px; color: $highlight; background: transparent; border: none; }
+
+QWidget#settingsPage QLabel { font-size: 16px; }
+QWidget#settingsPage QPushButton { font-size: 16px; padding: 6px 12px; border-radius: 8px; }
+QWidget#settingsPage QPushButton[role="round"] { border-radius: 20px; padding: 0; }
+QWidget#settingsPage QLineEdit { font-size: 16px; border-radius: 8px; padding: 4px; }
+
+QComboBox { background-color: $surface; color: $text; border-radius: 12px; padding: 6px; font-size: 16px; }
+QSlider::groove:horizontal { height: 10px; background: $surface; border-radius: 5px; }
+QSlider::handle:horizontal { background: $accent; border: 2px solid $surface; width: 22px; margin: -6px 0;
+                             border-radius: 11px; }
+''')
+
+
+def compile_stylesheet(palette=PALETTE):
+    """Build the full application stylesheet for ``palette``."""
+    led_rules = '\n'.join(
+        f'QLabel#statusLed[level="{level}"] {{ background: rgb({80 + (255 - 80) * level // (LED_LEVELS - 1)},0,0); }}'
+        for level in range(1, LED_LEVELS))
+    return _STYLESHEET.substitute(palette, led_rules=led_rules)
+
+
+STYLESHEET = compile_stylesheet()
+
+
+def apply_theme(app, stylesheet=STYLESHEET):
+    """Install the compiled stylesheet; the only setStyleSheet call the GUI makes."""
+    app.setStyleSheet(stylesheet)
+
+
+def set_state(widget, name, value):
+    """Set a styling property and re-polish ``widget`` alone, only if it changed."""
+    if widget.property(name) == value:
+        return False
+    widget.setProperty(name, value)
+    style = widget.style()
+    style.unpolish(widget)
+    style.polish(widget)
+    return True
+
+
+def led_level(heater_on, pwm_value):
+    """Map heater state and 0-255 PWM to an LED brightness step."""
+    if not heater_on:
+        return 0
+    return 1 + min(LED_LEVELS - 2, int(pwm_value) * (LED_LEVELS - 1) // 256)
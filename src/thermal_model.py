@@ -0,0 +1,249 @@
+# thermal_model.py
+# Lumped physical model of a drying chamber, used as the simulated hardware
+# backend and for faster-than-real-time runs in tests and tuning.
+#
+#   C dT/dt   = P * u(t - dead_time) - G * (T - T_ambient)      air/walls
+#   dTs/dt    = (T - Ts) / sensor_lag                          probe reading
+#   dm/dt     = -k(T) * m                                      water in filament
+#   dw/dt     = k(T) * m - vent_rate * (w - w_ambient)         vapour in chamber
+#
+# k(T) doubles every 10 K. Relative humidity is derived from the vapour
+# mass, the chamber volume and the saturation density at T.
+
+import time
+import threading
+from collections import namedtuple
+import numpy as np
+from src.pid import BatchPIDController
+
+DEFAULT_STEP = 1.0  # integration step in seconds
+
+DEFAULT_PARAMS = {
+    'heater_power': 150.0,       # W at 100 % duty
+    'thermal_mass': 4000.0,      # J/K of air, walls and spool
+    'loss_coefficient': 1.5,     # W/K to ambient
+    'ambient_temperature': 25.0,  # °C
+    'ambient_humidity': 50.0,    # % RH
+    'sensor_lag': 20.0,          # s, first-order probe time constant
+    'dead_time': 5.0,            # s between heater command and air response
+    'volume': 0.05,              # m³ of chamber air
+    'vent_rate': 1 / 600,        # 1/s air exchange with the room
+    'filament_moisture': 3.0,    # g of water in the loaded spool
+    'drying_rate_60c': 1 / 1800,  # 1/s moisture release rate at 60 °C
+}
+
+SimulationResult = namedtuple('SimulationResult', ['time', 'measured', 'temperature', 'humidity', 'duty'])
+
+
+def saturation_absolute_humidity(temperature):
+    """Water vapour density at saturation in g/m³ (Magnus formula)."""
+    temperature = np.asarray(temperature, dtype=np.float64)
+    vapour_pressure = 6.112 * np.exp(17.67 * temperature / (temperature + 243.5))  # hPa
+    return vapour_pressure * 216.74 / (273.15 + temperature)
+
+
+def absolute_humidity(temperature, relative_humidity):
+    """Convert °C and % RH to g/m³."""
+    return saturation_absolute_humidity(temperature) * np.asarray(relative_humidity) / 100.0
+
+
+def relative_humidity(temperature, absolute):
+    """Convert °C and g/m³ to % RH (capped at 100 %)."""
+    return np.minimum(100.0, 100.0 * np.asarray(absolute) / saturation_absolute_humidity(temperature))
+
+
+class ChamberModel:
+    """Fixed-step chamber model integrating ``batch`` independent chambers at once.
+
+    Every parameter may be a scalar or a ``(batch,)`` array, except
+    ``dead_time`` which is shared (it sets the length of the delay line).
+    """
+
+    def __init__(self, batch=1, dt=DEFAULT_STEP, **overrides):
+        unknown = set(overrides) - set(DEFAULT_PARAMS)
+        if unknown:
+            raise ValueError(f'unknown chamber parameters: {sorted(unknown)}')
+        params = dict(DEFAULT_PARAMS, **overrides)
+        self.batch = batch
+        self.dt = dt
+        self.dead_time = float(params.pop('dead_time'))
+        self.params = {name: np.broadcast_to(np.asarray(value, dtype=np.float64), (batch,)).copy()
+                       for name, value in params.items()}
+        self._delay_steps = int(round(self.dead_time / dt))
+        # Exact discretisation of the first-order probe lag
+        self._sensor_alpha = -np.expm1(-dt / np.maximum(self.params['sensor_lag'], 1e-9))
+        self.reset()
+
+    def reset(self):
+        p = self.params
+        dt = self.dt
+        self.elapsed = 0.0
+        self.temperature = p['ambient_temperature'].copy()
+        self.sensor_temperature = self.temperature.copy()
+        self.moisture = p['filament_moisture'].copy()
+        self._vapour_ambient = absolute_humidity(p['ambient_temperature'], p['ambient_humidity']) * p['volume']
+        self.vapour = self._vapour_ambient.copy()
+        # Circular delay line of past duty commands implementing the dead time
+        self._delay = np.zeros((self._delay_steps + 1, self.batch))
+        self._delay_index = 0
+        # Per-step constants, so step() is a handful of array operations
+        self._heat_per_duty = dt * p['heater_power'] / 100.0 / p['thermal_mass']
+        self._loss_factor = dt * p['loss_coefficient'] / p['thermal_mass']
+        self._vent_factor = dt * p['vent_rate']
+
+    @property
+    def humidity(self):
+        """Chamber relative humidity in %."""
+        return relative_humidity(self.temperature, self.vapour / self.params['volume'])
+
+    def step(self, duty):
+        """Advance one ``dt`` with heater ``duty`` in percent (scalar or per chamber)."""
+        p = self.params
+        self._delay[self._delay_index] = np.clip(duty, 0.0, 100.0)
+        self._delay_index = (self._delay_index + 1) % len(self._delay)
+        applied = self._delay[self._delay_index]  # command from dead_time ago
+
+        excess = self.temperature - p['ambient_temperature']
+        self.temperature = self.temperature + self._heat_per_duty * applied - self._loss_factor * excess
+        self.sensor_temperature = self.sensor_temperature + self._sensor_alpha * (self.temperature - self.sensor_temperature)
+
+        # Fraction of the remaining moisture released this step, k(T) = k60 * 2^((T-60)/10)
+        released = self.moisture * -np.expm1(-self.dt * p['drying_rate_60c'] * np.exp2((self.temperature - 60.0) * 0.1))
+        self.moisture = self.moisture - released
+        self.vapour = self.vapour + released - self._vent_factor * (self.vapour - self._vapour_ambient)
+        self.elapsed += self.dt
+        return self.sensor_temperature
+
+    def run(self, duty):
+        """Open-loop run over a ``(steps,)`` or ``(steps, batch)`` duty schedule."""
+        duty = np.asarray(duty, dtype=np.float64)
+        steps = duty.shape[0]
+        measured = np.empty((steps, self.batch))
+        temperature = np.empty((steps, self.batch))
+        vapour = np.empty((steps, self.batch))
+        for i in range(steps):
+            measured[i] = self.step(duty[i])
+            temperature[i] = self.temperature
+            vapour[i] = self.vapour
+        times = self.elapsed - self.dt * np.arange(steps - 1, -1, -1)
+        humidity = relative_humidity(temperature, vapour / self.params['volume'])
+        return SimulationResult(times, measured, temperature, humidity,
+                                np.broadcast_to(duty.reshape(steps, -1), (steps, self.batch)))
+
+
+def simulate_pid(kp, ki, kd, setpoint, duration, dt=DEFAULT_STEP, **params):
+    """Closed-loop run of PID gain sets (scalars or ``(batch,)`` arrays) against the model.
+
+    A 2-hour cycle of hundreds of candidate gains takes a fraction of a second.
+    """
+    batch = np.broadcast(np.asarray(kp), np.asarray(ki), np.asarray(kd), np.asarray(setpoint)).shape
+    batch = batch[0] if batch else 1
+    model = ChamberModel(batch=batch, dt=dt, **params)
+    pid = BatchPIDController(kp, ki, kd, setpoint=setpoint)
+    steps = int(round(duration / dt))
+    measured = np.empty((steps, batch))
+    temperature = np.empty((steps, batch))
+    vapour = np.empty((steps, batch))
+    duty = np.empty((steps, batch))
+    reading = model.sensor_temperature
+    for i in range(steps):
+        duty[i] = pid.update(reading, dt)
+        reading = model.step(duty[i])
+        measured[i] = reading
+        temperature[i] = model.temperature
+        vapour[i] = model.vapour
+    humidity = relative_humidity(temperature, vapour / model.params['volume'])
+    return SimulationResult(dt * np.arange(1, steps + 1), measured, temperature, humidity, duty)
+
+
+class SimulatedChamber:
+    """Real-time single chamber: advances the model by wall-clock time on every access.
+
+    ``speedup`` > 1 runs the simulated physics faster than real time, which is
+    handy for demos of a full cycle.
+    """
+
+    def __init__(self, speedup=1.0, dt=0.5, **params):
+        self.model = ChamberModel(batch=1, dt=dt, **params)
+        self.speedup = speedup
+        self.duty = 0.0
+        self._lock = threading.Lock()
+        self._last = time.monotonic()
+        self._pending = 0.0
+
+    def _advance(self):
+        now = time.monotonic()
+        self._pending += (now - self._last) * self.speedup
+        self._last = now
+        while self._pending >= self.model.dt:
+            self.model.step(self.duty)
+            self._pending -= self.model.dt
+
+    def set_duty(self, duty):
+        with self._lock:
+            self._advance()
+            self.duty = float(duty)
+
+    def read_temperature(self):
+        with self._lock:
+            self._advance()
+            return float(self.model.sensor_temperature[0])
+
+    def read_humidity(self):
+        with self._lock:
+            self._advance()
+            return float(self.model.humidity[0])
+
+
+class SimulatedPWM:
+    """RPi.GPIO-compatible PWM channel; the heater pin feeds a SimulatedChamber."""
+
+    def __init__(self, pin, frequency, chamber=None):
+        self.pin = pin
+        self.frequency = frequency
+        self.chamber = chamber
+        self.duty_cycle = 0
+        self.is_running = False
+
+    def start(self, duty_cycle):
+        self.is_running = True
+        self.ChangeDutyCycle(duty_cycle)
+
+    def ChangeDutyCycle(self, duty_cycle):
+        self.duty_cycle = duty_cycle
+        if self.chamber is not None:
+            self.chamber.set_duty(duty_cycle if self.is_running else 0)
+
+    def stop(self):
+        self.is_running = False
+        if self.chamber is not None:
+            self.chamber.set_duty(0)
+
+
+class SimulatedGPIO:
+    """Stand-in for the RPi.GPIO module that routes heater PWM into a chamber model."""
+
+    BCM = "BCM"
+    OUT = "OUT"
+    IN = "IN"
+    PUD_UP = "PUD_UP"
+
+    def __init__(self, chamber, heater_pins=()):
+        self.chamber = chamber
+        self.heater_pins = set(heater_pins)
+        self.chambers = {}   # heater pin -> its own chamber (multi-chamber setups)
+
+    def attach(self, pin, chamber):
+        """Route PWM on heater ``pin`` into ``chamber`` instead of the default one."""
+        self.chambers[pin] = chamber
+
+    def setmode(self, mode):
+        pass
+
+    def setup(self, pin, mode, pull_up_down=None):
+        pass
+
+    def PWM(self, pin, frequency):
+        if pin in self.chambers:
+            return SimulatedPWM(pin, frequency, self.chambers[pin])
+        return SimulatedPWM(pin, frequency, self.chamber if pin in self.heater_pins else None)
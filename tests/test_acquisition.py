@@ -0,0 +1,76 @@
+import time
+import threading
+from src.acquisition import SensorAcquisition, Reading
+
+def wait_for(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+def test_readings_are_published_from_worker_threads():
+    seen_threads = set()
+    def read():
+        seen_threads.add(threading.current_thread().name)
+        return 42.0
+    acq = SensorAcquisition(rate_hz=50)
+    acq.add_sensor('temperature', read, bus='1-wire')
+    acq.add_sensor('humidity', lambda: 30.0, bus='dht')
+    acq.start()
+    try:
+        assert wait_for(lambda: acq.queue.qsize() >= 4)
+    finally:
+        acq.stop()
+    readings = acq.drain()
+    assert {r.name for r in readings} == {'temperature', 'humidity'}
+    assert acq.latest == {'temperature': 42.0, 'humidity': 30.0}
+    assert threading.current_thread().name not in seen_threads
+    assert acq.drain() == []
+
+def test_failing_sensor_is_counted_and_skipped():
+    acq = SensorAcquisition()
+    def broken():
+        raise OSError('no such device')
+    acq.poll_sensors([('temperature', broken), ('humidity', lambda: None)])
+    assert acq.errors == 1
+    assert acq.drain() == []
+
+def test_full_queue_keeps_newest_readings():
+    acq = SensorAcquisition(maxsize=2)
+    for i in range(4):
+        acq.publish(Reading(i, 'temperature', float(i)))
+    assert acq.dropped == 2
+    assert [r.value for r in acq.drain()] == [2.0, 3.0]
+
+def test_service_can_restart():
+    acq = SensorAcquisition(rate_hz=100)
+    acq.add_sensor('temperature', lambda: 1.0)
+    acq.start()
+    acq.stop()
+    acq.drain()
+    acq.start()
+    try:
+        assert wait_for(lambda: not acq.queue.empty())
+    finally:
+        acq.stop()
+    assert not acq.running
+
+def test_pipeline_oversamples_and_publishes_filtered_values():
+    from src.filters import SensorPipeline
+    raw = iter([20.0, 20.0, 90.0, 20.0] * 1000)
+    acq = SensorAcquisition(rate_hz=20)
+    acq.add_sensor('temperature', lambda: next(raw), bus='1-wire', pipeline=SensorPipeline(oversample=4))
+    acq.add_sensor('humidity', lambda: 30.0, bus='dht')
+    assert acq.bus_rate('1-wire') == 80 and acq.bus_rate('dht') == 20
+    acq.start()
+    try:
+        assert wait_for(lambda: acq.filter_stats()['temperature']['samples'] >= 16)
+    finally:
+        acq.stop()
+    temperatures = [r.value for r in acq.drain() if r.name == 'temperature']
+    stats = acq.filter_stats()['temperature']
+    assert len(temperatures) == stats['samples'] // 4
+    assert all(abs(value - 20.0) < 1e-9 for value in temperatures)
+    assert stats['rejected'] >= stats['samples'] // 4 - 1
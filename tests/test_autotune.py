@@ -0,0 +1,43 @@
+import math
+import numpy as np
+from src.thermal_model import ChamberModel
+from src.autotune import (RelayAutotuner, identify_plant, gain_grid, grid_search, nelder_mead,
+                          plant_model_params, score_gains, PlantEstimate)
+
+def run_relay(model, tuner, limit=20000):
+    reading = model.sensor_temperature[0]
+    for _ in range(limit):
+        reading = model.step(tuner.update(reading, model.dt))[0]
+        if tuner.done:
+            return tuner.result
+    raise AssertionError('relay experiment did not finish')
+
+def test_relay_experiment_identifies_static_gain():
+    model = ChamberModel(heater_power=150.0, loss_coefficient=1.5)  # 1 °C per % duty
+    completed = []
+    plant = run_relay(model, RelayAutotuner(60.0, 25.0, on_complete=completed.append))
+    assert completed == [plant]
+    assert abs(plant.gain - 1.0) < 0.1
+    assert plant.ultimate_period > 0 and plant.dead_time > 0
+
+def test_identify_plant_matches_fopdt_phase_condition():
+    plant = identify_plant(ultimate_gain=10.0, ultimate_period=200.0, static_gain=0.8, ambient=25.0)
+    omega = 2 * math.pi / 200.0
+    assert abs(plant.gain / math.hypot(1, omega * plant.time_constant) - 1 / 10.0) < 1e-9
+    assert abs(omega * plant.dead_time + math.atan(omega * plant.time_constant) - math.pi) < 1e-9
+
+def test_nelder_mead_finds_minimum_of_log_quadratic():
+    target = np.log([5.0, 0.1, 50.0])
+    cost = lambda g: ((np.log(g) - target) ** 2).sum(axis=1)
+    best, value = nelder_mead(cost, [1.0, 1.0, 1.0], step=1.0, iterations=200)
+    assert np.allclose(best, [5.0, 0.1, 50.0], rtol=0.05)
+
+def test_parallel_grid_search_matches_serial():
+    plant = PlantEstimate(1.0, 2500.0, 25.0, 25.0, 60.0, 150.0)
+    params = plant_model_params(plant)
+    candidates = gain_grid([10.0, 0.1, 100.0], points=2)
+    serial_best, serial_costs = grid_search(candidates, params, 60.0, 1200.0, processes=1)
+    parallel_best, parallel_costs = grid_search(candidates, params, 60.0, 1200.0, processes=2)
+    assert np.allclose(serial_costs, parallel_costs)
+    assert np.allclose(serial_best, parallel_best)
+    assert np.allclose(serial_costs, score_gains(candidates, params, 60.0, 1200.0))
@@ -0,0 +1,16 @@
+from benchmarks.run_benchmarks import compare, measure
+
+
+def test_measure_reports_per_call_time():
+    calls = []
+    result = measure(lambda: calls.append(1), repeat=3)
+    assert result['samples'] == 3 and result['loops'] >= 1
+    assert 0 <= result['min'] <= result['median']
+    assert len(calls) >= 1 + 3 * result['loops']
+
+
+def test_compare_flags_only_slowdowns_past_threshold():
+    baseline = {'a': {'median': 1.0}, 'b': {'median': 1.0}, 'gone': {'median': 1.0}}
+    results = {'a': {'median': 1.2}, 'b': {'median': 1.3}, 'new': {'median': 5.0}}
+    rows = {name: regressed for name, _, _, _, regressed in compare(results, baseline, threshold=0.25)}
+    assert rows == {'a': False, 'b': True}
@@ -0,0 +1,37 @@
+import time
+import threading
+import pytest
+from src.chamber import ChamberManager
+
+def wait_for(predicate, timeout=4.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.05)
+    return False
+
+def test_eight_chambers_share_one_scheduler(tmp_path):
+    before = threading.active_count()
+    manager = ChamberManager(8, session_root=str(tmp_path), workers=4)
+    try:
+        for chamber in manager:
+            chamber.controller.select_preset('PLA', 60, 1)
+            chamber.controller.start()
+        assert wait_for(lambda: all(c.controller.state['remaining_time'] < 60 for c in manager))
+        manager.sample()
+        # dispatcher plus pool, not threads per controller/loop
+        assert threading.active_count() - before <= 5
+        for chamber in manager:
+            assert chamber.controller.state['temperature'] is not None
+            assert len(chamber.history) == 1
+        stats = manager.loop_stats()
+        assert 'chamber8-tick' in stats and 'chamber1-pid' in stats
+        assert len(list(tmp_path.glob('chamber-*'))) == 8
+    finally:
+        manager.close()
+    assert all(not chamber.controller.control_loop.running for chamber in manager)
+
+def test_rejects_too_many_chambers(tmp_path):
+    with pytest.raises(ValueError):
+        ChamberManager(99, session_root=str(tmp_path))
@@ -0,0 +1,74 @@
+import time
+from src.controller import DryerController
+
+def wait_for(predicate, timeout=3.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+def test_publishes_only_changed_keys(tmp_path):
+    controller = DryerController(session_dir=str(tmp_path), tick_period=0.05)
+    deltas = []
+    controller.subscribe(deltas.append)
+    try:
+        controller.select_preset('ABS', 59, 90)
+        assert deltas[-1] == {'preset': 'ABS', 'setpoint': 59, 'drying_time': 90, 'remaining_time': 5400}
+        before = len(deltas)
+        controller.select_preset('ABS', 59, 90)
+        assert len(deltas) == before
+        assert wait_for(lambda: controller.state['temperature'] is not None)
+    finally:
+        controller.close()
+
+def test_start_and_stop_run_heater_countdown_and_log(tmp_path):
+    controller = DryerController(session_dir=str(tmp_path), tick_period=0.05)
+    try:
+        controller.select_preset('Test', 60, 1)
+        controller.start()
+        assert controller.state['heater_on'] and controller.control_loop.running
+        assert wait_for(lambda: controller.state['remaining_time'] < 60)
+        assert wait_for(lambda: controller.state['pwm_value'] > 0)
+        controller.stop()
+        state = controller.state
+        assert not state['heater_on'] and not state['timer_running'] and state['duty'] == 0.0
+        assert not controller.control_loop.running
+        assert len(list(tmp_path.glob('*.fdlog'))) == 1
+    finally:
+        controller.close()
+
+def test_end_mode(tmp_path):
+    controller = DryerController(session_dir=str(tmp_path), tick_period=0.05, dryness_policy={'mode': 'end'})
+    try:
+        assert controller.state['end_mode'] == 'end'
+        controller.select_preset('Test', 60, 1)
+        controller.start()
+        assert controller.dryness is not None
+        assert wait_for(lambda: controller.state['dryness_status'] == 'Learning drying curve...')
+        controller.set_end_mode('off')
+        assert controller.dryness is None and controller.state['dryness_status'] == ''
+        try:
+            controller.set_end_mode('sometimes')
+            assert False
+        except ValueError:
+            pass
+        controller.stop()
+    finally:
+        controller.close()
+
+def test_energy_is_metered_per_cycle(tmp_path):
+    controller = DryerController(session_dir=str(tmp_path), tick_period=0.05, heater_watts=3600)
+    try:
+        controller.select_preset('Test', 60, 1)
+        controller.start()
+        assert wait_for(lambda: controller.state['power'] > 0)
+        assert wait_for(lambda: (controller.state['energy'].get('cycle_kwh') or 0) > 0)
+        controller.stop()
+        energy = controller.state['energy']
+        assert energy['cycle_kwh'] is None and energy['last_cycle_kwh'] > 0
+        assert controller.energy.preset_totals()['Test']['cycles'] == 1
+    finally:
+        controller.close()
+    assert (tmp_path / 'energy.json').exists()
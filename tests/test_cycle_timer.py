@@ -0,0 +1,80 @@
+import os
+from src.cycle_timer import CycleTimer, load_checkpoint, SLOT_SIZE
+from src.controller import DryerController
+
+class FakeClock:
+    def __init__(self, now=0.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+def test_remaining_follows_deadline_not_tick_count():
+    clock = FakeClock(100.0)
+    timer = CycleTimer(clock=clock)
+    timer.start(7200, 'PLA', 66, 120)
+    # A 5 s stall between ticks still costs exactly 5 s
+    clock.now += 0.4
+    assert timer.tick() == 7200
+    clock.now += 5.0
+    assert timer.tick() == 7195
+    clock.now += 7194.6
+    assert timer.tick() == 0
+    timer.stop()
+    assert timer.tick() is None and not timer.running
+
+def test_checkpoints_are_throttled_and_survive_a_torn_slot(tmp_path):
+    path = str(tmp_path / 'cycle.ckpt')
+    clock, wall = FakeClock(), FakeClock(1000.0)
+    timer = CycleTimer(path, checkpoint_interval=30, clock=clock, wall_clock=wall)
+    timer.start(3600, 'ABS', 59, 60)
+    seq = load_checkpoint(path).seq
+    for _ in range(29):
+        clock.now += 1
+        timer.tick()
+    assert load_checkpoint(path).seq == seq
+    clock.now += 1
+    timer.tick()
+    checkpoint = load_checkpoint(path)
+    assert checkpoint.seq == seq + 1 and checkpoint.running and checkpoint.remaining == 3570
+    timer.close()
+    checkpoint = load_checkpoint(path)
+    # Corrupt the newest slot: the previous one is used
+    with open(path, 'r+b') as file:
+        file.seek((checkpoint.seq % 2) * SLOT_SIZE + 20)
+        file.write(b'\xff\xff')
+    assert load_checkpoint(path).seq == checkpoint.seq - 1
+
+def test_restore_resumes_short_outage_and_aborts_long_one(tmp_path):
+    path = str(tmp_path / 'cycle.ckpt')
+    wall = FakeClock(1000.0)
+    timer = CycleTimer(path, wall_clock=wall)
+    timer.start(1800, 'PETG', 55, 75)
+    timer.close()
+    wall.now += 60
+    action, checkpoint, outage = CycleTimer(path, wall_clock=wall).restore(max_outage=600)
+    assert action == 'resume' and checkpoint.preset == 'PETG' and outage == 60
+    assert 1799 <= checkpoint.remaining <= 1800
+    wall.now += 3600
+    restarted = CycleTimer(path, wall_clock=wall)
+    assert restarted.restore(max_outage=600)[0] == 'abort'
+    restarted.close()
+    # The abort is recorded, so there is nothing left to resume
+    assert CycleTimer(path, wall_clock=wall).restore(max_outage=600)[0] is None
+
+def test_controller_resumes_interrupted_cycle(tmp_path):
+    controller = DryerController(session_dir=str(tmp_path), tick_period=0.05)
+    controller.select_preset('PC', 80, 120)
+    controller.start()
+    # Simulated power cut: the process goes away without stop()
+    controller.close()
+    resumed = DryerController(session_dir=str(tmp_path), tick_period=0.05)
+    try:
+        state = resumed.state
+        assert state['timer_running'] and state['preset'] == 'PC' and state['setpoint'] == 80
+        assert 7190 <= state['remaining_time'] <= 7200
+        assert state['cycle_notice'].startswith('Resumed PC cycle')
+        resumed.stop()
+    finally:
+        resumed.close()
+    assert not load_checkpoint(str(tmp_path / 'cycle.ckpt')).running
@@ -0,0 +1,13 @@
+from src.diagnostics_model import DiagnosticsModel
+
+
+def test_only_changed_cells_are_signalled(qtbot):
+    model = DiagnosticsModel(('Name', 'A', 'B'))
+    changed = []
+    model.dataChanged.connect(lambda top, bottom, roles: changed.append((top.row(), top.column())))
+    model.update({'x': (1.0, 'on'), 'y': (None, 2)})
+    assert model.rowCount() == 2 and changed == []
+    assert model.data(model.index(0, 1)) == '1.00'
+    assert model.data(model.index(1, 1)) == '--'
+    assert model.update({'x': (1.0, 'off'), 'y': (None, 2)}) == 1
+    assert changed == [(0, 2)]
@@ -0,0 +1,69 @@
+import math
+from src.dryness_estimator import (DrynessEstimator, absolute_humidity, end_decision, Estimate,
+                                   RATE_THRESHOLD, EXTEND_STEP)
+
+
+def feed(estimator, start, end, h_inf=8.0, excess=20.0, tau=40.0, temperature=60.0, step=1.0):
+    # Absolute humidity decaying with time constant tau (minutes), as %RH at temperature
+    per_percent = absolute_humidity(temperature, 1.0)
+    t = start
+    while t < end:
+        h = h_inf + excess * math.exp(-t / 60.0 / tau)
+        estimator.update(t, temperature, h / per_percent)
+        t += step
+
+
+def test_absolute_humidity():
+    assert abs(absolute_humidity(20.0, 100.0) - 17.3) < 0.1
+    assert abs(absolute_humidity(60.0, 10.0) - 13.0) < 0.2
+
+
+def test_fits_exponential_decay():
+    estimator = DrynessEstimator()
+    feed(estimator, 0, 1800)
+    estimate = estimator.estimate()
+    assert abs(estimate.tau - 40.0) < 2.0
+    assert abs(estimate.h_inf - 8.0) < 0.5
+    # Release rate now: excess * exp(-t / tau) / tau
+    expected = 20.0 * math.exp(-29.5 / 40.0) / 40.0
+    assert abs(estimate.rate - expected) < 0.02
+    predicted = 40.0 * math.log(expected / RATE_THRESHOLD) * 60.0
+    assert abs(estimate.time_to_dry - predicted) < 300
+    assert not estimate.dry
+
+
+def test_dry_once_release_levels_off():
+    estimator = DrynessEstimator()
+    feed(estimator, 0, 1800)
+    assert not estimator.estimate().dry
+    feed(estimator, 1800, 12000)
+    estimate = estimator.estimate()
+    assert estimate.dry and estimate.time_to_dry == 0.0
+    assert estimator.status().startswith('Filament dry')
+
+
+def test_warmup_and_gaps_are_ignored():
+    estimator = DrynessEstimator()
+    # Humidity rising while the chamber heats up
+    for t in range(0, 600):
+        estimator.update(float(t), 60.0, 5.0 + t / 100.0)
+    estimator.update(600.0, None, 10.0)
+    estimator.update(601.0, 60.0, float('nan'))
+    assert estimator.points == 0 and estimator.estimate() is None
+    assert estimator.status() == 'Learning drying curve...'
+
+
+def test_end_decision():
+    wet = Estimate(20.0, 8.0, 40.0, 0.2, 1800.0, False, 20)
+    dry = Estimate(8.1, 8.0, 40.0, 0.01, 0.0, True, 40)
+    assert end_decision(None, 'adaptive', 3000, 3600, 600, 0) is None
+    assert end_decision(dry, 'monitor', 3000, 3600, 600, 0) is None
+    assert end_decision(dry, 'end', 3000, 3600, 600, 0) == 0
+    # Not before min_fraction of the planned time
+    assert end_decision(dry, 'end', 600, 3600, 3000, 0) is None
+    assert end_decision(wet, 'end', 3600, 3600, 0, 0) is None
+    assert end_decision(wet, 'extend', 3600, 3600, 0, 0) == 1800
+    assert end_decision(wet, 'adaptive', 3600, 3600, 0, 3000) == 600
+    assert end_decision(wet, 'extend', 3600, 3600, 0, 3600) is None
+    soon = wet._replace(time_to_dry=10.0)
+    assert end_decision(soon, 'extend', 3600, 3600, 0, 0) == EXTEND_STEP
@@ -0,0 +1,75 @@
+import json
+from datetime import date
+from src.energy import EnergyMeter
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_integrates_duty_over_time(tmp_path):
+    clock = Clock()
+    meter = EnergyMeter(str(tmp_path / 'energy.json'), watts=200, price_per_kwh=0.5, clock=clock)
+    meter.start_cycle('PLA')
+    meter.update(50)
+    assert meter.power == 100
+    clock.now = 3600.0
+    meter.update(100)    # one hour at 100 W
+    clock.now = 5400.0
+    meter.update(0)      # half an hour at 200 W
+    clock.now = 9000.0
+    meter.update()       # an hour off
+    snapshot = meter.snapshot()
+    assert abs(snapshot['cycle_kwh'] - 0.2) < 1e-9
+    assert abs(snapshot['cycle_cost'] - 0.1) < 1e-9
+    assert abs(meter.today_kwh() - 0.2) < 1e-9
+    assert abs(meter.end_cycle() - 0.2) < 1e-9
+    assert meter.snapshot()['cycle_kwh'] is None
+    assert meter.preset_totals() == {'PLA': {'kwh': meter.total_kwh, 'cycles': 1}}
+
+
+def test_totals_persist_and_saves_are_throttled(tmp_path):
+    path = tmp_path / 'energy.json'
+    clock = Clock()
+    meter = EnergyMeter(str(path), watts=1000, clock=clock, save_interval=60, today=lambda: date(2024, 5, 1))
+    meter.start_cycle('PETG')
+    meter.update(100)
+    clock.now = 36.0
+    meter.update()
+    meter.save()
+    # Written at the cycle start only; the next write waits for the interval
+    assert json.loads(path.read_text())['cycle']['kwh'] == 0.0
+    clock.now = 72.0
+    meter.update()
+    meter.save()
+    assert abs(json.loads(path.read_text())['cycle']['kwh'] - 0.02) < 1e-9
+    meter.close()
+
+    # A restart resumes the open cycle instead of starting a new one
+    restored = EnergyMeter(str(path), watts=1000, clock=clock, today=lambda: date(2024, 5, 1))
+    assert abs(restored.total_kwh - 0.02) < 1e-9
+    assert restored.days == {'2024-05-01': restored.total_kwh}
+    restored.start_cycle('PETG')
+    assert restored.preset_totals()['PETG']['cycles'] == 1
+    assert abs(restored.end_cycle() - 0.02) < 1e-9
+
+
+def test_preset_change_mid_cycle(tmp_path):
+    clock = Clock()
+    meter = EnergyMeter(watts=3600, clock=clock)
+    meter.update(100)
+    clock.now = 1.0
+    meter.update()    # outside a cycle: total and day only
+    meter.start_cycle('PLA')
+    clock.now = 2.0
+    meter.change_preset('ABS')
+    clock.now = 4.0
+    meter.update()
+    totals = meter.preset_totals()
+    assert abs(totals['PLA']['kwh'] - 0.001) < 1e-9
+    assert abs(totals['ABS']['kwh'] - 0.002) < 1e-9 and totals['ABS']['cycles'] == 0
+    assert abs(meter.total_kwh - 0.004) < 1e-9
@@ -0,0 +1,70 @@
+import os
+import csv
+import numpy as np
+import pytest
+from src.session_log import SessionRecorder
+from src.exporter import (export_session, export_sessions, iter_npz_chunks, parquet_available,
+                          ExportError, EXPORT_COLUMNS)
+from src.export_sessions import main
+
+
+def record(path, count=1000, start=1000.0):
+    rec = SessionRecorder(str(path), start_time=start, preset='PETG', batch_size=64)
+    for i in range(count):
+        rec.append(start + i * 0.1, 60.0 + (i % 7) * 0.25, float('nan') if i == 3 else 20.0, i % 256, 65.0)
+    rec.close()
+    return str(path)
+
+
+def test_csv_export_streams_every_record(tmp_path):
+    session = record(tmp_path / 'session-1.fdlog')
+    path = export_session(session, str(tmp_path / 'out'), 'csv', chunk_size=64)
+    assert path.endswith('session-1.csv')
+    with open(path) as file:
+        rows = list(csv.reader(file))
+    assert tuple(rows[0]) == EXPORT_COLUMNS
+    assert len(rows) == 1001
+    assert rows[1] == ['1000.000', '60.00', '20.0', '0', '65.0']
+    assert rows[4][2] == 'nan'
+    assert float(rows[-1][0]) == pytest.approx(1099.9)
+    assert os.listdir(tmp_path / 'out') == ['session-1.csv']
+
+
+def test_npz_export_round_trip_and_time_window(tmp_path):
+    session = record(tmp_path / 'session-1.fdlog')
+    path = export_session(session, str(tmp_path), 'npz', chunk_size=300, since=1010.0, until=1050.0)
+    chunks = list(iter_npz_chunks(path))
+    assert [len(chunk) for chunk in chunks] == [200, 200]
+    data = np.concatenate(chunks)
+    assert data.dtype.names == EXPORT_COLUMNS
+    assert data['timestamp'][0] == pytest.approx(1010.0) and data['timestamp'][-1] < 1050.0
+    assert np.all(data['setpoint'] == 65.0)
+
+
+def test_parquet_needs_pyarrow(tmp_path):
+    session = record(tmp_path / 'session-1.fdlog', count=10)
+    if parquet_available():
+        import pyarrow.parquet as pq
+        path = export_session(session, str(tmp_path), 'parquet', chunk_size=4)
+        table = pq.read_table(path)
+        assert table.num_rows == 10 and pq.ParquetFile(path).num_row_groups == 3
+    else:
+        with pytest.raises(ExportError):
+            export_session(session, str(tmp_path), 'parquet')
+        assert not [name for name in os.listdir(tmp_path) if name.startswith('.export-')]
+
+
+def test_export_sessions_skips_current_exports(tmp_path, capsys):
+    sessions = tmp_path / 'sessions'
+    sessions.mkdir()
+    record(sessions / 'session-1.fdlog', count=10)
+    record(sessions / 'session-2.fdlog', count=10)
+    (sessions / 'session-3.fdlog').write_bytes(b'not a log')
+    out = str(tmp_path / 'out')
+    written, errors = export_sessions(sorted(map(str, sessions.iterdir())), out)
+    assert len(written) == 2 and len(errors) == 1
+    assert main(['--session-dir', str(sessions), '--out', out]) == 1
+    assert 'Exported' not in capsys.readouterr().out
+    os.remove(sessions / 'session-3.fdlog')
+    assert main(['--session-dir', str(sessions), '--out', out, '--format', 'npz']) == 0
+    assert sorted(os.listdir(out)) == ['session-1.csv', 'session-1.npz', 'session-2.csv', 'session-2.npz']
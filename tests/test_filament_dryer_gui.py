@@ -7,3 +7,15 @@ def test_gui_initializes(qtbot):
     assert gui.status_label.text().startswith("Temperature:")
     assert gui.time_label.text() == "" or ":" in gui.time_label.text()
     assert gui.led_label.isVisible()
+
+def test_secondary_tabs_are_built_on_first_show(qtbot):
+    gui = FilamentDryerGUI()
+    qtbot.addWidget(gui)
+    assert not gui.settings_tab.built and not gui.debugging_tab.built
+    gui.show()
+    gui.tabs.setCurrentWidget(gui.settings_tab)
+    qtbot.waitUntil(lambda: gui.settings_tab.built)
+    assert not gui.debugging_tab.built
+    # The settings page is wired to the main page once it exists
+    gui.settings_page.pid_changed.emit({'P': 1.0, 'I': 0.0, 'D': 0.0})
+    assert gui.main_page.controller.state['pid_gains'] == {'P': 1.0, 'I': 0.0, 'D': 0.0}
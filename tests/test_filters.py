@@ -0,0 +1,52 @@
+import numpy as np
+from src.filters import SensorPipeline, hampel, first_order, Kalman1D
+
+def noisy_ramp(n=4000, seed=1):
+    rng = np.random.default_rng(seed)
+    truth = 25 + np.linspace(0, 30, n)
+    raw = truth + rng.normal(0, 0.3, n)
+    spikes = rng.random(n) < 0.01
+    raw[spikes] += 40
+    return truth, raw, spikes
+
+def test_first_order_matches_sample_by_sample_recursion():
+    rng = np.random.default_rng(2)
+    x = rng.normal(size=300)
+    gains = rng.uniform(0.01, 0.99, 300)
+    expected, y = [], 1.5
+    for xi, gi in zip(x, gains):
+        y += gi * (xi - y)
+        expected.append(y)
+    assert np.allclose(first_order(x, gains, 1.5), expected)
+    # Gains close to 1 must not overflow the closed form
+    assert np.isclose(first_order(np.ones(500), 0.9999999, 0.0)[-1], 1.0)
+
+def test_hampel_removes_spikes_and_keeps_steps():
+    values = np.array([20.0] * 10 + [60.0] + [20.0] * 10 + [25.0] * 10)
+    cleaned, mask = hampel(values, window=7, min_deviation=0.5)
+    assert mask[10] and cleaned[10] == 20.0
+    assert cleaned[-1] == 25.0
+
+def test_blocks_give_the_same_result_as_the_whole_stream():
+    truth, raw, spikes = noisy_ramp()
+    raw[7] = np.nan
+    whole = SensorPipeline(oversample=8, smoothing='kalman', min_deviation=0.5)
+    blocks = SensorPipeline(oversample=8, smoothing='kalman', min_deviation=0.5)
+    expected = whole.process(raw)
+    result = np.concatenate([blocks.process(raw[i:i + 13]) for i in range(0, len(raw), 13)])
+    assert len(result) == len(raw) // 8
+    assert np.allclose(result, expected)
+    assert whole.rejected >= spikes.sum()
+    # Spikes of +40 °C are gone; what is left is noise and filter lag
+    assert np.abs(result - truth.reshape(-1, 8).mean(axis=1)).max() < 1.0
+
+def test_kalman_gain_settles_and_smooths_noise():
+    rng = np.random.default_rng(3)
+    kalman = Kalman1D(process_variance=1e-4, measurement_variance=0.1)
+    out = kalman(50 + rng.normal(0, 0.3, 2000))
+    assert np.std(out[500:]) < 0.1
+    first, later = kalman.gains(1)[0], kalman.gains(1)[0]
+    assert np.isclose(first, later)
+
+def test_all_nan_block_publishes_nothing():
+    assert len(SensorPipeline().process([np.nan, np.nan])) == 0
@@ -0,0 +1,43 @@
+import numpy as np
+from src.history import TieredHistory, lttb, minmax_decimate
+
+def test_lttb_keeps_endpoints_and_peaks():
+    x = np.arange(1000.0)
+    y = np.sin(x / 50.0)
+    y[537] = 10.0
+    idx = lttb(x, y, 100)
+    assert len(idx) == 100
+    assert idx[0] == 0 and idx[-1] == 999
+    assert np.all(np.diff(idx) > 0)
+    assert 537 in idx
+
+def test_lttb_passthrough_when_small():
+    x = np.arange(5.0)
+    assert lttb(x, x, 10).tolist() == [0, 1, 2, 3, 4]
+
+def test_minmax_decimate_keeps_extremes():
+    y = np.zeros(1000)
+    y[10], y[900] = -5, 5
+    idx = minmax_decimate(y, 50)
+    assert len(idx) == 50
+    assert 10 in idx and 900 in idx
+
+def test_tiers_aggregate_bucket_means():
+    history = TieredHistory(tiers=((1, 100), (10, 10)))
+    for t in range(35):
+        history.append(float(t), float(t), 50.0, 0.0)
+    coarse = history.tiers[1].buffer
+    assert len(history) == 35
+    # Buckets 0-9, 10-19 and 20-29 are complete; 30-34 is still being filled
+    assert coarse.view('temperature').tolist() == [4.5, 14.5, 24.5]
+
+def test_window_picks_tier_and_limits_points():
+    history = TieredHistory(tiers=((1, 600), (10, 600)))
+    for t in range(3000):
+        history.append(float(t), 20 + (t % 7), 40.0, 0.0)
+    x, y = history.window('temperature', 300, 500)
+    # Fits the full-rate tier without decimation
+    assert x[0] == 2699 and x[-1] == 2999
+    x, y = history.window('temperature', 2400, 100)
+    assert history.tier_for(2400, 100) is history.tiers[1]
+    assert len(x) <= 100
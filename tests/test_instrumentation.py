@@ -0,0 +1,50 @@
+import json
+import time
+from PyQt5.QtCore import QTimer
+from src import instrumentation
+from src.instrumentation import LatencyHistogram, _bucket_index, _bucket_value
+
+
+def test_buckets_are_contiguous_and_within_resolution():
+    previous = -1
+    for value in list(range(0, 5000)) + [10**6, 10**8, 2**31]:
+        index = _bucket_index(value)
+        assert index >= previous
+        previous = index
+        low, high = _bucket_value(index), _bucket_value(index + 1)
+        assert low <= value < high
+        assert high - low <= max(1, value / 16)
+
+
+def test_percentiles():
+    histogram = LatencyHistogram()
+    for ms in range(1, 101):
+        histogram.record(ms / 1000.0)
+    assert histogram.count == 100
+    assert abs(histogram.percentile(50) - 0.050) < 0.050 * 0.07
+    assert abs(histogram.percentile(99) - 0.099) < 0.099 * 0.07
+    assert histogram.max == 0.1
+
+
+def test_instrument_records_calls():
+    wrapped = instrumentation.instrument('test.handler', lambda x: x * 2)
+    assert wrapped(21) == 42
+    assert instrumentation.probe('test.handler').exec_time.count == 1
+
+
+def test_timer_lateness_and_watchdog_stall(qtbot, tmp_path):
+    timer = QTimer()
+    calls = []
+    instrumentation.connect_timer(timer, 'test.timer', lambda: calls.append(1))
+    watchdog = instrumentation.EventLoopWatchdog(interval_ms=10, threshold=0.05)
+    timer.start(10)
+    qtbot.waitUntil(lambda: len(calls) >= 3)
+    # Block the event loop
+    QTimer.singleShot(0, lambda: time.sleep(0.15))
+    qtbot.waitUntil(lambda: watchdog.stalls >= 1, timeout=2000)
+    timer.stop()
+    watchdog.stop()
+    assert instrumentation.probe('test.timer').lateness.count >= 2
+    assert instrumentation.probe('event loop').lateness.max >= 0.1
+    data = json.load(open(instrumentation.dump(str(tmp_path / 'report.json'))))
+    assert data['probes']['test.timer']['exec_time']['count'] == len(calls)
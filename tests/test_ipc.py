@@ -0,0 +1,61 @@
+import time
+import socket
+import pytest
+from src.ipc import encode, decode, send_message, recv_message, ControlServer, RemoteController
+from src.controller import DryerController
+
+def wait_for(predicate, timeout=3.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+def test_codec_round_trip():
+    message = {'id': 3, 'ok': True, 'result': {'temperature': 61.25, 'heater_on': False, 'autotune_gains': None,
+                                              'preset': 'PETG ✓', 'values': [1, -2, 3.5], 'big': 2 ** 40}}
+    assert decode(encode(message)) == message
+    # Tuples travel as lists
+    assert decode(encode((1, 2))) == [1, 2]
+    with pytest.raises(TypeError):
+        encode(object())
+    with pytest.raises(ValueError):
+        decode(encode('abc') + b'x')
+
+def test_framing_over_socket_pair():
+    a, b = socket.socketpair()
+    with a, b:
+        send_message(a, {'delta': {'temperature': 50.0}})
+        send_message(a, [1, 2, 3])
+        assert recv_message(b) == {'delta': {'temperature': 50.0}}
+        assert recv_message(b) == [1, 2, 3]
+
+def test_remote_controller_mirrors_daemon(tmp_path):
+    controller = DryerController(session_dir=str(tmp_path / 'sessions'), tick_period=0.05)
+    server = ControlServer(controller, str(tmp_path / 'dryer.sock'))
+    server.start()
+    remote = None
+    try:
+        remote = RemoteController(server.path)
+        assert remote.state['connected'] and remote.state['preset'] == 'PLA'
+        deltas = []
+        remote.subscribe(deltas.append)
+        remote.select_preset('PC', 80, 120)
+        assert controller.state['setpoint'] == 80
+        assert wait_for(lambda: remote.state['setpoint'] == 80)
+        assert any(d.get('preset') == 'PC' for d in deltas)
+        assert wait_for(lambda: remote.state['temperature'] is not None)
+        with pytest.raises(RuntimeError):
+            remote._call('close')
+        remote.start()
+        assert wait_for(lambda: remote.state['heater_on'])
+        remote.close()
+        # The daemon keeps the heater running without its GUI
+        time.sleep(0.1)
+        assert controller.control_loop.running
+    finally:
+        if remote is not None:
+            remote.close()
+        server.stop()
+        controller.close()
@@ -0,0 +1,83 @@
+import io
+import json
+import time
+from src.material_library import (MaterialLibrary, Profile, iter_records, iter_profiles,
+                                  profile_from_record)
+
+
+def sample_library(count=5000):
+    brands = ['Prusament', 'Polymaker', 'eSun', 'Sunlu', 'Overture']
+    materials = ['PLA', 'PETG', 'ABS', 'ASA', 'TPU']
+    return MaterialLibrary(
+        Profile(f'{brands[i % 5]} {materials[i % 5]} Colour {i}', brands[i % 5], materials[i % 5], 50.0, 240)
+        for i in range(count))
+
+
+def test_iter_records_streams_array_in_small_chunks():
+    records = [{'name': f'spool {i}', 'nested': {'a': [1, 2, {'b': '},]'}]}} for i in range(50)]
+    text = json.dumps(records, indent=2)
+    assert list(iter_records(io.StringIO(text), chunk_size=7)) == records
+
+
+def test_iter_records_reads_json_lines():
+    lines = '\n'.join(json.dumps({'name': str(i)}) for i in range(10)) + '\n'
+    assert [r['name'] for r in iter_records(io.StringIO(lines), chunk_size=5)] == [str(i) for i in range(10)]
+
+
+def test_profile_from_record_uses_material_defaults():
+    profile = profile_from_record({'name': 'Galaxy Black', 'manufacturer': 'Prusament', 'material': 'petg'})
+    assert profile.brand == 'Prusament' and profile.material == 'PETG'
+    assert profile.drying_time > 0
+    assert profile_from_record({'name': 'Mystery', 'material': 'unobtainium'}) is None
+
+
+def test_iter_profiles_skips_unusable_records(tmp_path):
+    file = tmp_path / 'spools.json'
+    file.write_text(json.dumps([
+        {'name': 'A', 'material': 'PLA', 'drying_temperature': 45, 'drying_time': 240},
+        {'material': 'PLA'},
+        'not an object',
+    ]))
+    assert [p.name for p in iter_profiles(str(file))] == ['A']
+
+
+def test_search_prefix_and_substring():
+    library = MaterialLibrary([
+        Profile('Galaxy Black', 'Prusament', 'PETG', 70, 240),
+        Profile('Jet Black', 'Prusament', 'PLA', 50, 240),
+        Profile('PolyTerra Charcoal', 'Polymaker', 'PLA', 50, 240),
+    ])
+    assert [p.name for p in library.search('')] == ['Galaxy Black', 'Jet Black', 'PolyTerra Charcoal']
+    assert [p.name for p in library.search('po')] == ['PolyTerra Charcoal']
+    assert [p.name for p in library.search('black pla')] == ['Jet Black']
+    assert [p.name for p in library.search('rusa')] == ['Galaxy Black', 'Jet Black']
+    assert library.search('nylon') == []
+
+
+def test_typeahead_narrowing_matches_fresh_search():
+    library = sample_library(500)
+    for query in ('pol', 'poly', 'polym', 'polymaker 1', 'polymaker 12'):
+        narrowed = library.search(query)
+        fresh = MaterialLibrary(library.profiles).search(query)
+        assert narrowed == fresh
+
+
+def test_search_is_fast_on_thousands_of_profiles():
+    library = sample_library(5000)
+    start = time.perf_counter()
+    for query in ('p', 'pr', 'pru', 'prus', 'prusa', 'prusament petg', 'colour 42'):
+        library.search(query)
+    # Well under one 16 ms frame per keystroke
+    assert (time.perf_counter() - start) / 7 < 0.016
+
+
+def test_list_model_filters_and_appends(qtbot):
+    from src.material_model import MaterialListModel, ProfileRole
+    model = MaterialListModel(sample_library(20))
+    assert model.rowCount() == 20
+    model.add_profiles([Profile('Extra', 'Sunlu', 'PLA', 50, 240)])
+    assert model.rowCount() == 21
+    model.set_filter('sunlu')
+    assert model.rowCount() == 5
+    assert model.data(model.index(4), ProfileRole).name == 'Extra'
+    assert 'Sunlu' in model.data(model.index(0))
@@ -0,0 +1,50 @@
+import time
+from src.pid import PIDController, ControlLoop
+
+def simulate(pid, steps=600, dt=1.0, temperature=25.0):
+    # Crude first-order chamber: heats with duty, loses heat to a 25 °C room
+    peak = temperature
+    for _ in range(steps):
+        duty = pid.update(temperature, dt)
+        temperature += duty / 100 * 0.8 - (temperature - 25.0) * 0.01
+        peak = max(peak, temperature)
+    return temperature, peak
+
+def test_output_is_clamped():
+    pid = PIDController(100.0, 0.0, 0.0, setpoint=60.0)
+    assert pid.update(20.0, 1.0) == 100.0
+    assert pid.update(90.0, 1.0) == 0.0
+
+def test_reaches_setpoint_without_integral_windup():
+    pid = PIDController(5.0, 0.05, 10.0, setpoint=60.0)
+    final, peak = simulate(pid)
+    assert abs(final - 60.0) < 0.5
+    # The heater saturates for most of the climb; windup would overshoot badly
+    assert peak < 63.0
+
+def test_derivative_acts_on_measurement_only():
+    pid = PIDController(0.0, 0.0, 10.0, setpoint=50.0, output_min=-100.0)
+    pid.update(40.0, 1.0)
+    pid.setpoint = 70.0
+    # Constant measurement: a setpoint jump must not produce a derivative kick
+    assert pid.update(40.0, 1.0) == 0.0
+
+def test_gain_change_is_bumpless():
+    pid = PIDController(5.0, 0.05, 0.0, setpoint=60.0)
+    for _ in range(50):
+        before = pid.update(55.0, 1.0)
+    pid.set_gains(2.0, 0.2, 0.0)
+    after = pid.update(55.0, 1e-9)
+    assert abs(after - before) < 1e-3
+
+def test_control_loop_runs_on_thread_and_records_stats():
+    outputs = []
+    pid = PIDController(1.0, 0.0, 0.0, setpoint=30.0)
+    loop = ControlLoop(pid, lambda: 25.0, outputs.append, period=0.01)
+    loop.start()
+    time.sleep(0.2)
+    loop.stop()
+    assert outputs[-1] == 0.0  # stopping forces the heater off
+    assert 5.0 in outputs
+    assert loop.stats.iterations >= 5
+    assert loop.stats.exec_max >= 0.0
@@ -0,0 +1,54 @@
+from src.preset_diff import diff_presets, reconcile, snapshot_presets
+from src.main_page import MainPage
+from src.settings_page import SettingsPage
+
+def test_diff_presets():
+    old = {'PLA': {'temperature': 50}, 'ABS': {'temperature': 80}, 'PC': {'temperature': 110}}
+    new = {'PLA': {'temperature': 50}, 'ABS': {'temperature': 85}, 'TPU': {'temperature': 45}}
+    diff = diff_presets(old, new)
+    assert diff.added == ['TPU'] and diff.removed == ['PC'] and diff.changed == ['ABS']
+
+def test_reconcile_touches_only_changed_entries():
+    presets = {'PLA': {'temperature': 50}, 'ABS': {'temperature': 80}}
+    widgets = {}
+    calls = []
+    def create(name, data):
+        calls.append(('create', name))
+        return [name, data['temperature']]
+    def update(name, widget, data):
+        calls.append(('update', name))
+        widget[1] = data['temperature']
+    shown = snapshot_presets(presets)
+    reconcile(widgets, {}, presets, create, update)
+    pla = widgets['PLA']
+    presets['ABS']['temperature'] = 85  # edited in place, as SettingsPage does
+    presets['PETG'] = {'temperature': 70}
+    calls.clear()
+    reconcile(widgets, shown, presets, create, update, destroy=lambda name, w: calls.append(('destroy', name)))
+    assert calls == [('update', 'ABS'), ('create', 'PETG')]
+    assert widgets['PLA'] is pla and widgets['ABS'][1] == 85
+
+def test_main_page_keeps_buttons_and_checked_state(qtbot):
+    page = MainPage()
+    qtbot.addWidget(page)
+    page.change_preset('ABS')
+    abs_button = page.preset_buttons['ABS']
+    presets = dict(page.presets)
+    del presets['PC']
+    presets['TPU'] = {'temperature': 45, 'drying_time': 80}
+    page.update_presets(presets)
+    assert page.preset_buttons['ABS'] is abs_button and abs_button.isChecked()
+    assert list(page.preset_buttons) == ['PLA', 'ABS', 'PETG', 'TPU']
+    assert page.preset_layout.indexOf(page.preset_buttons['TPU']) == 4
+
+def test_settings_grid_updates_rows_in_place(qtbot, tmp_path):
+    page = SettingsPage(presets_file=str(tmp_path / 'presets.json'))
+    qtbot.addWidget(page)
+    pla_label, pla_button = page.preset_rows['PLA']
+    page.presets['PLA']['temperature'] = 40
+    page.presets['AAA'] = {'temperature': 45, 'drying_time': 30}
+    page.refresh_presets_grid()
+    assert page.preset_rows['PLA'] == (pla_label, pla_button)
+    assert pla_button.text() == '40°C, 60 min'
+    # 'AAA' sorts first, so it takes the top-left cell
+    assert page.grid_layout.itemAtPosition(0, 0).widget() is page.preset_labels['AAA']
@@ -0,0 +1,94 @@
+import os
+import json
+import threading
+import pytest
+from src.preset_repository import PresetRepository, PresetError, validate_presets, DEFAULT_PRESETS
+
+
+def write(path, data):
+    path.write_text(json.dumps(data))
+
+
+def test_missing_file_gives_defaults(tmp_path):
+    repo = PresetRepository(str(tmp_path / 'presets.json'))
+    assert repo.presets == DEFAULT_PRESETS
+
+
+def test_loads_and_migrates_old_format(tmp_path):
+    file = tmp_path / 'presets.json'
+    write(file, {'PLA': '34°C', 'ABS': {'temperature': 69, 'drying_time': 120}})
+    repo = PresetRepository(str(file))
+    assert repo.presets == {'PLA': {'temperature': 34, 'drying_time': 60},
+                            'ABS': {'temperature': 69, 'drying_time': 120}}
+
+
+def test_invalid_file_falls_back_to_defaults(tmp_path):
+    file = tmp_path / 'presets.json'
+    file.write_text('{"PLA": {"temperature": ')
+    assert PresetRepository(str(file)).presets == DEFAULT_PRESETS
+
+
+def test_validate_rejects_bad_presets():
+    with pytest.raises(PresetError):
+        validate_presets({})
+    with pytest.raises(PresetError):
+        validate_presets({'PLA': {'temperature': 'hot', 'drying_time': 60}})
+    with pytest.raises(PresetError):
+        validate_presets({'PLA': {'temperature': 500, 'drying_time': 60}})
+    with pytest.raises(PresetError):
+        validate_presets({'PLA': {'temperature': 50, 'drying_time': 0}})
+
+
+def test_presets_are_cached_copies(tmp_path):
+    repo = PresetRepository(str(tmp_path / 'presets.json'))
+    presets = repo.presets
+    presets['PLA']['temperature'] = 1
+    assert repo.presets['PLA']['temperature'] == DEFAULT_PRESETS['PLA']['temperature']
+
+
+def test_save_is_atomic_and_notifies(tmp_path):
+    file = tmp_path / 'presets.json'
+    repo = PresetRepository(str(file))
+    seen = []
+    repo.subscribe(seen.append)
+    repo.save({'PETG': {'temperature': 55, 'drying_time': 90}})
+    assert json.loads(file.read_text()) == {'PETG': {'temperature': 55, 'drying_time': 90}}
+    assert seen == [{'PETG': {'temperature': 55, 'drying_time': 90}}]
+    # No temp files left next to it
+    assert sorted(os.listdir(tmp_path)) == ['presets.json', 'presets.json.lock']
+    with pytest.raises(PresetError):
+        repo.save({'PETG': {'temperature': -5, 'drying_time': 90}})
+    assert json.loads(file.read_text())['PETG']['temperature'] == 55
+
+
+def test_external_change_is_picked_up(tmp_path):
+    file = tmp_path / 'presets.json'
+    write(file, {'PLA': {'temperature': 50, 'drying_time': 60}})
+    repo = PresetRepository(str(file))
+    assert repo.presets['PLA']['temperature'] == 50
+    seen = []
+    repo.subscribe(seen.append)
+    assert not repo.check_for_changes()
+    other = PresetRepository(str(file))
+    other.save({'PLA': {'temperature': 52, 'drying_time': 60}})
+    assert repo.check_for_changes()
+    assert seen[-1]['PLA']['temperature'] == 52
+    assert repo.presets['PLA']['temperature'] == 52
+
+
+def test_concurrent_modify_loses_no_updates(tmp_path):
+    file = tmp_path / 'presets.json'
+    write(file, {'PLA': {'temperature': 50, 'drying_time': 60}})
+
+    def writer(n):
+        # Separate instances, as separate processes would have
+        repo = PresetRepository(str(file))
+        for i in range(10):
+            repo.modify(lambda presets: presets.__setitem__(f'W{n}-{i}', {'temperature': 40, 'drying_time': 30}))
+
+    threads = [threading.Thread(target=writer, args=(n,)) for n in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(json.loads(file.read_text())) == 1 + 4 * 10
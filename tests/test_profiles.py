@@ -0,0 +1,71 @@
+import time
+import pytest
+from src.profiles import ProfileRunner, ProfileError, validate_segments
+from src.preset_repository import validate_presets, PresetError
+from src.controller import DryerController
+
+SEGMENTS = [{'ramp_rate': 2, 'temperature': 60, 'soak_time': 2},
+            {'temperature': 70, 'soak_time': 1, 'exit_humidity': 5},
+            {'cooldown': True, 'temperature': 40}]
+
+def test_validation_normalises_and_presets_derive_summary():
+    segments = validate_segments(SEGMENTS, 120)
+    assert segments[0] == {'temperature': 60, 'ramp_rate': 2, 'tolerance': 2, 'soak_time': 2}
+    assert segments[2]['cooldown'] and 'soak_time' not in segments[2]
+    with pytest.raises(ProfileError):
+        validate_segments([{'temperature': 60}], 120)
+    with pytest.raises(ProfileError):
+        validate_segments([{'cooldown': True, 'temperature': 40}], 120)
+    presets = validate_presets({'Nylon': {'segments': SEGMENTS}})
+    assert presets['Nylon']['temperature'] == 70 and presets['Nylon']['drying_time'] == 3
+    with pytest.raises(PresetError):
+        validate_presets({'Bad': {'segments': [{'temperature': 500, 'soak_time': 1}]}})
+
+def test_ramp_interpolates_and_soak_counts_only_in_band():
+    runner = ProfileRunner(validate_segments(SEGMENTS, 120))
+    runner.start(0, 20.0)
+    assert runner.setpoint == 20.0
+    assert runner.update(60, 22.0) == 22.0  # 2 °C/min
+    assert runner.update(600, 40.0) == 40.0 and runner.phase == 'ramp'
+    assert runner.update(1200, 55.0) == 60 and runner.phase == 'soak'
+    # Below the band: the soak has not started
+    runner.update(1300, 55.0)
+    assert runner.soak_elapsed == 0 and runner.remaining() == 180
+    runner.update(1400, 59.0)
+    assert runner.soak_elapsed == 100
+    runner.update(1420, 59.5)
+    assert runner.index == 1 and runner.setpoint == 60
+    # Stage 2 steps straight to 70 and exits early on dry air
+    assert runner.update(1421, 69.0, humidity=20) == 70
+    runner.update(1422, 69.5, humidity=4)
+    assert runner.phase == 'cooldown' and runner.remaining() == 0
+    runner.update(1423, 45.0)
+    assert not runner.done
+    runner.update(1424, 41.0)
+    assert runner.done
+
+def test_seek_resumes_inside_the_right_stage():
+    runner = ProfileRunner(validate_segments(SEGMENTS, 120))
+    runner.seek(150)
+    assert runner.index == 0 and runner.soak_elapsed == 30
+    runner.seek(60)
+    assert runner.index == 1 and runner.soak_elapsed == 0
+    runner.seek(0)
+    assert runner.segment['cooldown']
+
+def test_controller_runs_profile_until_done(tmp_path):
+    controller = DryerController(session_dir=str(tmp_path), tick_period=0.05)
+    segments = validate_segments([{'temperature': 25, 'soak_time': 0.02, 'tolerance': 10}], 120)
+    try:
+        controller.select_preset('Short', 25, 1, segments)
+        assert controller.state['remaining_time'] == 1
+        controller.start()
+        deadline = time.monotonic() + 5
+        statuses = set()
+        while controller.state['timer_running'] and time.monotonic() < deadline:
+            statuses.add(controller.state['profile_status'])
+            time.sleep(0.02)
+        assert not controller.state['timer_running']
+        assert any('soaking at 25°C' in status for status in statuses)
+    finally:
+        controller.close()
@@ -0,0 +1,39 @@
+import numpy as np
+import pytest
+from src.ring_buffer import SampleRingBuffer
+
+def test_append_wraps_and_keeps_order():
+    buf = SampleRingBuffer(3)
+    for i in range(5):
+        buf.append(i, 20 + i, 40 - i, i * 10)
+    assert len(buf) == 3
+    assert buf.total == 5
+    assert buf.view('timestamp').tolist() == [2, 3, 4]
+    assert buf.view('temperature').tolist() == [22, 23, 24]
+    assert buf.x().tolist() == [0, 1, 2]
+    assert buf.latest('pwm') == 40
+
+def test_view_is_contiguous_without_copy():
+    buf = SampleRingBuffer(4)
+    for i in range(6):
+        buf.append(i, i, i, i)
+    view = buf.view('humidity')
+    assert view.flags['C_CONTIGUOUS']
+    assert np.shares_memory(view, buf._data)
+    with pytest.raises(ValueError):
+        view[0] = 1.0
+
+def test_extend_matches_append():
+    a = SampleRingBuffer(5)
+    b = SampleRingBuffer(5)
+    block = np.vstack([np.arange(8.0)] * 4)
+    for column in block.T:
+        a.append(*column)
+    b.append(*block[:, 0])
+    b.extend(block[:, 1:])
+    assert a.view('timestamp').tolist() == b.view('timestamp').tolist() == [3, 4, 5, 6, 7]
+
+def test_wrong_arity_rejected():
+    buf = SampleRingBuffer(2)
+    with pytest.raises(ValueError):
+        buf.append(1, 2)
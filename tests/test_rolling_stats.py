@@ -0,0 +1,42 @@
+import math
+import random
+import statistics
+import numpy as np
+from src.rolling_stats import RollingStats
+
+
+def test_empty_and_single_sample():
+    stats = RollingStats(window=10)
+    assert stats.mean is None and stats.min is None and stats.slope is None
+    stats.add(0, 5.0)
+    assert (stats.min, stats.max, stats.mean) == (5.0, 5.0, 5.0)
+    assert stats.stddev is None
+
+
+def test_matches_full_recompute_over_window():
+    random.seed(1)
+    stats = RollingStats(window=60)
+    samples = []
+    for i in range(1000):
+        t = 1_700_000_000 + i
+        value = 50 + 0.05 * i + random.gauss(0, 1)
+        stats.add(t, value)
+        samples.append((t, value))
+    window = [(t, v) for t, v in samples if t >= samples[-1][0] - 60]
+    values = [v for _, v in window]
+    assert len(stats) == len(window)
+    assert stats.min == min(values) and stats.max == max(values)
+    assert math.isclose(stats.mean, statistics.mean(values), rel_tol=1e-9)
+    assert math.isclose(stats.stddev, statistics.stdev(values), rel_tol=1e-6)
+    slope = np.polyfit([t for t, _ in window], values, 1)[0]
+    assert math.isclose(stats.slope, slope, rel_tol=1e-6)
+
+
+def test_nan_is_ignored_and_window_expires():
+    stats = RollingStats(window=5)
+    stats.add(0, 1.0)
+    stats.add(1, float('nan'))
+    stats.add(2, None)
+    assert len(stats) == 1
+    stats.add(100, 3.0)
+    assert len(stats) == 1 and stats.min == 3.0
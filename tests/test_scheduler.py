@@ -0,0 +1,57 @@
+import time
+import threading
+from src.scheduler import PeriodicScheduler
+
+def test_runs_tasks_periodically_on_shared_workers():
+    scheduler = PeriodicScheduler(workers=2)
+    counts = {'a': 0, 'b': 0}
+
+    def bump(key):
+        counts[key] += 1
+    try:
+        a = scheduler.add('a', lambda: bump('a'), 0.02)
+        scheduler.add('b', lambda: bump('b'), 0.05)
+        time.sleep(0.5)
+        assert 15 <= counts['a'] <= 30
+        assert 6 <= counts['b'] <= 12
+        assert a.stats.overruns == 0
+        assert {task.name for task in scheduler.tasks()} == {'a', 'b'}
+    finally:
+        scheduler.shutdown()
+
+def test_slow_task_never_overlaps_itself():
+    scheduler = PeriodicScheduler(workers=4)
+    active = []
+    overlaps = []
+
+    def slow():
+        active.append(1)
+        if len(active) > 1:
+            overlaps.append(1)
+        time.sleep(0.05)
+        active.pop()
+    try:
+        task = scheduler.add('slow', slow, 0.01)
+        time.sleep(0.3)
+        assert not overlaps
+        assert task.stats.overruns > 0
+    finally:
+        scheduler.shutdown()
+
+def test_cancel_waits_for_run_in_progress():
+    scheduler = PeriodicScheduler()
+    started = threading.Event()
+    finished = []
+
+    def work():
+        started.set()
+        time.sleep(0.1)
+        finished.append(1)
+    try:
+        task = scheduler.add('work', work, 1.0)
+        assert started.wait(1.0)
+        task.cancel()
+        assert finished == [1]
+        assert scheduler.tasks() == []
+    finally:
+        scheduler.shutdown()
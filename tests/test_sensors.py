@@ -0,0 +1,89 @@
+import time
+from src.sensors import SensorHub, DS18B20, parse_w1_slave, discover_ds18b20, discover_humidity
+
+GOOD = '72 01 4b 46 7f ff 0e 10 57 : crc=57 YES\n72 01 4b 46 7f ff 0e 10 57 t={}\n'
+BAD_CRC = '72 01 4b 46 7f ff 0e 10 57 : crc=00 NO\n72 01 4b 46 7f ff 0e 10 57 t=23125\n'
+
+def write(path, text):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text)
+
+def fake_sysfs(root):
+    w1 = root / 'w1'
+    write(w1 / '28-000000000001' / 'w1_slave', GOOD.format(23125))
+    write(w1 / '28-000000000002' / 'w1_slave', GOOD.format(24875))
+    write(w1 / '28-000000000003' / 'w1_slave', BAD_CRC)
+    write(w1 / '00-400000000000' / 'name', 'unknown')
+    write(w1 / 'w1_bus_master1' / 'therm_bulk_read', '0\n')
+    iio = root / 'iio'
+    write(iio / 'iio:device0' / 'name', 'dht11\n')
+    write(iio / 'iio:device0' / 'in_humidityrelative_input', '45300\n')
+    write(iio / 'iio:device0' / 'in_temp_input', '24100\n')
+    hwmon = root / 'hwmon'
+    write(hwmon / 'hwmon0' / 'name', 'cpu_thermal\n')
+    write(hwmon / 'hwmon0' / 'temp1_input', '51000\n')
+    write(hwmon / 'hwmon1' / 'name', 'sht3x\n')
+    write(hwmon / 'hwmon1' / 'humidity1_input', '38250\n')
+    write(hwmon / 'hwmon1' / 'temp1_input', '25500\n')
+    return str(w1), str(iio), str(hwmon)
+
+def test_parse_w1_slave():
+    assert parse_w1_slave(GOOD.format(-1250)) == -1.25
+    assert parse_w1_slave(BAD_CRC) is None
+    assert parse_w1_slave(GOOD.format(85000)) is None
+    assert parse_w1_slave('') is None
+
+def test_discovery_finds_probes_and_humidity_sensors(tmp_path):
+    w1, iio, hwmon = fake_sysfs(tmp_path)
+    assert [probe.id for probe in discover_ds18b20(w1)] == ['28-000000000001', '28-000000000002', '28-000000000003']
+    sensors = discover_humidity(iio, hwmon)
+    assert [(sensor.name, sensor.id) for sensor in sensors] == [('dht11', 'iio:device0'), ('sht3x', 'hwmon1')]
+    assert sensors[0].max_rate_hz == 0.5
+
+def test_hub_bulk_converts_and_caches_every_sensor(tmp_path):
+    w1, iio, hwmon = fake_sysfs(tmp_path)
+    hub = SensorHub.discover(w1, iio, hwmon)
+    try:
+        hub.poll()
+        assert (tmp_path / 'w1' / 'w1_bus_master1' / 'therm_bulk_read').read_text() == 'trigger\n'
+        assert hub.values() == {'28-000000000001': 23.125, '28-000000000002': 24.875,
+                                'iio:device0:humidity': 45.3, 'iio:device0:temperature': 24.1,
+                                'hwmon1:humidity': 38.25, 'hwmon1:temperature': 25.5}
+        assert hub.errors == 1  # the probe failing its CRC
+        chamber = hub.channel(['28-000000000001', '28-000000000002', '28-000000000003'])
+        assert chamber() == 24.0
+        assert hub.channel(['missing'])() is None
+    finally:
+        hub.stop()
+
+def test_conversions_overlap_without_bulk_trigger(tmp_path):
+    class SlowProbe(DS18B20):
+        # Blocks like a sysfs read that performs a 300 ms conversion
+        def read(self):
+            time.sleep(0.3)
+            return super().read()
+    for i in range(4):
+        write(tmp_path / f'28-00000000000{i}' / 'w1_slave', GOOD.format(20000 + i * 1000))
+    probes = [SlowProbe(str(tmp_path / f'28-00000000000{i}')) for i in range(4)]
+    hub = SensorHub(probes)
+    try:
+        started = time.monotonic()
+        hub.poll()
+        assert time.monotonic() - started < 0.6
+        assert hub.channel([probe.id for probe in probes])() == 21.5
+    finally:
+        hub.stop()
+
+def test_background_rounds_and_stale_values(tmp_path):
+    w1, iio, hwmon = fake_sysfs(tmp_path)
+    hub = SensorHub.discover(w1, iio, hwmon, period=0.05)
+    hub.start()
+    try:
+        deadline = time.monotonic() + 2
+        while hub.rounds < 3 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert hub.rounds >= 3
+    finally:
+        hub.stop()
+    time.sleep(0.2)
+    assert hub.value('28-000000000001') is None
@@ -0,0 +1,63 @@
+import os
+import numpy as np
+import pytest
+from src.session_log import (SessionRecorder, SessionReader, SessionHeader, recover_session,
+                             recover_sessions, HEADER_SIZE, RECORD_SIZE)
+
+def test_round_trip(tmp_path):
+    path = str(tmp_path / 'run.fdlog')
+    rec = SessionRecorder(path, start_time=1000.0, preset='PLA', batch_size=4)
+    for i in range(10):
+        rec.append(1000.0 + i, 50.0 + i, 30.0, 255, 60.0)
+    rec.close()
+    assert os.path.getsize(path) == HEADER_SIZE + 10 * RECORD_SIZE
+    reader = SessionReader(path)
+    assert reader.header.preset == 'PLA'
+    assert reader.header.closed
+    records = np.concatenate(list(reader.iter_chunks(chunk_size=3)))
+    assert records['temperature'].tolist() == [50.0 + i for i in range(10)]
+    assert records['seq'].tolist() == list(range(10))
+
+def test_recovers_records_written_after_last_header_update(tmp_path):
+    path = str(tmp_path / 'run.fdlog')
+    rec = SessionRecorder(path, batch_size=4)
+    for i in range(10):
+        rec.append(float(i), 40.0, 30.0, 100)
+    rec.write_batch()
+    rec._mmap.flush()
+    # Simulate a crash: header says 4 samples, 10 are actually in the map
+    with open(path, 'r+b') as f:
+        header = SessionHeader.unpack(f.read(HEADER_SIZE))
+        header.count = 4
+        f.seek(0)
+        f.write(header.pack())
+    rec._file = None  # abandon without closing
+    header = recover_session(path)
+    assert header.count == 10
+    assert len(SessionReader(path)) == 10
+    assert os.path.getsize(path) == HEADER_SIZE + 10 * RECORD_SIZE
+
+def test_torn_tail_is_dropped(tmp_path):
+    path = str(tmp_path / 'session-1.fdlog')
+    rec = SessionRecorder(path, batch_size=8)
+    for i in range(8):
+        rec.append(float(i), 40.0, 30.0, 100)
+    rec.sync()
+    rec._file = None
+    # Corrupt the last record as a torn write would
+    with open(path, 'r+b') as f:
+        header = SessionHeader.unpack(f.read(HEADER_SIZE))
+        f.seek(HEADER_SIZE + 7 * RECORD_SIZE + 10)
+        f.write(b'\xff\xff')
+        header.count = 0
+        f.seek(0)
+        f.write(header.pack())
+    recovered = recover_sessions(str(tmp_path))
+    assert [h.count for _, h in recovered] == [7]
+    assert recover_sessions(str(tmp_path)) == []
+
+def test_rejects_foreign_file(tmp_path):
+    path = tmp_path / 'bogus.fdlog'
+    path.write_bytes(b'x' * 100)
+    with pytest.raises(ValueError):
+        SessionReader(str(path))
@@ -0,0 +1,21 @@
+import io
+import sys
+import builtins
+from src import startup_trace
+
+def test_traces_first_time_imports_and_spans():
+    sys.modules.pop('colorsys', None)
+    startup_trace.enable()
+    try:
+        import colorsys
+        import colorsys  # cached: not recorded twice
+        with startup_trace.span('page'):
+            pass
+        assert [i[0] for i in startup_trace.imports()].count('colorsys') == 1
+        assert startup_trace.spans()[-1][0] == 'page'
+        out = io.StringIO()
+        startup_trace.report(out)
+    finally:
+        startup_trace.disable()
+    assert builtins.__import__ is startup_trace._original_import
+    assert 'colorsys' in out.getvalue() and 'page' in out.getvalue()
@@ -0,0 +1,51 @@
+import pytest
+from src.state_store import StateStore, DRYER_FIELDS
+
+class ManualScheduler:
+    # Stands in for the frame timer: flushes run only when the test says so
+    def __init__(self):
+        self.pending = []
+    def __call__(self, callback):
+        self.pending.append(callback)
+    def run(self):
+        pending, self.pending = self.pending, []
+        for callback in pending:
+            callback()
+
+def test_values_are_typed_and_unknown_keys_ignored():
+    store = StateStore()
+    store.update({'setpoint': 60, 'remaining_time': 90.0, 'pid_gains': {'P': 1}})
+    assert store['setpoint'] == 60.0 and isinstance(store['setpoint'], float)
+    assert isinstance(store['remaining_time'], int)
+    assert 'pid_gains' not in store.snapshot()
+    store.update(temperature=None)
+    with pytest.raises(ValueError):
+        store.update(preset=None)
+
+def test_subscribers_get_only_their_changed_fields():
+    store = StateStore()
+    seen = []
+    store.subscribe(('temperature', 'humidity'), seen.append)
+    assert seen == [{'temperature': None, 'humidity': None}]
+    store.update(temperature=50.0, heater_on=True)
+    store.update(temperature=50.0)
+    store.update(heater_on=False)
+    assert seen[1:] == [{'temperature': 50.0}]
+    with pytest.raises(KeyError):
+        store.subscribe(('nope',), seen.append)
+
+def test_bursts_are_coalesced_into_one_notification():
+    scheduler = ManualScheduler()
+    store = StateStore(schedule=scheduler)
+    seen = []
+    store.subscribe(tuple(DRYER_FIELDS), seen.append, initial=False)
+    for t in range(10):
+        store.update(temperature=40.0 + t, duty=t)
+    # A change that is undone within the frame is not reported
+    store.update(heater_on=True)
+    store.update(heater_on=False)
+    assert len(scheduler.pending) == 1 and seen == []
+    scheduler.run()
+    assert seen == [{'temperature': 49.0, 'duty': 9.0}]
+    scheduler.run()
+    assert len(seen) == 1
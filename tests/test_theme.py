@@ -0,0 +1,30 @@
+from PyQt5.QtWidgets import QPushButton
+from src.theme import compile_stylesheet, set_state, led_level, PALETTE, LED_LEVELS
+from src.main_page import MainPage
+
+def test_stylesheet_is_fully_substituted():
+    sheet = compile_stylesheet(dict(PALETTE, accent='#123456'))
+    assert '$' not in sheet
+    assert '#123456' in sheet
+    assert 'QPushButton[role="preset"][selected="true"]' in sheet
+    assert all(f'[level="{level}"]' in sheet for level in range(1, LED_LEVELS))
+
+def test_set_state_only_repolishes_on_change(qtbot):
+    button = QPushButton()
+    qtbot.addWidget(button)
+    assert set_state(button, 'selected', True)
+    assert not set_state(button, 'selected', True)
+    assert button.property('selected') is True
+
+def test_led_level_steps():
+    assert led_level(False, 255) == 0
+    assert led_level(True, 0) == 1
+    assert led_level(True, 255) == LED_LEVELS - 1
+
+def test_preset_switch_flips_selection_property(qtbot):
+    page = MainPage()
+    qtbot.addWidget(page)
+    page.change_preset('ABS')
+    assert page.preset_buttons['ABS'].property('selected') is True
+    assert page.preset_buttons['PLA'].property('selected') is False
+    assert not page.preset_buttons['ABS'].styleSheet()
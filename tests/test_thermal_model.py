@@ -0,0 +1,44 @@
+import time
+import numpy as np
+from src.thermal_model import ChamberModel, SimulatedChamber, SimulatedGPIO, simulate_pid, absolute_humidity
+
+def test_full_power_approaches_steady_state():
+    model = ChamberModel(heater_power=150.0, loss_coefficient=1.5, ambient_temperature=25.0)
+    result = model.run(np.full(40000, 100.0))
+    assert abs(result.temperature[-1, 0] - 125.0) < 1.0
+    assert np.all(np.diff(result.measured[:, 0]) >= 0)
+
+def test_dead_time_and_sensor_lag_delay_the_response():
+    model = ChamberModel(dead_time=10.0, sensor_lag=30.0)
+    result = model.run(np.full(60, 100.0))
+    assert result.temperature[8, 0] == 25.0
+    assert result.temperature[20, 0] > 25.0
+    assert result.measured[30, 0] < result.temperature[30, 0]
+
+def test_heating_dries_the_chamber():
+    result = simulate_pid(8.0, 0.05, 20.0, 60.0, 7200)
+    humidity = result.humidity[:, 0]
+    assert humidity[-1] < humidity[0] / 2
+    assert abs(result.measured[-1, 0] - 60.0) < 0.5
+    assert absolute_humidity(25.0, 100.0) > 20.0
+
+def test_batch_mode_runs_two_hours_quickly():
+    start = time.perf_counter()
+    result = simulate_pid(np.linspace(2.0, 20.0, 64), 0.05, 20.0, 60.0, 7200)
+    assert time.perf_counter() - start < 1.0
+    assert result.measured.shape == (7200, 64)
+    # Independent chambers: different gains give different trajectories
+    assert not np.allclose(result.measured[:, 0], result.measured[:, -1])
+
+def test_simulated_gpio_drives_only_heater_pins():
+    chamber = SimulatedChamber(speedup=10000.0)
+    gpio = SimulatedGPIO(chamber, heater_pins=[18])
+    fan = gpio.PWM(17, 100)
+    fan.start(100)
+    assert chamber.duty == 0.0
+    heater = gpio.PWM(18, 2)
+    heater.start(100)
+    time.sleep(0.05)
+    assert chamber.read_temperature() > 25.0
+    heater.stop()
+    assert chamber.duty == 0.0